@@ -0,0 +1,121 @@
+# adherent_cache.py
+
+import re
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, Hashable, List, Optional
+
+
+def normalize_phone(telephone: str) -> str:
+    """
+    Forme canonique d'un numéro, clé de cache et paramètre de la recherche en base : chiffres seuls, indicatif
+    +33/0033 retiré, 9 derniers chiffres (« +33 6 12 34 56 78 », « 0612345678 » et « 0033612345678 » donnent
+    la même clé et le même suffixe recherché).
+    """
+    digits = re.sub(r"\D", "", telephone or "")
+    if digits.startswith("0033"):
+        digits = digits[4:]
+    elif digits.startswith("33") and len(digits) == 11:
+        digits = digits[2:]
+    return digits[-9:]
+
+
+def _estimate_size(value: Any) -> int:
+    """Estimation grossière de l'empreinte mémoire d'une valeur mise en cache (dataclasses et listes)."""
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    if is_dataclass(value):
+        return sys.getsizeof(value) + sum(sys.getsizeof(getattr(value, f.name)) for f in fields(value))
+    return sys.getsizeof(value)
+
+
+class AdherentHotSet:
+    """
+    Cache LRU/TTL borné des adhérents récemment identifiés, partagé par toutes les sessions du worker.
+    Un appelant qui rappelle peu après (appel coupé, précision oubliée) est identifié par son numéro sans requête en base.
+    Le cache est propre au processus : seul le worker qui applique une modification l'invalide, les autres
+    servent l'ancienne ligne jusqu'à expiration. La durée de vie reste donc courte (quelques minutes).
+
+    Clés : ("tel", numéro normalisé) -> ids d'adhérents, ("adherent", id) -> Adherent,
+    ("contrats", id) -> liste de Contrat. Bornes : nombre d'entrées et octets estimés ;
+    les entrées les moins récemment utilisées sont évincées en premier.
+    """
+    def __init__(self, max_entries: int = 20000, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    # --- Accès générique ---
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires, _, value = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                self.stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        size = _estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    # --- Accès métier ---
+
+    def get_by_phone(self, telephone: str) -> Optional[List[Any]]:
+        """Adhérents associés à ce numéro, ou None si l'un d'eux n'est plus en cache (relecture en base)."""
+        ids = self.get(("tel", normalize_phone(telephone)))
+        if ids is None:
+            return None
+        adherents = [self.get(("adherent", adherent_id)) for adherent_id in ids]
+        return None if any(a is None for a in adherents) else adherents
+
+    def put_phone(self, telephone: str, adherents: List[Any]):
+        if not adherents:
+            return  # Un numéro inconnu peut devenir adhérent à tout moment : pas de cache négatif
+        for adherent in adherents:
+            self.put(("adherent", adherent.id_adherent), adherent)
+        self.put(("tel", normalize_phone(telephone)), [a.id_adherent for a in adherents])
+
+    def invalidate_adherent(self, adherent_id: int):
+        """À appeler après une modification de l'adhérent : l'entrée par numéro pointera sur un absent et sera relue."""
+        self.invalidate(("adherent", adherent_id))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, **self.stats}
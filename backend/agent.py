@@ -4,20 +4,30 @@ from __future__ import annotations
 import logging
 import asyncio
 import json
+import os
+from typing import Optional
 from dotenv import load_dotenv
+from log_pipeline import configure_logging, bind_log_context
+from startup_check import validate_tool_registry
 from livekit.agents import (
     JobContext,
     WorkerOptions,
     cli,
     AgentSession,
+    JobExecutorType,
 )
-from api import ArtexAgent
+from api import ArtexAgent, build_providers, load_shared_providers
 from db_driver import ExtranetDatabaseDriver
-from prompts import WELCOME_MESSAGE
+from replicas import bind_db_session
+from load_control import LoadMonitor
+from loop_watchdog import install_watchdog
+from call_recorder import CallRecorder
+from session_state import CheckpointStore, caller_identity
+from prompts import WELCOME_MESSAGE, RESUME_MESSAGE
 from tools import lookup_adherent_by_telephone
 
-# --- Configuration Standard du Logging ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# --- Configuration du Logging (file + thread d'écriture, JSON structuré) ---
+configure_logging(level=logging.INFO)
 logger = logging.getLogger("artex_agent.main")
 
 # --- Chargement des Variables d'Environnement ---
@@ -26,49 +36,97 @@ load_dotenv()
 # --- Initialisation des objets lourds UNE SEULE FOIS au démarrage du worker ---
 # Ceci est l'approche optimisée pour réduire la latence pour chaque nouvel appel.
 try:
+    validate_tool_registry()  # Avant le chargement des modèles : échoue vite si la liste d'outils est invalide
     db_driver = ExtranetDatabaseDriver()
-    artex_agent = ArtexAgent(db_driver=db_driver)
+    db_driver.check_schema()  # Migrations de sql/ requises par les requêtes ; ARTEX_SCHEMA_CHECK=0 la désactive
+    shared_providers = load_shared_providers()  # VAD partagé ; LLM/STT/TTS et ArtexAgent sont créés par appel (entrypoint)
+    load_monitor = LoadMonitor(db_driver=db_driver)
+    call_recorder = CallRecorder.from_env()  # Transcriptions et appels d'outils ; ARTEX_RECORDING=0 le désactive
+    checkpoint_store = CheckpointStore.from_env()  # Reprise des appels après perte du worker ; ARTEX_CHECKPOINTS=0 la désactive
 except Exception as e:
-    logger.error(f"Échec de l'initialisation des composants de l'agent au démarrage : {e}")
+    logger.error("Échec de l'initialisation des composants de l'agent au démarrage : %s", e)
     exit(1)
 
 
-# --- Point d'Entrée Principal de l'Agent ---
-async def entrypoint(ctx: JobContext):
-    """
-    Point d'entrée principal pour le worker de l'agent. Cette fonction est appelée pour chaque nouvelle tâche.
-    """
-    logger.info(f"Tâche reçue : {ctx.job.id} pour la salle : {ctx.room.name}")
-    
-    # --- CORRECTIF pour TypeError ---
-    # AgentSession est maintenant initialisé sans arguments.
-    session = AgentSession()
-    session.userdata = artex_agent.get_initial_userdata()
+# --- Recherche Automatique de l'Identifiant de l'Appelant ---
+def _caller_number(ctx: JobContext) -> Optional[str]:
+    """Numéro de l'appelant dans les métadonnées de la salle (renseignées par la téléphonie), s'il existe."""
+    metadata_str = ctx.room.metadata
+    if not metadata_str:
+        return None
+    try:
+        return json.loads(metadata_str).get('caller_number')
+    except json.JSONDecodeError:
+        logger.error("Les métadonnées de la salle ne sont pas un JSON valide. Retour à l'identification manuelle.")
+        return None
 
-    # --- Recherche Automatique de l'Identifiant de l'Appelant ---
+
+async def _identify_caller(ctx: JobContext, session) -> str:
+    """Recherche l'appelant par le numéro des métadonnées de la salle ; retourne le message d'accueil à énoncer."""
     initial_message = WELCOME_MESSAGE
     try:
-        metadata_str = ctx.room.metadata
-        if metadata_str:
-            metadata = json.loads(metadata_str)
-            caller_number = metadata.get('caller_number')
-        else:
-            caller_number = None
-
+        caller_number = _caller_number(ctx)
         if caller_number:
-            logger.info(f"Numéro de l'appelant trouvé dans les métadonnées : {caller_number}")
+            logger.info("Numéro de l'appelant trouvé dans les métadonnées : %s", caller_number)
             lookup_result = await lookup_adherent_by_telephone(session, telephone=caller_number)
             
             if "Bonjour, je m'adresse bien à" in lookup_result: # Note: This string is already in French from another file.
                 initial_message = lookup_result
             else:
-                 logger.warning(f"La recherche du numéro de téléphone {caller_number} n'a pas trouvé de correspondance unique.")
+                 logger.warning("La recherche du numéro de téléphone %s n'a pas trouvé de correspondance unique.", caller_number)
         else:
             logger.warning("Aucun 'caller_number' dans les métadonnées de la salle. Retour à l'identification manuelle.")
-    except json.JSONDecodeError:
-        logger.error("Les métadonnées de la salle ne sont pas un JSON valide. Retour à l'identification manuelle.")
     except Exception as e:
-        logger.error(f"Une erreur s'est produite lors de la recherche initiale : {e}")
+        logger.error("Une erreur s'est produite lors de la recherche initiale : %s", e)
+    return initial_message
+
+
+# --- Point d'Entrée Principal de l'Agent ---
+async def entrypoint(ctx: JobContext, session_factory=AgentSession):
+    """
+    Point d'entrée principal pour le worker de l'agent. Cette fonction est appelée pour chaque nouvelle tâche.
+    `session_factory` permet au simulateur d'appels (simulate_calls.py) de substituer une session hors ligne.
+    """
+    bind_log_context(job_id=ctx.job.id, room=ctx.room.name)
+    bind_db_session()  # Lecture de ses propres écritures pour cet appel
+    logger.info("Tâche reçue : %s pour la salle : %s", ctx.job.id, ctx.room.name)
+    load_monitor.watch_loop()  # Retard de la boucle de cette tâche, pris en compte par l'admission
+    install_watchdog()  # Opt-in via ARTEX_LOOP_WATCHDOG=1
+    load_monitor.session_started(ctx.job.id)  # Place réservée à l'acceptation (handle_job_request)
+
+    async def _on_session_end():
+        load_monitor.session_ended()
+    ctx.add_shutdown_callback(_on_session_end)
+
+    # --- CORRECTIF pour TypeError ---
+    # AgentSession est maintenant initialisé sans arguments.
+    session = session_factory()
+    # Propres à l'appel : état de session LiveKit et clients gRPC liés à la boucle de cette tâche.
+    artex_agent = ArtexAgent(db_driver=db_driver, providers=build_providers(shared_providers))
+    session.userdata = artex_agent.get_initial_userdata()
+    ctx.add_shutdown_callback(session.userdata["prefetcher"].aclose)
+    if call_recorder is not None:
+        recording = call_recorder.session(session_id=ctx.job.id, room=ctx.room.name)
+        recording.attach(session)
+        ctx.add_shutdown_callback(recording.aclose)
+
+    # --- Reprise d'un appel commencé sur un worker perdu (même salle, même appelant) ---
+    # Le point de reprise est indexé par la salle : LiveKit y redirige l'appel vers un autre worker.
+    # Il n'est repris que pour le même participant et le même numéro appelant, et l'adhérent revient
+    # non confirmé : l'appelant doit reconfirmer son identité (voir session_state.restore_state).
+    checkpoint = None
+    if checkpoint_store is not None:
+        participant = await ctx.wait_for_participant()
+        checkpoint = checkpoint_store.session(ctx.room.name, caller_identity(participant.identity, _caller_number(ctx)))
+    resumed = checkpoint is not None and checkpoint.restore(session.userdata)
+    adherent = session.userdata["unconfirmed_adherent"]
+    if resumed and adherent is not None:
+        initial_message = RESUME_MESSAGE.format(prenom=adherent.prenom, nom=adherent.nom)
+    else:
+        initial_message = await _identify_caller(ctx, session)
+    if checkpoint is not None:
+        checkpoint.attach(session)
+        checkpoint.checkpoint()
 
     # --- CORRECTIF pour TypeError ---
     # L'agent et le contexte de la salle sont maintenant tous deux passés à la méthode start().
@@ -82,4 +140,14 @@ async def entrypoint(ctx: JobContext):
 
 # --- Exécuteur CLI Standard ---
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        # Admission pilotée par la charge mesurée (sessions, retard de boucle, saturation BD).
+        request_fnc=load_monitor.handle_job_request,
+        load_fnc=load_monitor.current_load,
+        load_threshold=load_monitor.load_threshold,
+        # Les tâches partagent le pilote de BD et le VAD de ce processus ; LLM/STT/TTS et ArtexAgent sont
+        # propres à chaque appel (une boucle par tâche) : exécution en threads par défaut.
+        job_executor_type=JobExecutorType[os.getenv("ARTEX_JOB_EXECUTOR", "THREAD").upper()],
+        port=int(os.getenv("ARTEX_WORKER_PORT", "8081")),
+    ))
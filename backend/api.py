@@ -1,9 +1,12 @@
 # api.py
 
 import logging
+import os
+from typing import Any, Dict, Optional
 from livekit.agents import Agent
-from livekit.plugins import google, silero
+from livekit.plugins import silero
 from db_driver import ExtranetDatabaseDriver
+from prefetch import SessionPrefetcher
 from prompts import INSTRUCTIONS
 from tools import (
     get_adherent_details,
@@ -23,30 +26,70 @@ from tools import (
     get_claim_status,
 )
 
+def load_shared_providers() -> Dict[str, Any]:
+    """
+    Charge une fois par processus ce que les appels peuvent partager : le modèle VAD silero.
+    Importe aussi le plugin du fournisseur choisi : livekit exige que les plugins soient enregistrés
+    dans le thread principal, et cette fonction s'exécute au chargement d'agent.py.
+    """
+    if os.getenv("ARTEX_PROVIDERS", "google").lower() == "google":
+        from livekit.plugins import google  # noqa: F401
+    return {"vad": silero.VAD.load()}
+
+def build_providers(shared: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Construit les fournisseurs LLM/STT/TTS selon `ARTEX_PROVIDERS` :
+    "google" (défaut, production) ou "fake" (rejeu hors ligne, voir fake_providers.py).
+    Appelée pour chaque appel : les clients gRPC asynchrones de google.TTS/STT/LLM sont liés à la boucle
+    qui les utilise en premier, et chaque tâche en exécution THREAD a sa propre boucle.
+    Seul `shared` (le VAD, voir load_shared_providers) est réutilisé d'un appel à l'autre.
+    """
+    provider_kind = os.getenv("ARTEX_PROVIDERS", "google").lower()
+    if provider_kind == "fake":
+        from fake_providers import build_fake_providers
+        providers = build_fake_providers()
+    elif provider_kind == "google":
+        providers = _build_google_providers()
+    else:
+        raise ValueError(f"Fournisseurs inconnus : '{provider_kind}' (valeurs possibles : google, fake).")
+    providers.update(shared or load_shared_providers())
+    return providers
+
+def _build_google_providers() -> Dict[str, Any]:
+    # Plugin déjà importé dans le thread principal par load_shared_providers().
+    from livekit.plugins import google
+    return {
+        "llm": google.LLM(model="gemini-1.5-flash"),
+        "tts": google.TTS(
+            language="fr-FR",
+            voice_name="fr-FR-Chirp3-HD-Charon" # Voix changée pour une latence potentiellement plus faible
+        ),
+        "stt": google.STT(
+            languages="fr-FR",
+            interim_results=True
+        ),
+    }
+
 class ArtexAgent(Agent):
     # --- CHANGEMENT POUR RÉDUCTION DE LATENCE ---
     # La méthode __init__ est modifiée pour accepter un db_driver pré-initialisé.
     # Cela empêche l'agent de créer un nouveau pilote de base de données pour chaque tâche.
-    def __init__(self, db_driver: ExtranetDatabaseDriver):
+    # Un ArtexAgent par appel : LiveKit conserve sur l'Agent l'état de sa session (activité, historique de
+    # conversation). Seuls le pilote et le VAD sont partagés entre les appels d'un processus.
+    def __init__(self, db_driver: ExtranetDatabaseDriver, providers: Optional[Dict[str, Any]] = None):
         """
         Initialise l'ArtexAgent avec tous ses composants et un pilote de base de données partagé.
+        `providers` permet d'injecter d'autres fournisseurs LLM/STT/TTS/VAD (ex. simulés) ; par défaut, build_providers().
         """
+        providers = providers or build_providers()
         super().__init__(
             instructions=INSTRUCTIONS,
             
-            llm=google.LLM(model="gemini-1.5-flash"),
-            
-            tts=google.TTS(
-                language="fr-FR",
-                voice_name="fr-FR-Chirp3-HD-Charon" # Voix changée pour une latence potentiellement plus faible
-            ),
-
-            stt=google.STT(
-                languages="fr-FR",
-                interim_results=True
-            ),
+            llm=providers["llm"],
+            tts=providers["tts"],
+            stt=providers["stt"],
             
-            vad=silero.VAD.load(),
+            vad=providers["vad"],
 
             # La liste complète des outils disponibles pour l'agent.
             tools=[
@@ -73,7 +116,7 @@ class ArtexAgent(Agent):
         )
         # Stocker le pilote pré-initialisé qui a été passé.
         self.db_driver = db_driver
-        logging.info("Schéma ArtexAgent configuré avec un pilote de BD partagé pour réduire la latence.")
+        logging.debug("Schéma ArtexAgent configuré avec un pilote de BD partagé pour réduire la latence.")
 
     def get_initial_userdata(self) -> dict:
         """
@@ -85,4 +128,5 @@ class ArtexAgent(Agent):
             "db_driver": self.db_driver,
             "adherent_context": None,      # Pour l'adhérent entièrement confirmé
             "unconfirmed_adherent": None,  # Pour les recherches temporaires en attente de confirmation
+            "prefetcher": SessionPrefetcher(self.db_driver),  # Cache spéculatif rempli après confirmation d'identité
         }
\ No newline at end of file
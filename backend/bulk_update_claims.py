@@ -0,0 +1,81 @@
+# bulk_update_claims.py
+"""
+Mise à jour en masse des statuts de sinistres pour le traitement de nuit du service sinistres.
+
+Le fichier d'entrée est un CSV (séparateur ',' ou ';') avec les colonnes :
+    id_sinistre_artex,statut[,note]
+Une ligne d'en-tête est tolérée. Utiliser '-' pour lire l'entrée standard.
+Les lignes illisibles (identifiant non numérique, statut absent) sont signalées avec leur numéro
+dans le rapport, sans interrompre le traitement.
+
+Exemple :
+    python bulk_update_claims.py clotures_du_jour.csv --chunk-size 5000
+"""
+
+import argparse
+import csv
+import itertools
+import logging
+import sys
+from typing import Iterator, List, Optional, TextIO, Tuple
+from db_driver import ExtranetDatabaseDriver
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("artex_agent.bulk_update_claims")
+
+
+def read_updates(stream: TextIO, rejected: List[Tuple[int, str]]) -> Iterator[Tuple[int, str, Optional[str]]]:
+    """
+    Lit les lignes (id, statut, note) au fil de l'eau, sans charger tout le fichier en mémoire.
+    Les lignes illisibles sont ajoutées à `rejected` (numéro de ligne, motif) au lieu d'interrompre la lecture.
+    """
+    first_line = stream.readline()
+    if not first_line:
+        return
+    delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+    rows = csv.reader(itertools.chain([first_line], stream), delimiter=delimiter)
+    for line_number, row in enumerate(rows, start=1):
+        if not row or not row[0].strip():
+            continue
+        if line_number == 1 and not row[0].strip().isdigit():
+            continue  # En-tête
+        if not row[0].strip().isdigit():
+            rejected.append((line_number, f"identifiant non numérique : {row[0].strip()!r}"))
+            continue
+        if len(row) < 2 or not row[1].strip():
+            rejected.append((line_number, "statut absent"))
+            continue
+        note = row[2].strip() if len(row) > 2 and row[2].strip() else None
+        yield int(row[0]), row[1].strip(), note
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Met à jour en masse le statut des sinistres depuis un CSV.")
+    parser.add_argument("input", help="Fichier CSV id_sinistre_artex,statut[,note] ou '-' pour stdin.")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Nombre de sinistres par transaction.")
+    args = parser.parse_args()
+
+    db = ExtranetDatabaseDriver()
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    rejected: List[Tuple[int, str]] = []
+    try:
+        report = db.bulk_update_sinistre_status(read_updates(stream, rejected), chunk_size=args.chunk_size)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    report.rejected_lines = rejected
+
+    for chunk in report.failed_chunks:
+        logger.error("Lot %s : %s sinistre(s) non mis à jour (ids %s..%s) : %s", chunk.chunk_index,
+                     chunk.submitted, chunk.failed_ids[0], chunk.failed_ids[-1], chunk.error)
+    for line_number, reason in report.rejected_lines:
+        logger.error("Ligne %s ignorée : %s", line_number, reason)
+    rate = report.submitted / report.elapsed_seconds if report.elapsed_seconds else 0.0
+    logger.info("%s sinistre(s) soumis, %s modifié(s), %s lot(s) en échec, %s ligne(s) illisible(s), en %.2f s "
+                "(%.0f mises à jour/s).", report.submitted, report.updated, len(report.failed_chunks),
+                len(report.rejected_lines), report.elapsed_seconds, rate)
+    sys.exit(1 if report.failed_chunks or report.rejected_lines else 0)
+
+
+if __name__ == "__main__":
+    main()
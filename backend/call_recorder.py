@@ -0,0 +1,161 @@
+# call_recorder.py
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("artex_agent.call_recorder")
+
+DEFAULT_RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+
+# Les sorties d'outils peuvent être longues (listes de garanties) : on en garde le début pour l'analyse.
+MAX_OUTPUT_CHARS = 2000
+
+
+def partition_path(root: str, day: str) -> str:
+    """Répertoire de la partition journalière `day` (AAAA-MM-JJ, UTC)."""
+    return os.path.join(root, day)
+
+
+class CallRecorder:
+    """
+    Enregistreur des transcriptions et appels d'outils, partagé par toutes les sessions du worker.
+
+    `record()` ne fait qu'ajouter un dictionnaire à un tampon en mémoire : aucune E/S sur le chemin des tours
+    de parole. Un thread vide le tampon toutes les `flush_interval` secondes (ou dès `flush_records`
+    enregistrements) dans des fichiers JSON Lines compressés en gzip, un par jour et par processus :
+        <racine>/AAAA-MM-JJ/<hôte>-<pid>.jsonl.gz
+    Chaque vidage ajoute un membre gzip au fichier du jour, lisible d'un bloc par gzip.open().
+    Si le disque ne suit pas, les enregistrements au-delà de `max_buffer` sont abandonnés et comptés.
+    """
+    def __init__(self, root: str, flush_interval: float = 5.0, flush_records: int = 1000, max_buffer: int = 100_000):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._file_prefix = f"{socket.gethostname()}-{os.getpid()}"
+
+    @classmethod
+    def from_env(cls) -> Optional["CallRecorder"]:
+        """Enregistreur configuré par l'environnement, ou None si ARTEX_RECORDING=0."""
+        if os.getenv("ARTEX_RECORDING", "1") == "0":
+            return None
+        return cls(
+            root=os.getenv("ARTEX_RECORDINGS_DIR", DEFAULT_RECORDINGS_DIR),
+            flush_interval=float(os.getenv("ARTEX_RECORDING_FLUSH_SECONDS", "5")),
+        )
+
+    def ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="artex-call-recorder", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def record(self, **fields):
+        fields["ts"] = time.time()
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer.append(fields)
+            if len(self._buffer) >= self.flush_records:
+                self._wakeup.set()
+
+    def session(self, session_id: str, room: str) -> "SessionRecording":
+        self.ensure_started()
+        return SessionRecording(self, session_id, room)
+
+    # --- Écriture (thread dédié) ---
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in batch:
+            day = datetime.fromtimestamp(entry["ts"], tz=timezone.utc).strftime("%Y-%m-%d")
+            by_day.setdefault(day, []).append(entry)
+        for day, entries in by_day.items():
+            directory = partition_path(self.root, day)
+            try:
+                os.makedirs(directory, exist_ok=True)
+                with gzip.open(os.path.join(directory, f"{self._file_prefix}.jsonl.gz"), "at", encoding="utf-8") as f:
+                    f.writelines(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in entries)
+            except OSError as err:
+                self.dropped += len(entries)
+                logger.error("Écriture des enregistrements d'appels impossible dans %s : %s", directory, err)
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+        self.flush()
+        if self.dropped:
+            logger.warning("%s enregistrement(s) d'appel abandonné(s).", self.dropped)
+
+
+class SessionRecording:
+    """Enregistrement d'une session : s'abonne aux événements de l'AgentSession et les transmet au CallRecorder."""
+    def __init__(self, recorder: CallRecorder, session_id: str, room: str):
+        self.recorder = recorder
+        self.session_id = session_id
+        self.room = room
+        self._session = None
+        self._started = time.monotonic()
+        self._messages = 0
+        self._tool_calls = 0
+
+    def attach(self, session):
+        self._session = session
+        session.on("conversation_item_added", self._on_item_added)
+        session.on("function_tools_executed", self._on_tools_executed)
+        self._record(type="session_start")
+
+    def _adherent_id(self) -> Optional[int]:
+        userdata = getattr(self._session, "userdata", None) or {}
+        return getattr(userdata.get("adherent_context"), "id_adherent", None)
+
+    def _record(self, **fields):
+        self.recorder.record(session_id=self.session_id, room=self.room, adherent_id=self._adherent_id(), **fields)
+
+    def _on_item_added(self, event):
+        item = event.item
+        if getattr(item, "type", None) != "message":
+            return
+        self._messages += 1
+        self._record(type="message", role=item.role, text=item.text_content,
+                     interrupted=getattr(item, "interrupted", False))
+
+    def _on_tools_executed(self, event):
+        for call, output in zip(event.function_calls, event.function_call_outputs):
+            self._tool_calls += 1
+            self._record(type="tool", tool=call.name, arguments=call.arguments,
+                         output=(output.output or "")[:MAX_OUTPUT_CHARS] if output else None,
+                         is_error=bool(output and output.is_error))
+
+    async def aclose(self):
+        self._record(type="session_end", duration_s=round(time.monotonic() - self._started, 1),
+                     messages=self._messages, tool_calls=self._tool_calls)
@@ -0,0 +1,212 @@
+# check_query_plans.py
+"""
+Vérifie les plans d'exécution de toutes les requêtes de lecture du pilote (db_driver.QUERIES).
+
+Pour chaque requête, un EXPLAIN est exécuté avec des paramètres réalistes tirés de la base ; la
+vérification échoue (code de sortie 1) si une table est lue par parcours complet, ou avec un tri
+fichier, au-delà de --max-rows lignes estimées. Une requête ajoutée au pilote sans paramètres
+d'exemple ci-dessous fait aussi échouer la vérification.
+
+À lancer sur une base locale jetable (DB_NAME doit contenir « test » pour --seed) :
+    python check_query_plans.py --apply-ddl --seed 50000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+import mysql.connector
+from db_driver import ExtranetDatabaseDriver, QUERIES
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("artex_agent.check_query_plans")
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql")
+
+# Parcours complets voulus (listings back-office non filtrés).
+FULL_SCAN_ALLOWED = {"iter_sinistres", "get_shard_ranges"}  # shard_ranges : quelques lignes, lue en entier
+
+# Erreurs MySQL signifiant qu'une migration d'index est déjà appliquée.
+ALREADY_APPLIED_ERRNOS = {1060, 1061}
+
+
+# --- Paramètres d'exemple par requête ---
+
+def _sample_params(cursor) -> Dict[str, Tuple]:
+    cursor.execute("SELECT id_adherent, email, nom, prenom, telephone FROM adherents ORDER BY id_adherent LIMIT 1")
+    adherent = cursor.fetchone()
+    cursor.execute("SELECT id_contrat, id_formule, id_adherent_principal, numero_contrat_num FROM contrats "
+                   "ORDER BY id_contrat LIMIT 1")
+    contrat = cursor.fetchone()
+    cursor.execute("SELECT id_sinistre_artex, statut_sinistre_artex FROM sinistres_artex ORDER BY id_sinistre_artex LIMIT 1")
+    sinistre = cursor.fetchone()
+    if not (adherent and contrat and sinistre):
+        raise RuntimeError("La base est vide : relancer avec --seed pour générer des données.")
+    id_adherent, email, nom, prenom, telephone = adherent
+    id_contrat, id_formule, id_titulaire, numero_num = contrat
+    id_sinistre, statut = sinistre
+    return {
+        "get_adherent_by_id": (id_adherent,),
+        "get_adherent_by_email": (email,),
+        "get_adherents_by_telephone": ((telephone or "0600000000")[-9:],),
+        "get_adherents_by_fullname": (nom, prenom),
+        "get_contrats_by_adherent_id": (id_adherent,),
+        "get_contract_by_id": (id_contrat,),
+        "get_contract_by_number": (id_titulaire, numero_num),
+        "get_contract_owner": (id_contrat,),
+        "get_full_contract_details": (id_contrat,),
+        "get_guarantees_for_formula": (id_formule,),
+        "get_specific_guarantee_detail": (id_formule, "%optique%"),
+        "get_sinistres_by_adherent_id": (id_adherent,),
+        "get_sinistre_by_id": (id_sinistre,),
+        "get_sinistre_by_request_key": ("0" * 32,),
+        "iter_sinistres": (),
+        "iter_sinistres_by_statut": (statut,),
+        "get_sinistre_events": (id_sinistre,),
+        "get_shard_ranges": (),
+        "directory_by_email": (email,),
+        "directory_by_telephone": ((telephone or "0600000000")[-9:],),
+        "directory_by_fullname": (nom, prenom),
+        "directory_entity_owner": ("sinistre", id_sinistre),
+        "get_formule": (id_formule,),
+    }
+
+
+# --- Vérification ---
+
+def check_plan(cursor, name: str, params: Tuple, max_rows: int) -> List[str]:
+    """Retourne la liste des problèmes du plan de `name` (vide si le plan est acceptable)."""
+    cursor.execute("EXPLAIN " + QUERIES[name], params)
+    columns = [d[0] for d in cursor.description]
+    problems = []
+    for row in cursor.fetchall():
+        step = dict(zip(columns, row))
+        rows = int(step.get("rows") or 0)
+        extra = step.get("Extra") or ""
+        table = step.get("table")
+        if step.get("type") in ("ALL", "index") and rows > max_rows and name not in FULL_SCAN_ALLOWED:
+            problems.append(f"parcours complet de {table} (~{rows} lignes, type={step.get('type')})")
+        if "filesort" in extra and rows > max_rows:
+            problems.append(f"tri fichier sur {table} (~{rows} lignes)")
+    return problems
+
+
+def apply_ddl(conn, filename: str):
+    with open(os.path.join(SQL_DIR, filename), "r", encoding="utf-8") as f:
+        script = f.read()
+    statements = [s.strip() for s in script.split(";")]
+    cursor = conn.cursor()
+    for statement in statements:
+        lines = [l for l in statement.splitlines() if not l.strip().startswith("--")]
+        sql = "\n".join(lines).strip()
+        if not sql:
+            continue
+        try:
+            cursor.execute(sql)
+        except mysql.connector.Error as err:
+            if err.errno not in ALREADY_APPLIED_ERRNOS:
+                raise
+    conn.commit()
+    logger.info("DDL appliqué : %s", filename)
+
+
+# --- Données de test ---
+
+def _insert_many(conn, query: str, rows_fn: Callable[[int], Tuple], count: int, chunk: int = 5000):
+    cursor = conn.cursor()
+    for start in range(0, count, chunk):
+        cursor.executemany(query, [rows_fn(i) for i in range(start, min(count, start + chunk))])
+        conn.commit()
+
+
+def seed(conn, adherents: int):
+    """Génère un jeu de données synthétique proportionné au nombre d'adhérents demandé."""
+    rng = random.Random(42)
+    noms = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau"]
+    prenoms = ["Marie", "Jean", "Pierre", "Sophie", "Luc", "Claire", "Paul", "Julie", "Louis", "Emma"]
+    libelles = ["Optique", "Dentaire", "Hospitalisation", "Consultation", "Pharmacie", "Kinésithérapie",
+                "Audioprothèse", "Maternité", "Médecine douce", "Radiologie"]
+    statuts = ["Soumis", "En cours", "Approuvé", "Refusé", "Clos"]
+    formules, contrats_par_adherent = 20, 1.2
+    nb_contrats = int(adherents * contrats_par_adherent)
+    today = date.today()
+
+    _insert_many(conn, """INSERT INTO formules (nom_formule, tarif_base_mensuel, description_formule)
+                          VALUES (%s, %s, %s)""",
+                 lambda i: (f"Formule {i + 1}", 20 + i * 5, None), formules)
+    _insert_many(conn, "INSERT INTO garanties (libelle, description) VALUES (%s, %s)",
+                 lambda i: (f"{libelles[i % len(libelles)]} {i // len(libelles) or ''}".strip(), None), 60)
+    _insert_many(conn, """INSERT IGNORE INTO formules_garanties
+                          (id_formule, id_garantie, plafond_remboursement, taux_remboursement_pourcentage, franchise)
+                          VALUES (%s, %s, %s, %s, %s)""",
+                 lambda i: (i // 15 + 1, rng.randint(1, 60), 500, 70, 0), formules * 15)
+    _insert_many(conn, """INSERT INTO adherents (nom, prenom, date_adhesion_mutuelle, date_naissance, adresse,
+                                                  code_postal, ville, telephone, email)
+                          VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                 lambda i: (rng.choice(noms), rng.choice(prenoms), today - timedelta(days=rng.randint(0, 3650)),
+                            date(1950, 1, 1) + timedelta(days=rng.randint(0, 20000)), f"{i} rue de Paris",
+                            f"{rng.randint(1000, 95999):05d}", "Paris", f"06{i:08d}", f"adherent{i}@example.fr"),
+                 adherents)
+    _insert_many(conn, """INSERT INTO contrats (id_adherent_principal, numero_contrat, date_debut_contrat,
+                                                 id_formule, type_contrat, statut_contrat)
+                          VALUES (%s, %s, %s, %s, %s, %s)""",
+                 lambda i: (i % adherents + 1, f"CONTR{i + 1:05d}", today - timedelta(days=rng.randint(0, 3650)),
+                            rng.randint(1, formules), "Individuel", "Actif"), nb_contrats)
+    _insert_many(conn, """INSERT INTO sinistres_artex (id_contrat, id_adherent, type_sinistre, date_declaration_agent,
+                                                        statut_sinistre_artex, description_sinistre, date_survenance)
+                          VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                 lambda i: ((i % nb_contrats) + 1, (i % nb_contrats) % adherents + 1, rng.choice(libelles),
+                            today - timedelta(days=rng.randint(0, 700)), rng.choice(statuts), None,
+                            today - timedelta(days=rng.randint(0, 730))), adherents * 2)
+
+    cursor = conn.cursor()
+    for table in ("adherents", "formules", "contrats", "garanties", "formules_garanties", "sinistres_artex"):
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+    logger.info("Base de test alimentée : %s adhérents, %s contrats, %s sinistres.", adherents, nb_contrats, adherents * 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie les plans d'exécution des requêtes du pilote.")
+    parser.add_argument("--max-rows", type=int, default=1000,
+                        help="Nombre de lignes estimées au-delà duquel un parcours complet ou un tri fichier échoue.")
+    parser.add_argument("--apply-ddl", action="store_true", help="Crée le schéma de base et applique les migrations de sql/.")
+    parser.add_argument("--seed", type=int, default=0, help="Génère N adhérents synthétiques (base de test uniquement).")
+    args = parser.parse_args()
+
+    params = dict(ExtranetDatabaseDriver().connection_params)
+    conn = mysql.connector.connect(**params)
+    try:
+        if args.apply_ddl:
+            for filename in sorted(f for f in os.listdir(SQL_DIR) if f.endswith(".sql")):
+                apply_ddl(conn, filename)
+        if args.seed:
+            if "test" not in params["database"].lower():
+                sys.exit(f"Refus d'alimenter '{params['database']}' : DB_NAME doit désigner une base de test.")
+            seed(conn, args.seed)
+
+        cursor = conn.cursor()
+        samples = _sample_params(cursor)
+        failures: Dict[str, List[str]] = {}
+        for name in QUERIES:
+            if name not in samples:
+                failures[name] = ["aucun paramètre d'exemple : ajouter la requête à _sample_params()"]
+                continue
+            problems = check_plan(cursor, name, samples[name], args.max_rows)
+            if problems:
+                failures[name] = problems
+            print(f"{'ÉCHEC' if problems else 'OK':<6} {name}")
+    finally:
+        conn.close()
+
+    for name, problems in failures.items():
+        for problem in problems:
+            logger.error("%s : %s", name, problem)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# circuit_breaker.py
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger("artex_agent.circuit_breaker")
+
+
+class DatabaseUnavailable(Exception):
+    """La base ne répond pas dans les délais, ou le disjoncteur est ouvert : l'appel échoue immédiatement."""
+
+
+class OutcomeUnknown(DatabaseUnavailable):
+    """Délai dépassé pendant une écriture : le thread n'est pas interrompu, l'écriture a pu (ou peut encore) aboutir."""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur à trois états, partagé par toutes les sessions du worker.
+      - fermé : les appels passent ; `failure_threshold` échecs consécutifs (délais dépassés, base injoignable)
+        l'ouvrent ;
+      - ouvert : les appels échouent immédiatement pendant `reset_timeout` secondes, sans attendre la base ;
+      - semi-ouvert : un seul appel d'essai passe ; son succès referme le disjoncteur, son échec le rouvre.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Lève DatabaseUnavailable si l'appel ne doit pas être tenté."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise DatabaseUnavailable(f"disjoncteur {self.name} ouvert")
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                raise DatabaseUnavailable(f"disjoncteur {self.name} en essai")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Disjoncteur %s refermé : la base répond de nouveau.", self.name)
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, err: BaseException):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.error("Disjoncteur %s ouvert pour %.0f s après %s échec(s) : %s",
+                                 self.name, self.reset_timeout, self._failures, err)
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """Appel abandonné sans verdict (ex. annulé par l'appelant) : libère l'éventuel essai en cours."""
+        with self._lock:
+            self._trial_in_flight = False
@@ -0,0 +1,106 @@
+# contract_numbers.py
+
+import re
+import unicodedata
+from typing import List, Optional
+
+# Seule la partie numérique d'un numéro de contrat sert à la recherche (colonne contrats.numero_contrat_num,
+# voir sql/003_contract_number_index.sql) : le préfixe « CONTR » est souvent mal transcrit
+# (« contre », « contrat », « C O N T R »), et les zéros de tête ne sont pas toujours prononcés.
+
+_UNITS = {"zero": 0, "un": 1, "une": 1, "deux": 2, "trois": 3, "quatre": 4, "cinq": 5,
+          "six": 6, "sept": 7, "huit": 8, "neuf": 9}
+_TEENS = {"dix": 10, "onze": 11, "douze": 12, "treize": 13, "quatorze": 14, "quinze": 15, "seize": 16}
+_TENS = {"vingt": 20, "vingts": 20, "trente": 30, "quarante": 40, "cinquante": 50, "soixante": 60}
+_MULTIPLIERS = {"cent": 100, "cents": 100, "mille": 1000}
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+class _SpokenNumber:
+    """Nombre en toutes lettres en cours de lecture (« quatre vingt dix sept »)."""
+    def __init__(self):
+        self.total = 0
+        self.current = 0
+        self.last: Optional[str] = None
+
+    def accepts(self, kind: str, word: str) -> bool:
+        """Le mot prolonge-t-il ce nombre, ou commence-t-il un nouveau fragment (« zéro zéro deux ») ?"""
+        if self.last is None:
+            return True
+        if kind == "unit":
+            return self.last in ("tens", "multiplier") or (self.last == "teen" and self.current % 100 in (10, 70, 90))
+        if kind == "teen":
+            return self.last in ("tens", "multiplier")
+        if kind == "tens":
+            return (word.startswith("vingt") and self.last == "unit" and self.current % 10 == 4) or self.last == "multiplier"
+        return self.last in ("unit", "tens", "teen")  # « deux cent », « trois mille »
+
+    def add(self, kind: str, word: str, value: int):
+        if kind == "tens" and word.startswith("vingt") and self.last == "unit" and self.current % 10 == 4:
+            self.current += 76  # quatre-vingt
+        elif kind == "multiplier" and value == 1000:
+            self.total += (self.current or 1) * 1000
+            self.current = 0
+        elif kind == "multiplier":
+            self.current = (self.current or 1) * 100
+        else:
+            self.current += value
+        self.last = kind
+
+    def digits(self) -> str:
+        return str(self.total + self.current)
+
+
+def parse_contract_number(spoken: str) -> Optional[int]:
+    """
+    Partie numérique d'un numéro de contrat tel que transcrit par la reconnaissance vocale :
+    « CONTR00024 », « contr 24 », « contre zéro zéro zéro vingt-quatre », « C O N T R 0 0 0 2 4 » -> 24.
+    Les chiffres dictés un à un sont concaténés, les nombres en toutes lettres sont calculés.
+    Retourne None si aucun chiffre n'a été reconnu.
+    """
+    tokens = re.findall(r"[a-z]+|\d+", _strip_accents(spoken or "").lower())
+    fragments: List[str] = []
+    number: Optional[_SpokenNumber] = None
+    for token in tokens:
+        if token.isdigit():
+            kind, value = "digits", None
+        elif token in _UNITS:
+            kind, value = "unit", _UNITS[token]
+        elif token in _TEENS:
+            kind, value = "teen", _TEENS[token]
+        elif token in _TENS:
+            kind, value = "tens", _TENS[token]
+        elif token in _MULTIPLIERS:
+            kind, value = "multiplier", _MULTIPLIERS[token]
+        elif token == "et" and number is not None:
+            continue  # « vingt et un »
+        elif token == "o":
+            kind, value = "digits", None  # Lettre O épelée pour zéro (ou dans « C O N T R » : zéro de tête sans effet)
+            token = "0"
+        else:
+            kind, value = None, None
+
+        if kind in ("unit", "teen", "tens", "multiplier"):
+            if number is None or not number.accepts(kind, token):
+                if number is not None:
+                    fragments.append(number.digits())
+                number = _SpokenNumber()
+            number.add(kind, token, value)
+            continue
+        if number is not None:
+            fragments.append(number.digits())
+            number = None
+        if kind == "digits":
+            fragments.append(token)
+    if number is not None:
+        fragments.append(number.digits())
+    return int("".join(fragments)) if fragments else None
+
+
+def contract_number_value(numero_contrat: str) -> Optional[int]:
+    """Partie numérique d'un numéro de contrat stocké, calculée comme la colonne numero_contrat_num."""
+    match = re.search(r"\d+", numero_contrat or "")
+    return int(match.group()) if match else None
@@ -2,13 +2,29 @@
 
 import mysql.connector
 import os
+import json
+import uuid
 from dotenv import load_dotenv
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, fields
-from contextlib import contextmanager
-from datetime import date
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
+from dataclasses import dataclass, field, fields
+from itertools import islice
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime
 from decimal import Decimal
+import asyncio
 import logging
+import re
+import threading
+import time
+from write_journal import WriteBehindJournal, process_journal_path
+from replicas import ReplicaSet, mark_session_write, seconds_since_session_write
+from db_pool import (
+    ConnectionPools, QueryCancelled, QueryScope, ER_QUERY_INTERRUPTED,
+    current_query_scope, discard_prepared, prepared_cursor, record_query, run_in_scope,
+)
+from adherent_cache import AdherentHotSet, normalize_phone
+from circuit_breaker import CircuitBreaker, DatabaseUnavailable, OutcomeUnknown
+from shards import ShardMap, ShardMapError, ShardRange, parse_shards
 
 # Configurer le logging
 logger = logging.getLogger(__name__)
@@ -77,8 +93,142 @@ class SinistreArtex:
     date_survenance: Optional[date] = None
 
 
+# --- Résultats des traitements par lots ---
+
+@dataclass
+class BulkChunkResult:
+    chunk_index: int
+    submitted: int
+    updated: int = 0
+    error: Optional[str] = None
+    failed_ids: List[int] = field(default_factory=list)
+
+@dataclass
+class BulkUpdateReport:
+    chunks: List[BulkChunkResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    rejected_lines: List[Tuple[int, str]] = field(default_factory=list)  # (n° de ligne, motif) : entrées illisibles
+
+    @property
+    def submitted(self) -> int:
+        return sum(c.submitted for c in self.chunks)
+
+    @property
+    def updated(self) -> int:
+        return sum(c.updated for c in self.chunks)
+
+    @property
+    def failed_chunks(self) -> List[BulkChunkResult]:
+        return [c for c in self.chunks if c.error]
+
+
+# Colonnes de coordonnées modifiables par update_adherent_contact_info.
+CONTACT_COLUMNS = ("adresse", "code_postal", "ville", "telephone", "email")
+
+
+# --- Requêtes de lecture du pilote ---
+# Centralisées ici pour être préparées une fois par connexion, chronométrées sous leur nom
+# et vérifiées par check_query_plans.py (plans d'exécution et index requis : sql/002_query_indexes.sql).
+QUERIES: Dict[str, str] = {
+    "get_adherent_by_id": "SELECT * FROM adherents WHERE id_adherent = %s",
+    "get_adherent_by_email": "SELECT * FROM adherents WHERE email = %s",
+    # Recherche par suffixe (formats internationaux) sur la colonne générée REVERSE(telephone) :
+    # le suffixe devient un préfixe et peut utiliser l'index, contrairement à LIKE '%...'.
+    # Le paramètre est le numéro normalisé (adherent_cache.normalize_phone), également clé du cache.
+    "get_adherents_by_telephone": "SELECT * FROM adherents WHERE telephone_inverse LIKE CONCAT(REVERSE(%s), '%')",
+    "get_adherents_by_fullname": "SELECT * FROM adherents WHERE nom = %s AND prenom = %s",
+    "get_contrats_by_adherent_id": "SELECT * FROM contrats WHERE id_adherent_principal = %s",
+    "get_contract_by_id": "SELECT * FROM contrats WHERE id_contrat = %s",
+    # Numéro de contrat dicté : partie numérique seule (colonne générée, voir sql/003_contract_number_index.sql).
+    "get_contract_by_number": "SELECT * FROM contrats WHERE id_adherent_principal = %s AND numero_contrat_num = %s",
+    "get_contract_owner": "SELECT id_adherent_principal FROM contrats WHERE id_contrat = %s",
+    "get_full_contract_details": """
+        SELECT c.*, f.nom_formule, f.tarif_base_mensuel, f.description_formule
+        FROM contrats c JOIN formules f ON c.id_formule = f.id_formule
+        WHERE c.id_contrat = %s
+    """,
+    "get_guarantees_for_formula": """
+        SELECT g.libelle, g.description, fg.*
+        FROM formules_garanties fg JOIN garanties g ON fg.id_garantie = g.id_garantie
+        WHERE fg.id_formule = %s
+    """,
+    "get_specific_guarantee_detail": """
+        SELECT g.libelle, g.description, fg.*
+        FROM formules_garanties fg JOIN garanties g ON fg.id_garantie = g.id_garantie
+        WHERE fg.id_formule = %s AND g.libelle LIKE %s
+    """,
+    "get_sinistres_by_adherent_id": "SELECT * FROM sinistres_artex WHERE id_adherent = %s",
+    "get_sinistre_by_id": "SELECT * FROM sinistres_artex WHERE id_sinistre_artex = %s",
+    "get_sinistre_by_request_key": "SELECT * FROM sinistres_artex WHERE request_key = %s",
+    "iter_sinistres": "SELECT * FROM sinistres_artex",
+    "iter_sinistres_by_statut": "SELECT * FROM sinistres_artex WHERE statut_sinistre_artex = %s",
+    "get_sinistre_events": """
+        SELECT event_type, statut, note, created_at FROM audit_events
+        WHERE entity_type = 'sinistre' AND entity_id = %s
+        ORDER BY created_at
+    """,
+    # Mode shardé (DB_SHARDS) : base annuaire, voir sql/004_shard_directory.sql.
+    "get_shard_ranges": "SELECT range_start, range_end, shard, moving FROM shard_ranges ORDER BY range_start",
+    "directory_by_email": "SELECT id_adherent FROM adherent_directory WHERE email = %s",
+    "directory_by_telephone": "SELECT id_adherent FROM adherent_directory WHERE telephone_inverse LIKE CONCAT(REVERSE(%s), '%')",
+    "directory_by_fullname": "SELECT id_adherent FROM adherent_directory WHERE nom = %s AND prenom = %s",
+    "directory_entity_owner": "SELECT id_adherent FROM entity_directory WHERE entity_type = %s AND entity_id = %s",
+    "get_formule": "SELECT nom_formule, tarif_base_mensuel, description_formule FROM formules WHERE id_formule = %s",
+}
+
+
+# Colonnes ajoutées par les migrations de sql/ dont dépendent les requêtes du pilote (check_schema()).
+REQUIRED_COLUMNS = {
+    ("adherents", "telephone_inverse"): "002_query_indexes.sql",
+    ("contrats", "numero_contrat_num"): "003_contract_number_index.sql",
+    ("sinistres_artex", "request_key"): "005_claim_request_key.sql",
+}
+# En mode shardé, la base annuaire porte l'index global des recherches.
+REQUIRED_DIRECTORY_COLUMNS = {("adherent_directory", "telephone_inverse"): "004_shard_directory.sql"}
+
+
+class SchemaError(RuntimeError):
+    """Migrations de sql/ manquantes : les requêtes du pilote échoueraient à chaque appel."""
+
+
 # --- Pilote de base de données pour toutes les tables 'extranet' ---
 
+# Délais serveur plus courts pour les lectures sur le chemin critique de la conversation.
+QUERY_TIMEOUT_OVERRIDES_MS = {
+    "get_adherents_by_telephone": 800,
+    "get_adherent_by_id": 800,
+    "directory_by_telephone": 800,
+}
+
+# Erreurs signifiant que la base est lente ou injoignable (et non une requête fautive) : elles comptent pour le disjoncteur.
+ER_QUERY_TIMEOUT = 3024
+OUTAGE_ERRNOS = {ER_QUERY_TIMEOUT, 1040, 1205, 2003, 2005, 2006, 2013, 2055}
+# Connexion perdue : une écriture en cours a pu être validée avant la coupure (résultat inconnu).
+CONNECTION_LOST_ERRNOS = {2006, 2013, 2055}
+# Transaction annulée par le serveur (interblocage) : rien n'est écrit, la demande peut être renouvelée.
+ER_LOCK_DEADLOCK = 1213
+
+
+def _is_transient_write_error(err: Exception) -> bool:
+    """Échec d'application du journal dû à la base (à réessayer), et non à l'entrée elle-même."""
+    return isinstance(err, DatabaseUnavailable) or isinstance(err, mysql.connector.Error) and _is_outage(err)
+
+
+def _is_outage(err: mysql.connector.Error) -> bool:
+    return err.errno in OUTAGE_ERRNOS or isinstance(err, (mysql.connector.errors.OperationalError,
+                                                           mysql.connector.errors.InterfaceError,
+                                                           mysql.connector.errors.PoolError))
+
+
+def _parse_timeouts(raw: str) -> Dict[str, int]:
+    """'get_adherent_by_id=500,get_sinistres_by_adherent_id=1500' -> {nom: ms}."""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, ms = item.partition("=")
+        timeouts[name.strip()] = int(ms)
+    return timeouts
+
+
 class ExtranetDatabaseDriver:
     """
     Gère toutes les connexions et opérations de base de données pour le système extranet.
@@ -98,81 +248,412 @@ class ExtranetDatabaseDriver:
 
         self.connection_params = {
             'host': db_host,
+            'port': int(os.getenv("DB_PORT", "3306")),
             'user': db_user,
             'password': db_password,
-            'database': db_name
+            'database': db_name,
+            'connection_timeout': int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "3")),
         }
+        # Délais : MAX_EXECUTION_TIME côté serveur pour chaque lecture (DB_QUERY_TIMEOUT_MS, surchargeable
+        # par requête via DB_QUERY_TIMEOUTS_MS="nom=ms,..."), et délai global par appel côté worker.
+        self.query_timeouts_ms = {name: int(os.getenv("DB_QUERY_TIMEOUT_MS", "2000")) for name in QUERIES}
+        self.query_timeouts_ms.update(QUERY_TIMEOUT_OVERRIDES_MS)
+        self.query_timeouts_ms.update(_parse_timeouts(os.getenv("DB_QUERY_TIMEOUTS_MS", "")))
+        self._timed_queries: Dict[str, str] = {}
+        self.call_timeout = float(os.getenv("DB_CALL_TIMEOUT_SECONDS", "3"))
+        self.write_timeout = float(os.getenv("DB_WRITE_TIMEOUT_SECONDS", "10"))
+        self.breaker = CircuitBreaker(
+            "mysql",
+            failure_threshold=int(os.getenv("DB_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("DB_BREAKER_RESET_SECONDS", "10")),
+        )
+        # Lectures couvertes (« hedged ») de la recherche par téléphone : sans réponse après DB_HEDGE_AFTER_MS,
+        # la même requête part sur un second réplica (ou le primaire) et la première réponse l'emporte.
+        hedge_after_ms = os.getenv("DB_HEDGE_AFTER_MS")
+        self.hedge_after: Optional[float] = float(hedge_after_ms) / 1000 if hedge_after_ms else None
+        # Suivi des connexions ouvertes simultanément (threads de préchargement compris),
+        # rapporté à DB_MAX_CONNECTIONS pour mesurer la saturation de la base.
+        self.max_connections = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        # Connexions réutilisées (un pool par serveur) pour conserver les instructions préparées.
+        self.pools = ConnectionPools(pool_size=int(os.getenv("DB_POOL_SIZE", "10")))
+        # Cache des adhérents récemment identifiés (appelants récurrents) ; ARTEX_HOTSET_MAX_ENTRIES=0 le désactive.
+        self.hot_set = AdherentHotSet(
+            max_entries=int(os.getenv("ARTEX_HOTSET_MAX_ENTRIES", "20000")),
+            max_bytes=int(os.getenv("ARTEX_HOTSET_MAX_MB", "64")) * 1024 * 1024,
+            ttl_seconds=float(os.getenv("ARTEX_HOTSET_TTL_SECONDS", "300")),
+        )
+
+        # Réplicas de lecture (optionnels) : DB_REPLICA_HOSTS="replica1,replica2:3307", mêmes identifiants que le primaire.
+        self.replicas: Optional[ReplicaSet] = None
+        replica_hosts = os.getenv("DB_REPLICA_HOSTS")
+        if replica_hosts:
+            self.replicas = ReplicaSet.from_hosts(
+                replica_hosts, self.connection_params,
+                max_lag=float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5")),
+                check_interval=float(os.getenv("DB_REPLICA_CHECK_INTERVAL_SECONDS", "5")),
+            )
+            self.replicas.start()
+
+        # Mode shardé (optionnel) : DB_SHARDS="shard0=db0:3306/artex,shard1=db1:3306/artex". La base DB_HOST/DB_NAME
+        # devient l'annuaire (plages par shard, index globaux, tables de référence) ; les lectures par shard
+        # vont au primaire du shard, les réplicas DB_REPLICA_HOSTS ne servent que l'annuaire.
+        self.shards: Optional[ShardMap] = None
+        shard_specs = os.getenv("DB_SHARDS")
+        if shard_specs:
+            self.shards = ShardMap(
+                parse_shards(shard_specs, self.connection_params), self._load_shard_ranges,
+                refresh_interval=float(os.getenv("DB_SHARD_MAP_REFRESH_SECONDS", "5")),
+            )
+
+        # Journal d'écritures différées (optionnel) : les mises à jour sont acquittées dès leur fsync local
+        # puis appliquées par lots à MySQL. Sans ARTEX_WRITE_JOURNAL, elles sont appliquées immédiatement.
+        # Un fichier par worker (process_journal_path) ; seules les pannes de la base font rejouer un lot entier.
+        # Démarré en dernier : le rejeu au démarrage route les entrées avec la carte des shards.
+        self.journal: Optional[WriteBehindJournal] = None
+        journal_path = os.getenv("ARTEX_WRITE_JOURNAL")
+        if journal_path:
+            self.journal = WriteBehindJournal(process_journal_path(journal_path), self.apply_journal_batch,
+                                              is_transient=_is_transient_write_error)
+            self.journal.start()
         logger.info("Pilote de base de données initialisé avec les paramètres de connexion.")
 
     @contextmanager
-    def _get_connection(self):
-        """Fournit une connexion gérée à la base de données MySQL."""
+    def _get_connection(self, read_only: bool = False, server: Optional[Dict[str, Any]] = None):
+        """
+        Fournit une connexion gérée à la base de données MySQL.
+        Avec `read_only=True`, la connexion peut être ouverte sur un réplica de lecture ;
+        `server` impose un serveur précis (lectures couvertes).
+        """
         conn = None
+        with self._in_flight_lock:
+            self._in_flight += 1
         try:
-            conn = mysql.connector.connect(**self.connection_params)
+            conn = self.pools.connect(server) if server is not None else self._connect(read_only)
             yield conn
         except mysql.connector.Error as err:
-            logger.error(f"Erreur de connexion à la base de données : {err}")
+            logger.error("Erreur de connexion à la base de données : %s", err)
             raise # Relancer l'exception après l'avoir journalisée
         finally:
-            if conn and conn.is_connected():
+            if conn is not None:
+                conn.close()  # Retour au pool (sans ping : le pool vérifie la connexion à la prochaine sortie)
+            with self._in_flight_lock:
+                self._in_flight -= 1
+
+    def _connect(self, read_only: bool):
+        """Ouvre une connexion sur un réplica éligible pour les lectures, sinon sur le primaire."""
+        if read_only and self.replicas is not None:
+            replica = self.replicas.choose(seconds_since_session_write())
+            if replica is not None:
+                try:
+                    return self.pools.connect(replica.params)
+                except mysql.connector.Error as err:
+                    replica.mark_down(err)  # Bascule immédiate sur le primaire
+        return self.pools.connect(self.connection_params)
+
+    async def run(self, method, *args, timeout: Optional[float] = None, write: bool = False):
+        """
+        Exécute une méthode bloquante du pilote dans un thread, de façon annulable : si l'appel d'outil
+        est annulé (l'appelant a interrompu l'agent), la requête de lecture en cours est interrompue par
+        KILL QUERY et sa connexion retourne au pool. Les écritures, elles, vont à leur terme.
+
+        L'appel est borné par `timeout` (par défaut DB_CALL_TIMEOUT_SECONDS) et passe par le disjoncteur :
+        délai dépassé, base injoignable ou disjoncteur ouvert lèvent DatabaseUnavailable. Pour une écriture
+        (`write`), un délai dépassé ou une connexion perdue lèvent OutcomeUnknown : l'écriture n'est jamais
+        interrompue par KILL QUERY et peut encore être validée. Un interblocage lève DatabaseUnavailable
+        sans compter pour le disjoncteur.
+        """
+        self.breaker.before_call()
+        scope = QueryScope()
+        try:
+            result = await asyncio.wait_for(asyncio.to_thread(run_in_scope, scope, method, *args),
+                                            timeout or self.call_timeout)
+        except asyncio.TimeoutError as err:
+            if not write:
+                self._abandon(scope)
+            unavailable = (OutcomeUnknown if write else DatabaseUnavailable)(
+                f"{getattr(method, '__name__', method)} : délai dépassé")
+            self.breaker.record_failure(unavailable)
+            raise unavailable from err
+        except asyncio.CancelledError:
+            if not write:
+                self._abandon(scope)
+            self.breaker.release()
+            raise
+        except mysql.connector.Error as err:
+            if _is_outage(err):
+                self.breaker.record_failure(err)
+                lost = write and err.errno in CONNECTION_LOST_ERRNOS
+                raise (OutcomeUnknown if lost else DatabaseUnavailable)(str(err)) from err
+            self.breaker.release()
+            if err.errno == ER_LOCK_DEADLOCK:
+                raise DatabaseUnavailable(str(err)) from err
+            raise
+        except Exception:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def run_write(self, method, *args):
+        """`run` pour une écriture : délai DB_WRITE_TIMEOUT_SECONDS, OutcomeUnknown s'il est dépassé."""
+        return await self.run(method, *args, timeout=self.write_timeout, write=True)
+
+    def _abandon(self, scope: QueryScope):
+        # KILL QUERY hors de la boucle : l'annulation est rendue immédiatement à l'appelant.
+        threading.Thread(target=scope.cancel, args=(self._kill_query,), name="artex-kill-query", daemon=True).start()
+
+    def _kill_query(self, connection_id: int, params: Dict[str, Any]):
+        try:
+            conn = self.pools.connect(params)
+            try:
+                conn.cursor().execute(f"KILL QUERY {int(connection_id)}")
+            finally:
                 conn.close()
+            logger.info("Requête interrompue sur %s (session %s) : appel d'outil annulé.", params["host"], connection_id)
+        except mysql.connector.Error as err:
+            logger.warning("KILL QUERY %s sur %s impossible : %s", connection_id, params["host"], err)
 
-    def _map_row(self, row: tuple, cursor, dataclass_type):
-        """Utilitaire pour mapper une seule ligne de base de données à une instance de dataclass."""
+    def check_schema(self):
+        """
+        Vérifie au démarrage du worker que les migrations requises par le pilote sont appliquées, sur le primaire
+        ou sur chaque shard et l'annuaire. Lève SchemaError en nommant les fichiers de sql/ à appliquer.
+        Une base injoignable n'est pas une erreur de schéma : la vérification est alors ignorée (journalisée).
+        Désactivable avec ARTEX_SCHEMA_CHECK=0.
+        """
+        if os.getenv("ARTEX_SCHEMA_CHECK", "1") == "0":
+            return
+        targets = [(self.connection_params, REQUIRED_COLUMNS)] if self.shards is None else \
+            [(self.connection_params, REQUIRED_DIRECTORY_COLUMNS)] + [(server, REQUIRED_COLUMNS) for _, server in self.shards.servers()]
+        missing: Dict[str, set] = {}
+        for server, required in targets:
+            try:
+                with self._get_connection(server=server) as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(f"""SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS
+                                       WHERE TABLE_SCHEMA = DATABASE()
+                                       AND COLUMN_NAME IN ({', '.join(['%s'] * len(required))})""",
+                                   tuple(column for _, column in required))
+                    present = set(cursor.fetchall())
+            except mysql.connector.Error as err:
+                logger.warning("Vérification du schéma ignorée sur %s : %s", server["host"], err)
+                continue
+            for key, migration in required.items():
+                if key not in present:
+                    missing.setdefault(f"{server['host']}:{server.get('port', 3306)}/{server['database']}", set()).add(migration)
+        if missing:
+            raise SchemaError("migrations manquantes (voir README, « Migrations de la base ») : " + "; ".join(
+                f"{target} : {', '.join(sorted(files))}" for target, files in missing.items()))
+        logger.info("Schéma vérifié : migrations requises présentes.")
+
+    def pool_saturation(self) -> float:
+        """Ratio des connexions en cours sur le maximum configuré (1.0 = base saturée)."""
+        return self._in_flight / self.max_connections
+
+    def _map_row(self, row: Optional[Dict[str, Any]], dataclass_type):
+        """Utilitaire pour mapper une seule ligne de base de données (dictionnaire) à une instance de dataclass."""
         if not row:
             return None
         
-        column_names = [desc[0] for desc in cursor.description]
-        row_dict = dict(zip(column_names, row))
-        
         # Filtrer le dictionnaire pour n'inclure que les clés qui sont des champs dans la dataclass
         dataclass_fields = {f.name for f in fields(dataclass_type)}
-        filtered_dict = {k: v for k, v in row_dict.items() if k in dataclass_fields}
+        filtered_dict = {k: v for k, v in row.items() if k in dataclass_fields}
         
         return dataclass_type(**filtered_dict)
 
-    def _map_rows(self, rows: List[tuple], cursor, dataclass_type):
+    def _map_rows(self, rows: List[Dict[str, Any]], dataclass_type):
         """Utilitaire pour mapper plusieurs lignes de base de données à une liste d'instances de dataclass."""
         if not rows:
             return []
-        return [self._map_row(row, cursor, dataclass_type) for row in rows]
+        return [self._map_row(row, dataclass_type) for row in rows]
+
+    def _timed_query(self, name: str) -> str:
+        """QUERIES[name] avec l'indication MAX_EXECUTION_TIME : le serveur abandonne lui-même une lecture trop longue."""
+        query = self._timed_queries.get(name)
+        if query is None:
+            hint = f"SELECT /*+ MAX_EXECUTION_TIME({self.query_timeouts_ms[name]}) */"
+            query = re.sub(r"^\s*SELECT\b", hint, QUERIES[name], count=1, flags=re.IGNORECASE)
+            self._timed_queries[name] = query
+        return query
+
+    def _fetch_all(self, name: str, params: tuple, dataclass_type=None, server: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """
+        Exécute la requête de lecture QUERIES[name] via une instruction préparée réutilisée sur la connexion
+        du pool, et enregistre son temps dans la table des temps par requête (db_pool.render_query_timings()).
+        """
+        query = self._timed_query(name)
+        scope = current_query_scope()
+        with self._get_connection(read_only=True, server=server) as conn:
+            if scope is not None:
+                scope.attach(conn)
+            try:
+                started = time.perf_counter()
+                cursor = prepared_cursor(conn, query)
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+                record_query(name, started, len(rows))
+            except mysql.connector.Error as err:
+                if scope is not None and scope.cancelled and err.errno == ER_QUERY_INTERRUPTED:
+                    discard_prepared(conn, query)
+                    raise QueryCancelled(name) from err
+                raise
+            finally:
+                if scope is not None:
+                    scope.detach()
+        return self._map_rows(rows, dataclass_type) if dataclass_type else rows
+
+    def _fetch_one(self, name: str, params: tuple, dataclass_type=None, server: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        rows = self._fetch_all(name, params, dataclass_type, server=server)
+        return rows[0] if rows else None
+
+    # --- Routage par shard (DB_SHARDS) ---
+
+    def _load_shard_ranges(self) -> List[ShardRange]:
+        # Sur le primaire de l'annuaire : après un déplacement, un réplica en retard renverrait l'ancienne carte.
+        rows = self._fetch_all("get_shard_ranges", (), server=self.connection_params)
+        return [ShardRange(r["range_start"], r["range_end"], r["shard"], bool(r["moving"])) for r in rows]
+
+    def _shard_server(self, adherent_id: int, for_write: bool = False) -> Optional[Dict[str, Any]]:
+        """Serveur du shard de l'adhérent ; None sans sharding (base unique et ses réplicas)."""
+        return self.shards.server_for(adherent_id, for_write) if self.shards is not None else None
+
+    def _owner(self, entity_type: str, entity_id: int) -> Optional[int]:
+        """Adhérent propriétaire d'un contrat ou d'un sinistre, d'après l'annuaire (mis en cache : il ne change pas)."""
+        cached = self.hot_set.get(("owner", entity_type, entity_id))
+        if cached is not None:
+            return cached
+        row = self._fetch_one("directory_entity_owner", (entity_type, entity_id))
+        if row is None:
+            return None
+        self.hot_set.put(("owner", entity_type, entity_id), row["id_adherent"])
+        return row["id_adherent"]
+
+    def _fetch_entity(self, entity_type: str, entity_id: int, name: str, params: tuple, dataclass_type=None) -> List[Any]:
+        """QUERIES[name] pour un contrat ou un sinistre désigné par son seul identifiant : sur le shard de son adhérent."""
+        server = None
+        if self.shards is not None:
+            owner = self._owner(entity_type, entity_id)
+            if owner is None:
+                return []
+            server = self.shards.server_for(owner)
+        return self._fetch_all(name, params, dataclass_type, server=server)
+
+    def _adherents_from_directory(self, name: str, params: tuple, server: Optional[Dict[str, Any]] = None) -> List[Adherent]:
+        """Recherche par index global (téléphone, e-mail, nom), puis lecture de chaque adhérent sur son shard."""
+        adherents = (self.get_adherent_by_id(row["id_adherent"]) for row in self._fetch_all(name, params, server=server))
+        return [adherent for adherent in adherents if adherent is not None]
+
+    def _index_entity(self, entity_type: str, entity_id: int, adherent_id: int):
+        with self._get_connection(server=self.connection_params) as conn:
+            conn.cursor().execute("REPLACE INTO entity_directory (entity_type, entity_id, id_adherent) VALUES (%s, %s, %s)",
+                                  (entity_type, entity_id, adherent_id))
+        self.hot_set.put(("owner", entity_type, entity_id), adherent_id)
+
+    def _owners(self, entity_type: str, entity_ids: List[int]) -> Dict[int, int]:
+        """Propriétaires d'un lot d'entités en une requête (traitements par lots)."""
+        if not entity_ids:
+            return {}
+        with self._get_connection(server=self.connection_params) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT entity_id, id_adherent FROM entity_directory WHERE entity_type = %s "
+                           f"AND entity_id IN ({', '.join(['%s'] * len(entity_ids))})", (entity_type, *entity_ids))
+            return dict(cursor.fetchall())
 
     # --- Méthodes Adherent ---
 
     def get_adherent_by_id(self, adherent_id: int) -> Optional[Adherent]:
         """Récupère un seul adhérent par son ID unique."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM adherents WHERE id_adherent = %s", (adherent_id,))
-            return self._map_row(cursor.fetchone(), cursor, Adherent)
+        cached = self.hot_set.get(("adherent", adherent_id))
+        if cached is not None:
+            return cached
+        adherent = self._fetch_one("get_adherent_by_id", (adherent_id,), Adherent, server=self._shard_server(adherent_id))
+        if adherent is not None:
+            self.hot_set.put(("adherent", adherent_id), adherent)
+        return adherent
 
     def get_adherent_by_email(self, email: str) -> Optional[Adherent]:
         """Récupère un seul adhérent par son adresse e-mail."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM adherents WHERE email = %s", (email,))
-            return self._map_row(cursor.fetchone(), cursor, Adherent)
+        if self.shards is not None:
+            return next(iter(self._adherents_from_directory("directory_by_email", (email,))), None)
+        return self._fetch_one("get_adherent_by_email", (email,), Adherent)
 
     def get_adherents_by_telephone(self, telephone: str) -> List[Adherent]:
-        """Récupère une liste d'adhérents par leur numéro de téléphone."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            # Recherche les numéros qui se terminent par la chaîne de téléphone fournie pour gérer les formats internationaux
-            cursor.execute("SELECT * FROM adherents WHERE telephone LIKE %s", (f"%{telephone}",))
-            return self._map_rows(cursor.fetchall(), cursor, Adherent)
+        """
+        Récupère une liste d'adhérents par leur numéro de téléphone (servie depuis le cache pour les appelants récurrents).
+        La requête et le cache utilisent le même numéro normalisé : ils ne peuvent pas répondre différemment.
+        """
+        telephone = normalize_phone(telephone)
+        if not telephone:
+            return []  # Aucun chiffre : LIKE '%' renverrait tous les adhérents
+        cached = self.hot_set.get_by_phone(telephone)
+        if cached is not None:
+            return cached
+        adherents = self._fetch_adherents_by_telephone_on(None, telephone)
+        self.hot_set.put_phone(telephone, adherents)
+        return adherents
+
+    def _fetch_adherents_by_telephone_on(self, server: Optional[Dict[str, Any]], telephone: str) -> List[Adherent]:
+        if self.shards is not None:
+            return self._adherents_from_directory("directory_by_telephone", (telephone,), server=server)
+        return self._fetch_all("get_adherents_by_telephone", (telephone,), Adherent, server=server)
+
+    async def get_adherents_by_telephone_hedged(self, telephone: str) -> List[Adherent]:
+        """
+        Recherche par téléphone (début d'appel, critique pour la latence) avec lecture couverte : si le premier
+        réplica n'a pas répondu après DB_HEDGE_AFTER_MS, la requête est relancée sur un second réplica (ou le
+        primaire) ; la première réponse est retenue et la requête perdante est interrompue.
+        Sans réplicas ni DB_HEDGE_AFTER_MS, équivaut à `run(get_adherents_by_telephone)`.
+        """
+        telephone = normalize_phone(telephone)
+        if not telephone:
+            return []
+        cached = self.hot_set.get_by_phone(telephone)
+        if cached is not None:
+            return cached
+        since_write = seconds_since_session_write()
+        first = self.replicas.choose(since_write) if self.replicas is not None and self.hedge_after else None
+        if first is None:
+            return await self.run(self.get_adherents_by_telephone, telephone)
+
+        tasks = [asyncio.ensure_future(self.run(self._fetch_adherents_by_telephone_on, first.params, telephone))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done:
+                second = self.replicas.choose(since_write, exclude=first)
+                target = second.params if second is not None else self.connection_params
+                logger.info("Lecture couverte de la recherche par téléphone sur %s.", target["host"])
+                tasks.append(asyncio.ensure_future(self.run(self._fetch_adherents_by_telephone_on, target, telephone)))
+            last_error: Optional[BaseException] = None
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    adherents = await next_done
+                    break
+                except (DatabaseUnavailable, mysql.connector.Error) as err:
+                    last_error = err
+            else:
+                raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()  # run() interrompt la requête perdante
+        self.hot_set.put_phone(telephone, adherents)
+        return adherents
 
     def get_adherents_by_fullname(self, nom: str, prenom: str) -> List[Adherent]:
         """Récupère une liste d'adhérents par leur nom complet."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM adherents WHERE nom = %s AND prenom = %s", (nom, prenom))
-            return self._map_rows(cursor.fetchall(), cursor, Adherent)
+        if self.shards is not None:
+            return self._adherents_from_directory("directory_by_fullname", (nom, prenom))
+        return self._fetch_all("get_adherents_by_fullname", (nom, prenom), Adherent)
 
     def update_adherent_contact_info(self, adherent_id: int, address: Optional[str] = None, 
                                      code_postal: Optional[str] = None, ville: Optional[str] = None, 
                                      telephone: Optional[str] = None, email: Optional[str] = None) -> bool:
-        """Met à jour les informations de contact pour un adhérent donné."""
+        """
+        Met à jour les informations de contact pour un adhérent donné et trace le changement dans audit_events.
+        Avec le journal d'écritures différées, le succès signifie que la mise à jour est enregistrée durablement
+        et sera appliquée au prochain vidage.
+        """
         fields_to_update = {
             "adresse": address, "code_postal": code_postal, "ville": ville,
             "telephone": telephone, "email": email
@@ -181,143 +662,378 @@ class ExtranetDatabaseDriver:
         
         if not updates: return False
 
-        set_clause = ", ".join([f"{key} = %s" for key in updates.keys()])
-        query = f"UPDATE adherents SET {set_clause} WHERE id_adherent = %s"
-        values = list(updates.values()) + [adherent_id]
-
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute(query, tuple(values))
-                conn.commit()
-                return cursor.rowcount > 0
-            except mysql.connector.Error as err:
-                logger.error(f"Échec de la mise à jour des informations de contact pour l'adhérent {adherent_id} : {err}")
-                conn.rollback()
-                return False
+        return self._write("contact_update", adherent_id=adherent_id, fields=updates)
 
     # --- Méthodes Contrat & Formule ---
 
     def get_contrats_by_adherent_id(self, adherent_id: int) -> List[Contrat]:
         """Récupère tous les contrats pour un ID d'adhérent donné."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM contrats WHERE id_adherent_principal = %s", (adherent_id,))
-            return self._map_rows(cursor.fetchall(), cursor, Contrat)
+        cached = self.hot_set.get(("contrats", adherent_id))
+        if cached is not None:
+            return cached
+        contrats = self._fetch_all("get_contrats_by_adherent_id", (adherent_id,), Contrat, server=self._shard_server(adherent_id))
+        if contrats:
+            self.hot_set.put(("contrats", adherent_id), contrats)
+        return contrats
 
     def get_contract_by_id(self, contract_id: int) -> Optional[Contrat]:
         """Récupère un seul contrat par son ID unique."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM contrats WHERE id_contrat = %s", (contract_id,))
-            return self._map_row(cursor.fetchone(), cursor, Contrat)
+        return next(iter(self._fetch_entity("contrat", contract_id, "get_contract_by_id", (contract_id,), Contrat)), None)
+
+    def get_contract_by_number(self, adherent_id: int, number: int) -> Optional[Contrat]:
+        """
+        Récupère un contrat de l'adhérent par la partie numérique de son numéro (CONTR00024 -> 24),
+        telle que renvoyée par contract_numbers.parse_contract_number().
+        """
+        return self._fetch_one("get_contract_by_number", (adherent_id, number), Contrat, server=self._shard_server(adherent_id))
 
     def get_full_contract_details(self, contract_id: int) -> Optional[Dict[str, Any]]:
         """Récupère les détails combinés du contrat et de la formule pour un ID de contrat donné."""
-        query = """
-            SELECT c.*, f.nom_formule, f.tarif_base_mensuel, f.description_formule
-            FROM contrats c JOIN formules f ON c.id_formule = f.id_formule
-            WHERE c.id_contrat = %s
-        """
-        with self._get_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, (contract_id,))
-            return cursor.fetchone()
+        if self.shards is None:
+            return self._fetch_one("get_full_contract_details", (contract_id,))
+        # Mode shardé : le contrat est sur le shard de l'adhérent, la formule dans l'annuaire (tables de référence).
+        rows = self._fetch_entity("contrat", contract_id, "get_contract_by_id", (contract_id,))
+        if not rows:
+            return None
+        formule = self._fetch_one("get_formule", (rows[0]["id_formule"],))
+        return {**rows[0], **formule} if formule else None
 
     # --- Méthodes Garantie (Couverture) ---
 
     def get_guarantees_for_formula(self, formula_id: int) -> List[Dict[str, Any]]:
         """Récupère toutes les garanties avec leurs termes pour une formule spécifique."""
-        query = """
-            SELECT g.libelle, g.description, fg.*
-            FROM formules_garanties fg JOIN garanties g ON fg.id_garantie = g.id_garantie
-            WHERE fg.id_formule = %s
-        """
-        with self._get_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, (formula_id,))
-            return cursor.fetchall()
+        return self._fetch_all("get_guarantees_for_formula", (formula_id,))
 
     def get_specific_guarantee_detail(self, formula_id: int, guarantee_name: str) -> Optional[Dict[str, Any]]:
         """Récupère les détails d'une garantie spécifique unique au sein d'une formule."""
-        query = """
-            SELECT g.libelle, g.description, fg.*
-            FROM formules_garanties fg JOIN garanties g ON fg.id_garantie = g.id_garantie
-            WHERE fg.id_formule = %s AND g.libelle LIKE %s
-        """
-        with self._get_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, (formula_id, f"%{guarantee_name}%"))
-            return cursor.fetchone()
+        return self._fetch_one("get_specific_guarantee_detail", (formula_id, f"%{guarantee_name}%"))
 
     # --- Méthodes Sinistre ---
 
     def get_sinistres_by_adherent_id(self, adherent_id: int) -> List[SinistreArtex]:
         """Récupère tous les sinistres déclarés par un adhérent spécifique."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM sinistres_artex WHERE id_adherent = %s", (adherent_id,))
-            return self._map_rows(cursor.fetchall(), cursor, SinistreArtex)
+        return self._fetch_all("get_sinistres_by_adherent_id", (adherent_id,), SinistreArtex, server=self._shard_server(adherent_id))
 
     def get_sinistre_by_id(self, sinistre_id: int) -> Optional[SinistreArtex]:
         """Récupère un seul sinistre par son ID unique."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM sinistres_artex WHERE id_sinistre_artex = %s", (sinistre_id,))
-            return self._map_row(cursor.fetchone(), cursor, SinistreArtex)
+        return next(iter(self._fetch_entity("sinistre", sinistre_id, "get_sinistre_by_id", (sinistre_id,), SinistreArtex)), None)
 
     def create_sinistre(self, id_contrat: int, id_adherent: int, type_sinistre: str,
-                        description_sinistre: str, date_survenance: date) -> Optional[SinistreArtex]:
-        """Crée un nouveau sinistre dans la base de données après validation de la propriété."""
-        with self._get_connection() as conn:
+                        description_sinistre: str, date_survenance: date,
+                        request_key: Optional[str] = None) -> Optional[SinistreArtex]:
+        """
+        Crée un nouveau sinistre dans la base de données après validation de la propriété.
+        En mode shardé, le sinistre est créé sur le shard de l'adhérent puis inscrit dans l'annuaire.
+        Idempotent par `request_key` : une déclaration relancée avec la même clé (confirmation perdue sur
+        délai dépassé) retourne le sinistre déjà créé au lieu d'en créer un second.
+        """
+        server = self._shard_server(id_adherent, for_write=True)
+        with self._get_connection(server=server) as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute("SELECT id_adherent_principal FROM contrats WHERE id_contrat = %s", (id_contrat,))
+                conn.start_transaction()
+                cursor.execute(QUERIES["get_contract_owner"], (id_contrat,))
                 result = cursor.fetchone()
                 if not result or result[0] != id_adherent:
-                    logger.warning(f"Tentative de création de sinistre pour le contrat {id_contrat} par l'adhérent non principal {id_adherent}.")
+                    logger.warning("Tentative de création de sinistre pour le contrat %s par l'adhérent non principal %s.", id_contrat, id_adherent)
+                    conn.rollback()  # Ne pas rendre au pool une connexion avec une transaction ouverte
                     return None
 
                 query = """
                     INSERT INTO sinistres_artex (id_contrat, id_adherent, type_sinistre, date_declaration_agent, 
-                                                 statut_sinistre_artex, description_sinistre, date_survenance)
-                    VALUES (%s, %s, %s, CURDATE(), %s, %s, %s)
+                                                 statut_sinistre_artex, description_sinistre, date_survenance, request_key)
+                    VALUES (%s, %s, %s, CURDATE(), %s, %s, %s, %s)
                 """
                 initial_status = "Soumis" # Statut initial
                 values = (id_contrat, id_adherent, type_sinistre,
-                          initial_status, description_sinistre, date_survenance)
+                          initial_status, description_sinistre, date_survenance, request_key)
                 
-                cursor.execute(query, values)
+                try:
+                    cursor.execute(query, values)
+                except mysql.connector.IntegrityError as err:
+                    if request_key is None or err.errno != 1062:
+                        raise
+                    # Déjà créé par une tentative précédente de la même déclaration.
+                    conn.rollback()
+                    mark_session_write()
+                    logger.info("Sinistre de la requête %s déjà créé : pas de doublon.", request_key)
+                    return self._fetch_one("get_sinistre_by_request_key", (request_key,), SinistreArtex, server=server)
                 new_id = cursor.lastrowid
                 conn.commit()
-                logger.info(f"Sinistre créé avec succès avec l'ID : {new_id}")
-                return self.get_sinistre_by_id(new_id)
+                mark_session_write()  # La relecture ci-dessous et les suivantes de l'appel iront sur le primaire
+                logger.info("Sinistre créé avec succès avec l'ID : %s", new_id)
+                if self.shards is not None:
+                    try:
+                        self._index_entity("sinistre", new_id, id_adherent)
+                    except mysql.connector.Error as err:
+                        # Hors transaction (autre serveur) : rattrapé par rebalance_shards.py rebuild-index.
+                        logger.error("Sinistre %s non inscrit dans l'annuaire : %s", new_id, err)
+                return self._fetch_one("get_sinistre_by_id", (new_id,), SinistreArtex, server=server)
 
             except mysql.connector.Error as err:
-                logger.error(f"Erreur de base de données lors de la création du sinistre : {err}")
-                conn.rollback()
-                return None
+                # Relancée : run() la traduit en DatabaseUnavailable/OutcomeUnknown et le disjoncteur la compte.
+                # None est réservé au refus de propriété ci-dessus.
+                logger.error("Erreur de base de données lors de la création du sinistre : %s", err)
+                try:
+                    conn.rollback()
+                except mysql.connector.Error:
+                    pass  # Connexion perdue : le serveur a déjà annulé la transaction
+                raise
 
     def update_sinistre_status(self, sinistre_id: int, new_status: str, notes: Optional[str] = None) -> bool:
-        """Met à jour le statut d'un sinistre et ajoute éventuellement des notes."""
-        with self._get_connection() as conn:
+        """
+        Met à jour le statut d'un sinistre. Les notes sont ajoutées à audit_events au lieu d'être concaténées
+        dans description_sinistre, dont la taille reste ainsi constante.
+        """
+        return self._write("sinistre_status", sinistre_id=sinistre_id, status=new_status, note=notes)
+
+    def bulk_update_sinistre_status(self, updates: Iterable[Tuple[int, str, Optional[str]]],
+                                    chunk_size: int = 5000) -> BulkUpdateReport:
+        """
+        Met à jour le statut d'un grand nombre de sinistres (traitements de nuit du service sinistres).
+        `updates` est un itérable de (id_sinistre, nouveau_statut, note) consommé au fil de l'eau.
+        Une seule connexion (une par shard en mode shardé) ; une transaction par lot : les statuts sont chargés dans une table temporaire
+        par INSERT multi-lignes puis appliqués par un seul UPDATE ... JOIN, et les événements d'audit des sinistres
+        existants sont insérés en masse par INSERT ... SELECT sur la même jointure. Un lot en erreur est annulé et signalé sans interrompre les suivants.
+        """
+        report = BulkUpdateReport()
+        started = datetime.now()
+        iterator = iter(updates)
+        with ExitStack() as stack:
+            cursors: Dict[str, Any] = {}
+
+            def cursor_for(shard: str, server: Optional[Dict[str, Any]]):
+                if shard not in cursors:
+                    conn = stack.enter_context(self._get_connection(server=server))
+                    cursor = conn.cursor()
+                    cursor.execute("""
+                        CREATE TEMPORARY TABLE IF NOT EXISTS tmp_bulk_statut (
+                            id_sinistre_artex INT PRIMARY KEY,
+                            statut VARCHAR(50) NOT NULL,
+                            note TEXT NULL
+                        ) ENGINE=InnoDB
+                    """)
+                    cursors[shard] = (conn, cursor)
+                return cursors[shard]
+
+            chunk_index = 0
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                for shard, server, part, reason in self._split_by_shard(chunk):
+                    result = BulkChunkResult(chunk_index=chunk_index, submitted=len(part))
+                    chunk_index += 1
+                    report.chunks.append(result)
+                    if shard is None:
+                        result.error = reason
+                        result.failed_ids = [sinistre_id for sinistre_id, _, _ in part]
+                        logger.error("Lot %s de mise à jour des statuts non routé (%s sinistres) : %s", result.chunk_index, len(part), reason)
+                        continue
+                    try:
+                        conn, cursor = cursor_for(shard, server)
+                    except mysql.connector.Error as err:
+                        result.error = f"shard {shard} injoignable : {err}"
+                        result.failed_ids = [sinistre_id for sinistre_id, _, _ in part]
+                        logger.error("Lot %s de mise à jour des statuts en échec (%s sinistres) : %s", result.chunk_index, len(part), result.error)
+                        continue
+                    ts = datetime.now().isoformat(timespec="milliseconds")
+                    try:
+                        conn.start_transaction()
+                        cursor.execute("DELETE FROM tmp_bulk_statut")
+                        cursor.executemany(
+                            """INSERT INTO tmp_bulk_statut (id_sinistre_artex, statut, note) VALUES (%s, %s, %s)
+                               ON DUPLICATE KEY UPDATE statut = VALUES(statut), note = VALUES(note)""",
+                            part)
+                        cursor.execute("""
+                            UPDATE sinistres_artex s JOIN tmp_bulk_statut t ON s.id_sinistre_artex = t.id_sinistre_artex
+                            SET s.statut_sinistre_artex = t.statut
+                        """)
+                        result.updated = cursor.rowcount
+                        # Événements d'audit pour les seuls sinistres existants (même jointure que l'UPDATE).
+                        cursor.execute("""
+                            INSERT IGNORE INTO audit_events
+                                (journal_id, entity_type, entity_id, event_type, statut, note, payload, created_at)
+                            SELECT REPLACE(UUID(), '-', ''), 'sinistre', t.id_sinistre_artex, 'status_change', t.statut, t.note, NULL, %s
+                            FROM tmp_bulk_statut t JOIN sinistres_artex s ON s.id_sinistre_artex = t.id_sinistre_artex
+                        """, (ts,))
+                        conn.commit()
+                    except mysql.connector.Error as err:
+                        conn.rollback()
+                        result.error = str(err)
+                        result.failed_ids = [sinistre_id for sinistre_id, _, _ in part]
+                        logger.error("Lot %s de mise à jour des statuts en échec (%s sinistres) : %s", result.chunk_index, len(part), err)
+            for _, cursor in cursors.values():
+                cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_bulk_statut")
+        report.elapsed_seconds = (datetime.now() - started).total_seconds()
+        return report
+
+    def _split_by_shard(self, chunk: List[Tuple[int, str, Optional[str]]]):
+        """
+        Répartit un lot de (id_sinistre, statut, note) par shard : [(shard, serveur, sous-lot, motif)].
+        Sans sharding, le lot entier sur le primaire. Les sinistres qui ne peuvent pas être routés (absents de
+        l'annuaire, hors de toute plage, plage en cours de déplacement, annuaire injoignable) forment des sous-lots
+        de shard None, signalés en échec avec leur motif : les autres lots du traitement continuent.
+        """
+        if self.shards is None:
+            return [("primaire", None, chunk, None)]
+        try:
+            owners = self._owners("sinistre", [sinistre_id for sinistre_id, _, _ in chunk])
+        except (mysql.connector.Error, DatabaseUnavailable) as err:
+            return [(None, None, chunk, f"annuaire injoignable : {err}")]
+        parts: Dict[Tuple[Optional[str], Optional[str]], list] = {}
+        for update in chunk:
+            shard, reason = None, None
+            owner = owners.get(update[0])
+            if owner is None:
+                reason = "sinistres absents de l'annuaire"
+            else:
+                try:
+                    shard_range = self.shards.range_for(owner)
+                except ShardMapError:
+                    reason = "adhérents hors de la carte des shards (plage manquante ou shard inconnu de DB_SHARDS)"
+                except (mysql.connector.Error, DatabaseUnavailable) as err:
+                    reason = f"carte des shards illisible : {err}"
+                else:
+                    if shard_range.moving:
+                        reason = "sinistres en cours de déplacement entre shards"
+                    else:
+                        shard = shard_range.shard
+            parts.setdefault((shard, reason), []).append(update)
+        return [(shard, self.shards.shards.get(shard), part, reason) for (shard, reason), part in parts.items()]
+
+    def iter_sinistres(self, statut: Optional[str] = None, batch_size: int = 1000) -> Iterator[SinistreArtex]:
+        """
+        Parcourt les sinistres (éventuellement filtrés par statut) avec un curseur non bufferisé :
+        les lignes sont lues du serveur par paquets de `batch_size`, sans tout charger en mémoire.
+        Destiné aux listings volumineux du back-office ; la connexion reste occupée pendant le parcours.
+        En mode shardé, les shards sont parcourus l'un après l'autre.
+        """
+        query, params = QUERIES["iter_sinistres"], ()
+        if statut is not None:
+            query, params = QUERIES["iter_sinistres_by_statut"], (statut,)
+        servers = [server for _, server in self.shards.servers()] if self.shards is not None else [None]
+        for server in servers:
+            yield from self._iter_sinistres_on(server, query, params, batch_size)
+
+    def _iter_sinistres_on(self, server: Optional[Dict[str, Any]], query: str, params: tuple,
+                           batch_size: int) -> Iterator[SinistreArtex]:
+        with self._get_connection(read_only=True, server=server) as conn:
+            started = time.perf_counter()
+            cursor = conn.cursor(buffered=False, dictionary=True)
+            count, exhausted = 0, False
+            cursor.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        exhausted = True
+                        break
+                    count += len(rows)
+                    yield from self._map_rows(rows, SinistreArtex)
+            finally:
+                if not exhausted:
+                    cursor.fetchall()  # Parcours interrompu : vider le résultat avant de rendre la connexion
+                cursor.close()
+                record_query("iter_sinistres", started, count)
+
+    def get_sinistre_events(self, sinistre_id: int) -> List[Dict[str, Any]]:
+        """Récupère l'historique (statuts et notes) d'un sinistre, du plus ancien au plus récent."""
+        return self._fetch_entity("sinistre", sinistre_id, "get_sinistre_events", (sinistre_id,))
+
+    # --- Écritures journalisées ---
+
+    def _write(self, kind: str, **fields) -> bool:
+        """Passe par le journal d'écritures différées s'il est actif, sinon applique immédiatement."""
+        mark_session_write()
+        if self.journal is not None:
+            self.journal.append(kind, **fields)
+            return True
+        entry = {"id": uuid.uuid4().hex, "kind": kind, "ts": datetime.now().isoformat(timespec="milliseconds"), **fields}
+        try:
+            return self.apply_journal_batch([entry]) > 0
+        except mysql.connector.Error as err:
+            # Relancée : False signifie « aucune ligne concernée », pas « base en erreur » (voir run()).
+            logger.error("Échec de l'écriture %s %s : %s", kind, fields, err)
+            raise
+
+    def apply_journal_batch(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Applique un lot d'entrées du journal en une seule transaction : mises à jour des lignes chaudes
+        puis insertion groupée des événements d'audit. Retourne le nombre de lignes métier modifiées.
+        Idempotent : un rejeu n'insère pas d'événement en double (clé unique sur journal_id).
+        En mode shardé, une transaction par shard concerné : un lot partiellement appliqué est rejoué sans effet
+        de bord, et les changements de téléphone ou d'e-mail sont reportés ensuite dans l'index global.
+        Les adhérents modifiés sont retirés du cache une fois le lot appliqué : invalidés plus tôt (à l'ajout
+        au journal), ils seraient remis en cache depuis l'ancienne ligne par une lecture intermédiaire.
+        """
+        if self.shards is None:
+            changed = self._apply_entries(entries)
+            self._invalidate_contacts(entries)
+            return changed
+        by_shard: Dict[str, Tuple[Dict[str, Any], List[Dict[str, Any]]]] = {}
+        for entry in entries:
+            adherent_id = entry.get("adherent_id") or self._owner("sinistre", entry["sinistre_id"])
+            if adherent_id is None:
+                logger.warning("Entrée de journal ignorée (sinistre %s absent de l'annuaire).", entry.get("sinistre_id"))
+                continue
+            shard = self.shards.range_for(adherent_id).shard
+            by_shard.setdefault(shard, (self.shards.server_for(adherent_id, for_write=True), []))[1].append(entry)
+        changed = sum(self._apply_entries(shard_entries, server) for server, shard_entries in by_shard.values())
+        self._update_directory([e for e in entries if e["kind"] == "contact_update"])
+        self._invalidate_contacts(entries)
+        return changed
+
+    def _invalidate_contacts(self, entries: List[Dict[str, Any]]):
+        for entry in entries:
+            if entry["kind"] == "contact_update":
+                self.hot_set.invalidate_adherent(entry["adherent_id"])
+
+    def _update_directory(self, contact_updates: List[Dict[str, Any]]):
+        rows = [(e["fields"].get("telephone"), e["fields"].get("email"), e["adherent_id"]) for e in contact_updates
+                if "telephone" in e["fields"] or "email" in e["fields"]]
+        if not rows:
+            return
+        with self._get_connection(server=self.connection_params) as conn:
+            conn.cursor().executemany("""
+                UPDATE adherent_directory SET telephone = COALESCE(%s, telephone), email = COALESCE(%s, email)
+                WHERE id_adherent = %s
+            """, rows)
+
+    def _apply_entries(self, entries: List[Dict[str, Any]], server: Optional[Dict[str, Any]] = None) -> int:
+        status_rows, event_rows, changed = [], [], 0
+        with self._get_connection(server=server) as conn:
             cursor = conn.cursor()
             try:
-                if notes:
-                    query = """
-                        UPDATE sinistres_artex 
-                        SET statut_sinistre_artex = %s, 
-                            description_sinistre = CONCAT(IFNULL(description_sinistre, ''), '\n--- NOTE ---', %s)
-                        WHERE id_sinistre_artex = %s
-                    """
-                    cursor.execute(query, (new_status, notes, sinistre_id))
-                else:
-                    query = "UPDATE sinistres_artex SET statut_sinistre_artex = %s WHERE id_sinistre_artex = %s"
-                    cursor.execute(query, (new_status, sinistre_id))
-                
+                conn.start_transaction()
+                for entry in entries:
+                    if entry["kind"] == "contact_update":
+                        updates = entry["fields"]
+                        set_clause = ", ".join([f"{key} = %s" for key in updates.keys() if key in CONTACT_COLUMNS])
+                        cursor.execute(f"UPDATE adherents SET {set_clause} WHERE id_adherent = %s",
+                                       tuple(updates[k] for k in updates if k in CONTACT_COLUMNS) + (entry["adherent_id"],))
+                        changed += cursor.rowcount
+                        event_rows.append((entry["id"], "adherent", entry["adherent_id"], "contact_update",
+                                           None, None, json.dumps(updates, ensure_ascii=False), entry["ts"]))
+                    elif entry["kind"] == "sinistre_status":
+                        status_rows.append((entry["status"], entry["sinistre_id"]))
+                        event_rows.append((entry["id"], "sinistre", entry["sinistre_id"], "status_change",
+                                           entry["status"], entry.get("note"), None, entry["ts"]))
+                    else:
+                        logger.warning("Entrée de journal ignorée (type inconnu) : %s", entry["kind"])
+
+                if status_rows:
+                    cursor.executemany(
+                        "UPDATE sinistres_artex SET statut_sinistre_artex = %s WHERE id_sinistre_artex = %s", status_rows)
+                    changed += cursor.rowcount
+                if event_rows:
+                    cursor.executemany("""
+                        INSERT IGNORE INTO audit_events
+                            (journal_id, entity_type, entity_id, event_type, statut, note, payload, created_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    """, event_rows)
                 conn.commit()
-                return cursor.rowcount > 0
-            except mysql.connector.Error as err:
-                logger.error(f"Échec de la mise à jour du statut pour le sinistre {sinistre_id} : {err}")
+                return changed
+            except mysql.connector.Error:
                 conn.rollback()
-                return False
+                raise
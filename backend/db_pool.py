@@ -0,0 +1,176 @@
+# db_pool.py
+
+import contextvars
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import mysql.connector
+from mysql.connector import pooling
+
+logger = logging.getLogger("artex_agent.db_pool")
+
+
+# --- Pools de Connexions par Serveur ---
+
+class ConnectionPools:
+    """
+    Un pool mysql.connector par serveur (primaire et réplicas), créé à la première utilisation.
+    Les sessions ne sont pas réinitialisées au retour dans le pool (`pool_reset_session=False`) afin de
+    conserver les instructions préparées ; les connexions sont en autocommit pour ne jamais garder
+    un instantané de lecture d'un appel à l'autre. Si un pool est épuisé, une connexion hors pool est ouverte.
+    """
+    def __init__(self, pool_size: int):
+        self.pool_size = pool_size
+        self._pools: Dict[Tuple[str, int], pooling.MySQLConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def connect(self, params: Dict[str, Any]):
+        key = (params["host"], int(params.get("port", 3306)))
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    name = re.sub(r"[^a-zA-Z0-9._:-]", "_", f"artex_{key[0]}_{key[1]}")[:64]
+                    pool = pooling.MySQLConnectionPool(
+                        pool_name=name, pool_size=self.pool_size, pool_reset_session=False,
+                        autocommit=True, **params,
+                    )
+                    self._pools[key] = pool
+        try:
+            conn = pool.get_connection()
+        except pooling.PoolError:
+            logger.warning("Pool %s:%s épuisé : connexion hors pool.", *key)
+            conn = mysql.connector.connect(autocommit=True, **params)
+        conn.artex_params = params  # Serveur d'origine, pour un éventuel KILL QUERY
+        return conn
+
+
+def connection_id(conn) -> int:
+    """Identifiant de session côté serveur (celui de la connexion physique derrière le pool)."""
+    return getattr(conn, "_cnx", conn).connection_id
+
+
+# --- Instructions Préparées ---
+
+def prepared_cursor(conn, sql: str):
+    """
+    Retourne un curseur préparé (résultats en dictionnaires) pour `sql`, réutilisé tant que la connexion
+    physique reste la même : la requête n'est analysée par le serveur qu'une fois par connexion.
+    """
+    raw = getattr(conn, "_cnx", conn)  # Connexion physique derrière PooledMySQLConnection
+    cache = getattr(raw, "_artex_prepared", None)
+    if cache is None or cache.get("__connection_id__") != raw.connection_id:
+        # Nouvelle connexion, ou reconnexion par le pool : les anciennes instructions n'existent plus côté serveur.
+        cache = {"__connection_id__": raw.connection_id}
+        raw._artex_prepared = cache
+    cursor = cache.get(sql)
+    if cursor is None:
+        cursor = raw.cursor(prepared=True, dictionary=True)
+        cache[sql] = cursor
+    return cursor
+
+
+def discard_prepared(conn, sql: str):
+    """Oublie le curseur préparé de `sql` (après une requête interrompue, son état n'est plus fiable)."""
+    raw = getattr(conn, "_cnx", conn)
+    cursor = (getattr(raw, "_artex_prepared", None) or {}).pop(sql, None)
+    if cursor is not None:
+        try:
+            cursor.close()
+        except mysql.connector.Error:
+            pass
+
+
+# --- Annulation des Requêtes ---
+# Un appel d'outil annulé (interruption de l'appelant) ne doit pas laisser sa requête tourner sur le serveur :
+# la requête en cours est interrompue par KILL QUERY depuis une autre connexion, et la connexion d'origine,
+# toujours valide, retourne au pool.
+
+ER_QUERY_INTERRUPTED = 1317
+
+
+class QueryCancelled(Exception):
+    """La requête a été interrompue parce que l'appel d'outil qui l'attendait a été annulé."""
+
+
+class QueryScope:
+    """Requête en cours d'un appel annulable : connexion active et serveur, protégés par un verrou."""
+    def __init__(self):
+        self.cancelled = False
+        self._active: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def attach(self, conn):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("appel annulé avant l'exécution de la requête")
+            self._active = (connection_id(conn), conn.artex_params)
+
+    def detach(self):
+        # Attend la fin d'un KILL en cours : la connexion ne retourne au pool qu'une fois le KILL envoyé,
+        # sans quoi il pourrait interrompre la requête d'un autre appel.
+        with self._lock:
+            self._active = None
+
+    def cancel(self, kill: Callable[[int, Dict[str, Any]], None]):
+        with self._lock:
+            self.cancelled = True
+            if self._active is not None:
+                kill(*self._active)
+
+
+_query_scope: contextvars.ContextVar[Optional[QueryScope]] = contextvars.ContextVar("artex_query_scope", default=None)
+
+
+def current_query_scope() -> Optional[QueryScope]:
+    return _query_scope.get()
+
+
+def run_in_scope(scope: QueryScope, fn: Callable, *args):
+    """Exécute `fn(*args)` (dans le thread courant) avec `scope` comme portée d'annulation des requêtes."""
+    token = _query_scope.set(scope)
+    try:
+        return fn(*args)
+    finally:
+        _query_scope.reset(token)
+
+
+# --- Table de Temps par Requête ---
+
+@dataclass
+class QueryTiming:
+    calls: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+_timings: Dict[str, QueryTiming] = {}
+_timings_lock = threading.Lock()
+
+
+def record_query(name: str, started: float, rows: int):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _timings_lock:
+        timing = _timings.setdefault(name, QueryTiming())
+        timing.calls += 1
+        timing.rows += rows
+        timing.total_ms += elapsed_ms
+        timing.max_ms = max(timing.max_ms, elapsed_ms)
+
+
+def get_query_timings() -> Dict[str, QueryTiming]:
+    with _timings_lock:
+        return {name: QueryTiming(**vars(t)) for name, t in _timings.items()}
+
+
+def render_query_timings() -> str:
+    """Tableau texte des temps par requête, trié par temps cumulé décroissant."""
+    rows: List[str] = [f"{'requête':<32} {'appels':>8} {'lignes':>9} {'moy. ms':>9} {'max ms':>9} {'total ms':>11}"]
+    for name, t in sorted(get_query_timings().items(), key=lambda item: item[1].total_ms, reverse=True):
+        rows.append(f"{name:<32} {t.calls:>8} {t.rows:>9} {t.total_ms / t.calls:>9.2f} {t.max_ms:>9.2f} {t.total_ms:>11.1f}")
+    return "\n".join(rows)
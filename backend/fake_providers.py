@@ -0,0 +1,208 @@
+# fake_providers.py
+
+import asyncio
+import json
+import logging
+import os
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from livekit import rtc
+from livekit.agents import llm, stt, tts, APIConnectOptions, DEFAULT_API_CONNECT_OPTIONS
+
+logger = logging.getLogger("artex_agent.fake_providers")
+
+# --- Fournisseurs LLM/STT/TTS simulés ---
+# Ils remplacent Gemini et Google STT/TTS pour rejouer des appels scénarisés hors ligne,
+# avec des latences configurables, afin de mesurer le surcoût propre du worker.
+
+SAMPLE_RATE = 24000
+NUM_CHANNELS = 1
+
+
+@dataclass
+class ToolDecision:
+    name: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ScriptedTurn:
+    user: str                                   # Ce que l'appelant "dit" (transcription STT)
+    tool_calls: List[ToolDecision] = field(default_factory=list)
+    reply: str = ""                             # Réponse finale du LLM après les outils
+
+
+@dataclass
+class CallScript:
+    turns: List[ScriptedTurn]
+    caller_number: Optional[str] = None
+
+
+@dataclass
+class LatencyProfile:
+    """Latences simulées des fournisseurs, en secondes. `jitter` est une fraction aléatoire ajoutée (0.2 = ±20%)."""
+    stt: float = 0.30
+    llm_ttft: float = 0.45
+    tts_ttfb: float = 0.20
+    tts_chars_per_second: float = 15.0
+    jitter: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "LatencyProfile":
+        """Lit `ARTEX_FAKE_LATENCIES` (JSON, ex. {"llm_ttft": 0.8}) pour surcharger les valeurs par défaut."""
+        raw = os.getenv("ARTEX_FAKE_LATENCIES")
+        return cls(**json.loads(raw)) if raw else cls()
+
+    def sample(self, base: float) -> float:
+        if not self.jitter:
+            return base
+        return max(0.0, base * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+def load_call_scripts(path: str) -> List[CallScript]:
+    """Charge une liste de scénarios d'appel depuis un fichier JSON (voir call_scripts.example.json)."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return [
+        CallScript(
+            caller_number=call.get("caller_number"),
+            turns=[
+                ScriptedTurn(
+                    user=turn["user"],
+                    tool_calls=[ToolDecision(**tc) for tc in turn.get("tool_calls", [])],
+                    reply=turn.get("reply", ""),
+                )
+                for turn in call["turns"]
+            ],
+        )
+        for call in raw
+    ]
+
+
+# --- LLM ---
+
+class FakeLLM(llm.LLM):
+    """
+    LLM sans état qui rejoue les décisions scénarisées. La décision est retrouvée à partir du dernier
+    message utilisateur du contexte : d'abord les appels d'outils prévus, puis la réponse une fois
+    leurs résultats présents. Une seule instance peut donc servir plusieurs sessions simultanées.
+    """
+    def __init__(self, scripts: List[CallScript], latencies: LatencyProfile):
+        super().__init__()
+        self.latencies = latencies
+        self._turns: Dict[str, ScriptedTurn] = {
+            turn.user.strip().lower(): turn for script in scripts for turn in script.turns
+        }
+
+    def chat(self, *, chat_ctx: llm.ChatContext, tools: Optional[list] = None,
+             conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS, **kwargs) -> "FakeLLMStream":
+        return FakeLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+    def decide(self, chat_ctx: llm.ChatContext) -> tuple[Optional[str], List[ToolDecision]]:
+        """Retourne (texte, appels d'outils) pour l'état courant de la conversation."""
+        last_user_idx, last_user_text = -1, ""
+        for idx, item in enumerate(chat_ctx.items):
+            if item.type == "message" and item.role == "user":
+                last_user_idx, last_user_text = idx, item.text_content or ""
+
+        turn = self._turns.get(last_user_text.strip().lower())
+        if turn is None:
+            return "Pouvez-vous reformuler votre demande, s'il vous plaît ?", []
+
+        outputs = sum(1 for item in chat_ctx.items[last_user_idx + 1:] if item.type == "function_call_output")
+        if outputs < len(turn.tool_calls):
+            return None, turn.tool_calls
+        return turn.reply, []
+
+
+class FakeLLMStream(llm.LLMStream):
+    async def _run(self) -> None:
+        fake_llm: FakeLLM = self._llm
+        await asyncio.sleep(fake_llm.latencies.sample(fake_llm.latencies.llm_ttft))
+        text, tool_calls = fake_llm.decide(self._chat_ctx)
+        request_id = uuid.uuid4().hex
+        self._event_ch.send_nowait(llm.ChatChunk(
+            id=request_id,
+            delta=llm.ChoiceDelta(
+                role="assistant",
+                content=text,
+                tool_calls=[
+                    llm.FunctionToolCall(name=tc.name, arguments=json.dumps(tc.arguments),
+                                         call_id=f"call_{uuid.uuid4().hex[:12]}")
+                    for tc in tool_calls
+                ],
+            ),
+        ))
+
+
+# --- STT ---
+
+class FakeSTT(stt.STT):
+    """STT non-streaming qui retourne les transcriptions scénarisées dans l'ordre, quel que soit l'audio reçu."""
+    def __init__(self, transcripts: List[str], latencies: LatencyProfile):
+        super().__init__(capabilities=stt.STTCapabilities(streaming=False, interim_results=False))
+        self.latencies = latencies
+        self._transcripts = list(transcripts)
+        self._next = 0
+
+    async def _recognize_impl(self, buffer, *, language=None,
+                              conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> stt.SpeechEvent:
+        await asyncio.sleep(self.latencies.sample(self.latencies.stt))
+        text = self._transcripts[self._next % len(self._transcripts)] if self._transcripts else ""
+        self._next += 1
+        return stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            alternatives=[stt.SpeechData(language="fr-FR", text=text)],
+        )
+
+
+# --- TTS ---
+
+class FakeTTS(tts.TTS):
+    """TTS qui produit du silence PCM, dont la durée est proportionnelle à la longueur du texte."""
+    def __init__(self, latencies: LatencyProfile):
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=SAMPLE_RATE,
+            num_channels=NUM_CHANNELS,
+        )
+        self.latencies = latencies
+
+    def synthesize(self, text: str, *,
+                   conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> "FakeChunkedStream":
+        return FakeChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class FakeChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        fake_tts: FakeTTS = self._tts
+        output_emitter.initialize(
+            request_id=uuid.uuid4().hex,
+            sample_rate=SAMPLE_RATE,
+            num_channels=NUM_CHANNELS,
+            mime_type="audio/pcm",
+        )
+        await asyncio.sleep(fake_tts.latencies.sample(fake_tts.latencies.tts_ttfb))
+        duration = len(self._input_text) / fake_tts.latencies.tts_chars_per_second
+        frame = rtc.AudioFrame.create(SAMPLE_RATE, NUM_CHANNELS, SAMPLE_RATE // 10)  # 100 ms de silence
+        for _ in range(max(1, int(duration * 10))):
+            output_emitter.push(bytes(frame.data))
+        output_emitter.flush()
+
+
+def build_fake_providers() -> Dict[str, Any]:
+    """
+    Construit les fournisseurs simulés à partir de `ARTEX_FAKE_SCRIPTS` (chemin du fichier de scénarios)
+    et `ARTEX_FAKE_LATENCIES`. Utilisé par ArtexAgent lorsque `ARTEX_PROVIDERS=fake`.
+    """
+    scripts_path = os.getenv("ARTEX_FAKE_SCRIPTS", os.path.join(os.path.dirname(__file__), "call_scripts.example.json"))
+    scripts = load_call_scripts(scripts_path)
+    latencies = LatencyProfile.from_env()
+    logger.info("Fournisseurs simulés chargés : %s scénario(s) depuis %s.", len(scripts), scripts_path)
+    return {
+        "llm": FakeLLM(scripts, latencies),
+        "stt": FakeSTT([turn.user for script in scripts for turn in script.turns], latencies),
+        "tts": FakeTTS(latencies),
+    }
@@ -0,0 +1,90 @@
+# launcher.py
+"""
+Lance un worker d'agent par cœur CPU, tous avec la même configuration (.env + variables ARTEX_*),
+et les relance s'ils s'arrêtent de manière inattendue. Chaque worker s'enregistre séparément
+auprès du serveur LiveKit, qui répartit les appels selon la charge que chacun rapporte.
+
+Exemple :
+    python launcher.py --workers 4 --max-sessions 6
+"""
+
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from dotenv import load_dotenv
+from log_pipeline import configure_logging
+
+configure_logging(level=logging.INFO)  # Même pipeline JSON que les workers (ARTEX_LOG_FORMAT)
+logger = logging.getLogger("artex_agent.launcher")
+
+AGENT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent.py")
+RESTART_BACKOFF_SECONDS = 2.0
+
+
+def _worker_env(index: int, base_port: int) -> dict:
+    env = os.environ.copy()
+    env["ARTEX_WORKER_PORT"] = str(base_port + index)  # Un port de santé HTTP distinct par worker
+    env["ARTEX_WORKER_INDEX"] = str(index)
+    return env
+
+
+def _spawn(index: int, base_port: int, mode: str) -> subprocess.Popen:
+    proc = subprocess.Popen([sys.executable, AGENT_SCRIPT, mode], env=_worker_env(index, base_port))
+    logger.info("Worker %s démarré (PID %s, port %s).", index, proc.pid, base_port + index)
+    return proc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lance un worker d'agent ARTEX par cœur.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de workers (défaut : nombre de cœurs).")
+    parser.add_argument("--base-port", type=int, default=8081, help="Premier port de santé HTTP.")
+    parser.add_argument("--mode", default="start", help="Sous-commande passée à agent.py (start, dev...).")
+    parser.add_argument("--max-sessions", type=int, help="Surcharge ARTEX_MAX_SESSIONS pour chaque worker.")
+    parser.add_argument("--max-loop-lag-ms", type=float, help="Surcharge ARTEX_MAX_LOOP_LAG_MS pour chaque worker.")
+    parser.add_argument("--load-threshold", type=float, help="Surcharge ARTEX_LOAD_THRESHOLD pour chaque worker.")
+    args = parser.parse_args()
+
+    # La configuration est résolue une seule fois ici puis transmise à l'identique à tous les workers.
+    load_dotenv()
+    for option, env_name in (("max_sessions", "ARTEX_MAX_SESSIONS"),
+                             ("max_loop_lag_ms", "ARTEX_MAX_LOOP_LAG_MS"),
+                             ("load_threshold", "ARTEX_LOAD_THRESHOLD")):
+        value = getattr(args, option)
+        if value is not None:
+            os.environ[env_name] = str(value)
+
+    workers = {i: _spawn(i, args.base_port, args.mode) for i in range(args.workers)}
+    stopping = False
+
+    def _stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        logger.info("Signal %s reçu : arrêt des workers (vidage des appels en cours).", signum)
+        for proc in workers.values():
+            if proc.poll() is None:
+                proc.send_signal(signum)
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    while workers:
+        time.sleep(1.0)
+        for index, proc in list(workers.items()):
+            code = proc.poll()
+            if code is None:
+                continue
+            if stopping:
+                logger.info("Worker %s arrêté (code %s).", index, code)
+                del workers[index]
+            else:
+                logger.error("Worker %s terminé de façon inattendue (code %s) ; redémarrage.", index, code)
+                time.sleep(RESTART_BACKOFF_SECONDS)
+                workers[index] = _spawn(index, args.base_port, args.mode)
+
+
+if __name__ == "__main__":
+    main()
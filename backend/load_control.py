@@ -0,0 +1,149 @@
+# load_control.py
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from livekit.agents import JobRequest
+from db_driver import ExtranetDatabaseDriver
+
+logger = logging.getLogger("artex_agent.load_control")
+
+
+@dataclass
+class _LoopLag:
+    average: float = 0.0  # Moyenne mobile exponentielle du retard de réveil, en secondes
+    last_beat: float = field(default_factory=time.monotonic)
+
+
+class LoadMonitor:
+    """
+    Mesure la charge réelle du worker et décide de l'admission des nouveaux appels.
+    La charge est le maximum de trois ratios, chacun rapporté à sa limite configurée :
+    - sessions actives / ARTEX_MAX_SESSIONS
+    - retard de la boucle d'événements la plus en retard (une par tâche avec l'exécuteur THREAD) / ARTEX_MAX_LOOP_LAG_MS
+    - connexions de BD en cours / DB_MAX_CONNECTIONS (saturation du pilote)
+    Elle est remontée au dispatcher LiveKit via `load_fnc` ; au-delà du seuil, le worker
+    n'est plus proposé et les demandes déjà routées sont rejetées pour être réattribuées.
+    Une place est réservée dès l'acceptation (`request_fnc`) : une rafale de demandes ne peut pas être
+    admise en entier avant que les premiers entrypoints aient démarré.
+    """
+    def __init__(self, db_driver: ExtranetDatabaseDriver,
+                 max_sessions: Optional[int] = None,
+                 max_loop_lag_ms: Optional[float] = None,
+                 load_threshold: Optional[float] = None,
+                 sample_interval: float = 0.1,
+                 reservation_ttl: float = 30.0):
+        self.db_driver = db_driver
+        self.max_sessions = max_sessions or int(os.getenv("ARTEX_MAX_SESSIONS", "8"))
+        self.max_loop_lag = (max_loop_lag_ms or float(os.getenv("ARTEX_MAX_LOOP_LAG_MS", "100"))) / 1000
+        self.load_threshold = load_threshold or float(os.getenv("ARTEX_LOAD_THRESHOLD", "0.75"))
+        self.sample_interval = sample_interval
+        self.reservation_ttl = reservation_ttl
+        self.active_sessions = 0
+        self._reservations: Dict[str, float] = {}  # job_id -> échéance ; appels acceptés dont l'entrypoint n'a pas démarré
+        self._loops: Dict[asyncio.AbstractEventLoop, _LoopLag] = {}  # Boucles mesurées (tâches en cours, worker)
+        self._lock = threading.Lock()  # load_fnc peut être appelé depuis un autre thread que la boucle des tâches
+
+    # --- Mesures ---
+
+    def watch_loop(self):
+        """
+        Mesure le retard de la boucle courante tant qu'elle tourne (idempotent par boucle). Appelé par chaque
+        entrypoint : un outil qui bloque la boucle de sa tâche (requête synchrone) retarde ses battements.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop in self._loops:
+                return
+            self._loops[loop] = lag = _LoopLag()
+        task = loop.create_task(self._probe(loop, lag))
+        task.add_done_callback(lambda _: self._forget(loop))
+
+    async def _probe(self, loop: asyncio.AbstractEventLoop, lag: _LoopLag):
+        while True:
+            expected = loop.time() + self.sample_interval
+            await asyncio.sleep(self.sample_interval)
+            lag.average = 0.8 * lag.average + 0.2 * max(0.0, loop.time() - expected)
+            lag.last_beat = time.monotonic()
+
+    def _forget(self, loop: asyncio.AbstractEventLoop):
+        with self._lock:
+            self._loops.pop(loop, None)
+
+    @property
+    def loop_lag(self) -> float:
+        """
+        Retard de la boucle la plus en retard, en secondes. Une boucle bloquée en ce moment compte pour la durée
+        du blocage en cours, sans attendre son prochain battement. Les boucles fermées sont oubliées.
+        """
+        now = time.monotonic()
+        worst = 0.0
+        with self._lock:
+            for loop in [loop for loop in self._loops if loop.is_closed()]:
+                del self._loops[loop]
+            for lag in self._loops.values():
+                worst = max(worst, lag.average, now - lag.last_beat - self.sample_interval)
+        return worst
+
+    def _session_count(self) -> int:
+        """Sessions actives et réservées ; les réservations expirées (job jamais démarré) sont libérées. Sous verrou."""
+        now = time.monotonic()
+        for job_id in [job_id for job_id, expiry in self._reservations.items() if expiry < now]:
+            del self._reservations[job_id]
+        return self.active_sessions + len(self._reservations)
+
+    def session_started(self, job_id: Optional[str] = None):
+        """Début d'un entrypoint : la réservation faite à l'acceptation devient une session active."""
+        with self._lock:
+            self._reservations.pop(job_id, None)
+            self.active_sessions += 1
+
+    def session_ended(self):
+        with self._lock:
+            self.active_sessions = max(0, self.active_sessions - 1)
+
+    def _other_load(self) -> float:
+        return max(self.loop_lag / self.max_loop_lag, self.db_driver.pool_saturation())
+
+    def current_load(self, *_) -> float:
+        """Charge normalisée (1.0 = une des limites atteinte). Signature compatible avec `WorkerOptions.load_fnc`."""
+        with self._lock:
+            sessions_ratio = self._session_count() / self.max_sessions
+        return min(1.0, max(sessions_ratio, self._other_load()))
+
+    # --- Admission ---
+
+    def try_reserve(self, job_id: str) -> bool:
+        """Réserve une place pour l'appel si la charge le permet ; décision et réservation sont atomiques."""
+        other_load = self._other_load()
+        with self._lock:
+            sessions = self._session_count()
+            if sessions >= self.max_sessions or max(sessions / self.max_sessions, other_load) >= self.load_threshold:
+                return False
+            self._reservations[job_id] = time.monotonic() + self.reservation_ttl
+            return True
+
+    def release(self, job_id: str):
+        with self._lock:
+            self._reservations.pop(job_id, None)
+
+    async def handle_job_request(self, req: JobRequest):
+        """`request_fnc` du worker : accepte l'appel ou le rejette pour que le dispatcher le confie à un autre worker."""
+        self.watch_loop()  # Boucle principale du worker (demandes de tâches)
+        if self.try_reserve(req.job.id):
+            try:
+                await req.accept()
+            except BaseException:
+                self.release(req.job.id)
+                raise
+            return
+        logger.warning(
+            "Appel %s refusé : charge %.2f (sessions: %s/%s, retard boucle: %.0f ms, BD: %.0f%%).",
+            req.job.id, self.current_load(), self.active_sessions, self.max_sessions, self.loop_lag * 1000,
+            self.db_driver.pool_saturation() * 100,
+        )
+        await req.reject()
@@ -0,0 +1,107 @@
+# load_test_server.py
+"""
+Générateur de charge pour POST /create-token (server.py) : mesure le débit (requêtes/s) et la latence
+de queue (p50/p95/p99/max) pour un ou plusieurs nombres de clients simultanés.
+
+Chaque requête utilise une identité différente ; les réponses 429 sont comptées à part. Pour mesurer la
+capacité brute plutôt que le limiteur (toutes les requêtes viennent de la même IP), lancer le serveur avec
+une limite relevée, par exemple ARTEX_TOKEN_RATE_PER_MINUTE=1000000.
+
+Exemple :
+    python load_test_server.py --url http://localhost:5001 --workers 1 4 16 64 --duration 10
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _post_token(url: str, identity: str, room_name: Optional[str], timeout: float) -> int:
+    payload = {"identity": identity}
+    if room_name:
+        payload["room_name"] = room_name
+    req = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"), method="POST",
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as err:
+        return err.code
+
+
+def run_load(url: str, workers: int, duration: float, room_name: Optional[str], timeout: float) -> Dict[str, Any]:
+    """Lance `workers` clients en boucle fermée pendant `duration` secondes et agrège les résultats."""
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def client():
+        local_latencies, local_statuses = [], {}
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = str(_post_token(url, f"loadtest-{next(counter)}", room_name, timeout))
+            except Exception as err:
+                status = type(err).__name__
+            elapsed = time.perf_counter() - started
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+            if status == "200":
+                local_latencies.append(elapsed)
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(workers):
+            pool.submit(client)
+    elapsed = time.perf_counter() - started
+
+    total = sum(statuses.values())
+    return {
+        "workers": workers,
+        "requests": total,
+        "statuses": statuses,
+        "rps": round(total / elapsed, 1),
+        "ok_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {f"p{p}": round(_percentile(latencies, p) * 1000, 1) for p in (50, 95, 99)}
+                      | {"max": round(max(latencies, default=0.0) * 1000, 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure le débit et la latence de POST /create-token.")
+    parser.add_argument("--url", default="http://localhost:5001", help="URL de base du serveur de jetons.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 64],
+                        help="Un ou plusieurs nombres de clients simultanés à mesurer successivement.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de chaque palier, en secondes.")
+    parser.add_argument("--room-name", default="loadtest",
+                        help="Salle demandée ; chaîne vide pour laisser le serveur en générer une (appel LiveKit compris).")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Délai maximal par requête, en secondes.")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/") + "/create-token"
+    for workers in args.workers:
+        report = run_load(url, workers, args.duration, args.room_name or None, args.timeout)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# log_pipeline.py
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import date, datetime, time, timezone
+from typing import Dict, Optional
+
+# --- Contexte de Journalisation par Appel ---
+# Un dictionnaire mutable par tâche d'appel : les outils peuvent y ajouter l'adhérent identifié
+# et toutes les tâches de la session (qui partagent ce même dictionnaire) en profitent.
+_log_context: contextvars.ContextVar[Optional[Dict[str, object]]] = contextvars.ContextVar("artex_log_context", default=None)
+
+CONTEXT_FIELDS = ("job_id", "room", "adherent_id")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Arguments de journalisation dont le formatage peut attendre le thread d'écriture : immuables.
+_IMMUTABLE_ARG_TYPES = (str, int, float, bytes, type(None), date, time)
+
+
+def bind_log_context(**fields):
+    """Ouvre un nouveau contexte de journalisation pour la tâche courante (à appeler au début d'un appel)."""
+    _log_context.set(dict(fields))
+
+
+def update_log_context(**fields):
+    """Complète le contexte de l'appel en cours (ex. adherent_id après identification)."""
+    context = _log_context.get()
+    if context is None:
+        _log_context.set(dict(fields))
+    else:
+        context.update(fields)
+
+
+class _ContextFilter(logging.Filter):
+    """Copie le contexte d'appel sur l'enregistrement, dans le thread émetteur."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get() or {}
+        for name in CONTEXT_FIELDS:
+            setattr(record, name, context.get(name))
+        return True
+
+
+class _SamplingFilter(logging.Filter):
+    """
+    Échantillonne les journaux bavards par logger : ARTEX_LOG_SAMPLING="artex_agent.tools=0.1,db_driver=0.5"
+    conserve 10 % des messages INFO/DEBUG des outils. Les WARNING et plus sont toujours conservés.
+    """
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        name = record.name
+        while name:
+            if name in self.rates:
+                return random.random() < self.rates[name]
+            name = name.rpartition(".")[0]
+        return True
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler qui ne formate PAS le message dans le thread appelant : msg et args sont transmis tels quels
+    et le formatage (%-style) a lieu dans le thread d'écriture, hors de la boucle audio.
+    Seulement si tous les arguments sont immuables (chaînes, nombres, dates) : un dict, une liste ou une
+    dataclass modifiés après l'appel seraient journalisés dans leur état ultérieur. Le message est alors
+    formaté dès l'appel.
+    """
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1  # Jamais bloquer l'appelant : le message est perdu et compté
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and (isinstance(args, dict) or not all(isinstance(arg, _IMMUTABLE_ARG_TYPES) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            # La trace doit être capturée tant que l'exception existe encore.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Un enregistrement JSON par ligne, avec le contexte de l'appel."""
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                payload[name] = value
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _parse_sampling(raw: str) -> Dict[str, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(level: int = logging.INFO):
+    """
+    Remplace la configuration `logging.basicConfig` : les appels de journalisation ne font que déposer
+    l'enregistrement dans une file ; un thread d'arrière-plan formate et écrit sur stderr.
+    Réglages : ARTEX_LOG_FORMAT (json|text, défaut json), ARTEX_LOG_SAMPLING, ARTEX_LOG_QUEUE_SIZE.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if os.getenv("ARTEX_LOG_FORMAT", "json").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(job_id)s] %(message)s')
+    writer = logging.StreamHandler(sys.stderr)
+    writer.setFormatter(formatter)
+
+    # File bornée : si l'écriture prend du retard, les messages en surplus sont perdus plutôt que de bloquer.
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv("ARTEX_LOG_QUEUE_SIZE", "10000")))
+    handler = _LazyQueueHandler(log_queue)
+    handler.addFilter(_SamplingFilter(_parse_sampling(os.getenv("ARTEX_LOG_SAMPLING", ""))))
+    handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # Vide la file à l'arrêt du processus
@@ -0,0 +1,166 @@
+# loop_watchdog.py
+
+import asyncio
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger("artex_agent.loop_watchdog")
+
+# Bornes des histogrammes, en millisecondes (format cumulatif de type Prometheus).
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Fichiers du projet dont on veut voir les frames dans les rapports de blocage.
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Histogram:
+    """Histogramme à bornes fixes, thread-safe, exportable au format texte Prometheus."""
+    def __init__(self, name: str, help_text: str, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS,
+                 labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = "".join(f'{k}="{v}",' for k, v in (labels or {}).items())
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)  # Dernière case : +Inf
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+            self.total_ms += value_ms
+
+    def render(self, include_header: bool = True) -> str:
+        """`include_header=False` pour les séries suivantes d'une même métrique (autres valeurs d'étiquettes)."""
+        series = f"{{{self.labels.rstrip(',')}}}" if self.labels else ""
+        with self._lock:
+            lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"] if include_header else []
+            cumulative = 0
+            for bound, count in zip(self.buckets_ms + ["+Inf"], self.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{self.labels}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{series} {self.total_ms:.3f}")
+            lines.append(f"{self.name}_count{series} {cumulative}")
+        return "\n".join(lines)
+
+
+# --- Métriques partagées par toutes les boucles surveillées du processus ---
+loop_lag_histogram = Histogram("artex_event_loop_lag_ms", "Retard de réveil de la boucle d'événements.")
+blocking_histogram = Histogram("artex_event_loop_block_ms", "Durée des blocages au-delà du seuil.")
+blocking_sites: Counter = Counter()  # "tools.xxx -> db_driver.yyy" -> nombre de blocages observés
+
+_watchdogs: Dict[asyncio.AbstractEventLoop, "LoopWatchdog"] = {}
+_watchdogs_lock = threading.Lock()
+
+
+def _summarize_stack(frame) -> tuple[str, str]:
+    """Retourne (site, pile formatée). Le site résume les frames du projet, ex. 'tools.list_adherent_claims -> db_driver.get_sinistres_by_adherent_id'."""
+    stack = traceback.extract_stack(frame)
+    project_frames = [
+        f"{os.path.splitext(os.path.basename(fs.filename))[0]}.{fs.name}"
+        for fs in stack if os.path.abspath(fs.filename).startswith(_PROJECT_DIR)
+        and not fs.filename.endswith("loop_watchdog.py")
+    ]
+    site = " -> ".join(project_frames[-3:]) if project_frames else f"{stack[-1].filename}:{stack[-1].name}"
+    return site, "".join(traceback.format_list(stack[-15:]))
+
+
+class LoopWatchdog:
+    """
+    Chien de garde d'une boucle asyncio :
+    - une tâche « battement » mesure en continu le retard de réveil de la boucle ;
+    - un thread séparé détecte les battements manquants et, si la boucle est bloquée au-delà du seuil,
+      capture la pile du thread de la boucle pour identifier l'appel fautif (ex. une requête
+      ExtranetDatabaseDriver synchrone lancée depuis un outil).
+    """
+    def __init__(self, threshold_ms: float, interval_ms: float, report_interval_s: float):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.report_interval = report_interval_s
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._stall_reported = False
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="artex-loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info("Surveillance de la boucle activée (seuil %.0f ms).", self.threshold * 1000)
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            loop_lag_histogram.observe(lag * 1000)
+            if lag >= self.threshold:
+                blocking_histogram.observe(lag * 1000)
+            self._last_beat = time.monotonic()
+            self._stall_reported = False
+
+    def _watch(self):
+        next_report = time.monotonic() + self.report_interval
+        while self._task is not None and not self._task.done() and not self._loop.is_closed():
+            time.sleep(self.threshold / 2)
+            stalled_for = time.monotonic() - self._last_beat - self.interval
+            if stalled_for >= self.threshold and not self._stall_reported:
+                self._stall_reported = True  # Une seule capture par blocage
+                self._capture(stalled_for)
+            if time.monotonic() >= next_report:
+                next_report = time.monotonic() + self.report_interval
+                logger.info("Boucle d'événements :\n%s", render_metrics())
+        with _watchdogs_lock:
+            _watchdogs.pop(self._loop, None)
+
+    def _capture(self, stalled_for: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        site, stack = _summarize_stack(frame)
+        blocking_sites[site] += 1
+        logger.warning("Boucle d'événements bloquée depuis %.0f ms dans %s\n%s", stalled_for * 1000, site, stack)
+
+
+def install_watchdog() -> Optional[LoopWatchdog]:
+    """
+    Active le chien de garde sur la boucle courante si `ARTEX_LOOP_WATCHDOG=1` (idempotent par boucle).
+    Réglages : ARTEX_WATCHDOG_THRESHOLD_MS (défaut 50), ARTEX_WATCHDOG_INTERVAL_MS (10), ARTEX_WATCHDOG_REPORT_S (60).
+    """
+    if os.getenv("ARTEX_LOOP_WATCHDOG", "0") != "1":
+        return None
+    loop = asyncio.get_running_loop()
+    with _watchdogs_lock:
+        watchdog = _watchdogs.get(loop)
+        if watchdog is None:
+            watchdog = LoopWatchdog(
+                threshold_ms=float(os.getenv("ARTEX_WATCHDOG_THRESHOLD_MS", "50")),
+                interval_ms=float(os.getenv("ARTEX_WATCHDOG_INTERVAL_MS", "10")),
+                report_interval_s=float(os.getenv("ARTEX_WATCHDOG_REPORT_S", "60")),
+            )
+            _watchdogs[loop] = watchdog
+            watchdog.start(loop)
+    return watchdog
+
+
+def render_metrics() -> str:
+    """Exporte les histogrammes et les sites de blocage au format texte Prometheus."""
+    parts: List[str] = [loop_lag_histogram.render(), blocking_histogram.render(),
+                        "# HELP artex_event_loop_block_sites_total Blocages observés par site d'appel.",
+                        "# TYPE artex_event_loop_block_sites_total counter"]
+    for site, count in blocking_sites.most_common():
+        parts.append(f'artex_event_loop_block_sites_total{{site="{site}"}} {count}')
+    return "\n".join(parts)
@@ -0,0 +1,168 @@
+# prefetch.py
+
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from db_driver import ExtranetDatabaseDriver
+from contract_numbers import contract_number_value
+
+logger = logging.getLogger("artex_agent.prefetch")
+
+# --- Métriques de Préchargement ---
+# Compteurs partagés par toutes les sessions du worker. Ils servent à ajuster
+# les données préchargées : un type souvent préchargé mais rarement consommé est du gaspillage.
+_stats: Dict[str, Counter] = {
+    "prefetched": Counter(),  # Chargements spéculatifs lancés
+    "hits": Counter(),        # Appels d'outils servis depuis la mémoire
+    "misses": Counter(),      # Appels d'outils qui ont dû interroger la base
+    "errors": Counter(),      # Chargements spéculatifs en échec
+}
+
+
+def get_prefetch_stats() -> Dict[str, Dict[str, Any]]:
+    """Retourne, pour chaque type de donnée, les compteurs et le taux de succès du préchargement."""
+    kinds = set().union(*(counter.keys() for counter in _stats.values()))
+    report = {}
+    for kind in sorted(kinds):
+        hits, misses = _stats["hits"][kind], _stats["misses"][kind]
+        report[kind] = {
+            "prefetched": _stats["prefetched"][kind],
+            "hits": hits,
+            "misses": misses,
+            "errors": _stats["errors"][kind],
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+    return report
+
+
+def reset_prefetch_stats():
+    """Remet à zéro les compteurs de préchargement (utile entre deux campagnes de mesure)."""
+    for counter in _stats.values():
+        counter.clear()
+
+
+class SessionPrefetcher:
+    """
+    Précharge en arrière-plan les données qu'un appelant demande presque toujours juste après
+    la confirmation de son identité : contrats, formules associées et sinistres.
+    Les outils consultent d'abord ce cache ; l'appel suivant est alors servi depuis la mémoire.
+    Une instance par session, stockée dans `userdata["prefetcher"]`.
+    """
+    def __init__(self, db_driver: ExtranetDatabaseDriver):
+        self.db_driver = db_driver
+        self._entries: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self, adherent_id: int):
+        """Lance le préchargement spéculatif pour un adhérent dont l'identité vient d'être confirmée."""
+        self.reset()
+        db = self.db_driver
+        # Les listes sont planifiées immédiatement pour que l'outil suivant les trouve déjà en vol.
+        contracts_future = self._schedule("contrats", adherent_id, db.get_contrats_by_adherent_id, adherent_id)
+        claims_future = self._schedule("sinistres", adherent_id, db.get_sinistres_by_adherent_id, adherent_id)
+        task = asyncio.get_running_loop().create_task(self._prefetch_details(contracts_future, claims_future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info("Préchargement spéculatif lancé pour l'adhérent %s.", adherent_id)
+
+    async def _prefetch_details(self, contracts_future: asyncio.Future, claims_future: asyncio.Future):
+        """Une fois les listes chargées, précharge les détails de chaque contrat et de chaque formule."""
+        db = self.db_driver
+        try:
+            contracts = await contracts_future
+        except Exception:
+            contracts = []  # Déjà comptabilisé et journalisé dans _schedule
+
+        self._index_contracts(contracts)
+        for contract in contracts:
+            self._schedule("details_contrat", contract.id_contrat, db.get_full_contract_details, contract.id_contrat)
+            if ("garanties", contract.id_formule) not in self._entries:
+                self._schedule("garanties", contract.id_formule, db.get_guarantees_for_formula, contract.id_formule)
+
+        try:
+            claims = await claims_future
+        except Exception:
+            return
+
+        self._index_claims(claims)
+
+    def _index_contracts(self, contracts):
+        for contract in contracts:
+            self._put("contrat", contract.id_contrat, contract)
+            # Numéro dicté par l'appelant (outils acceptant « CONTR00024 ») : servi sans requête.
+            number = contract_number_value(contract.numero_contrat)
+            if number is not None:
+                self._put("contrat_numero", (contract.id_adherent_principal, number), contract)
+
+    def _index_claims(self, claims):
+        # Les sinistres individuels sont servis depuis la liste, sans requête supplémentaire.
+        for claim in claims:
+            self._put("sinistre", claim.id_sinistre_artex, claim)
+
+    def _schedule(self, kind: str, key: Hashable, loader: Callable, *args) -> asyncio.Future:
+        """
+        Exécute un chargement bloquant dans un thread pour ne pas bloquer la boucle audio.
+        Annuler la tâche (reset(), fin de session) interrompt aussi la requête côté serveur.
+        """
+        future = asyncio.ensure_future(self.db_driver.run(loader, *args))
+        self._entries[(kind, key)] = future
+        self._tasks.add(future)
+        future.add_done_callback(self._tasks.discard)
+        future.add_done_callback(lambda f: self._on_loaded(kind, key, f))
+        _stats["prefetched"][kind] += 1
+        return future
+
+    def _on_loaded(self, kind: str, key: Hashable, future: asyncio.Future):
+        if future.cancelled():
+            return
+        err = future.exception()  # Marque l'exception comme récupérée
+        if err is not None:
+            _stats["errors"][kind] += 1
+            logger.warning("Échec du préchargement %s:%s : %s", kind, key, err)
+            if self._entries.get((kind, key)) is future:
+                del self._entries[(kind, key)]
+
+    def _put(self, kind: str, key: Hashable, value: Any):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._entries[(kind, key)] = future
+        _stats["prefetched"][kind] += 1
+
+    async def get(self, kind: str, key: Hashable, loader: Callable, *args) -> Any:
+        """
+        Retourne la donnée préchargée si elle existe (en attendant un chargement encore en vol),
+        sinon exécute `loader(*args)` dans un thread, de façon annulable (ExtranetDatabaseDriver.run).
+        """
+        future: Optional[asyncio.Future] = self._entries.get((kind, key))
+        if future is not None:
+            try:
+                value = await asyncio.shield(future)
+                _stats["hits"][kind] += 1
+                return value
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # C'est l'appelant qui est annulé, pas le préchargement
+            except Exception:
+                pass  # Le préchargement a échoué : retour au chemin normal
+
+        _stats["misses"][kind] += 1
+        return await self.db_driver.run(loader, *args)
+
+    def invalidate(self, kind: str, key: Hashable):
+        """Oublie une entrée devenue obsolète (ex. après la création d'un sinistre)."""
+        future = self._entries.pop((kind, key), None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    def reset(self):
+        """Annule les chargements en cours et vide le cache de la session."""
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
+        self._entries.clear()
+
+    async def aclose(self):
+        """À appeler en fin de session : libère le cache et journalise les taux de succès."""
+        self.reset()
+        logger.info("Statistiques de préchargement : %s", get_prefetch_stats())
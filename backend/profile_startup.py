@@ -0,0 +1,78 @@
+# profile_startup.py
+"""
+Profileur de démarrage à froid du worker : importe agent.py dans un processus neuf avec `python -X importtime`
+et rapporte le temps d'import par module et par paquet, ainsi que la durée totale jusqu'au worker prêt
+(imports, vérification des outils, construction du pilote et des fournisseurs, chargement du VAD).
+
+Exemples :
+    python profile_startup.py                        # fournisseurs de production (Google)
+    python profile_startup.py --providers fake --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Extrait (module, temps propre µs, temps cumulé µs) des lignes `import time:` de -X importtime."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Ligne d'en-tête
+        entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return entries
+
+
+def by_package(entries: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Somme des temps propres par paquet racine (livekit, google, mysql...) : le coût réel de chaque dépendance."""
+    totals: Dict[str, int] = defaultdict(int)
+    for module, self_us, _ in entries:
+        totals[module.split(".")[0]] += self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile(module: str, providers: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    env = dict(os.environ, ARTEX_PROVIDERS=providers)
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        sys.exit(f"L'import de {module} a échoué :\n{proc.stderr[-2000:]}")
+    return elapsed, parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure le temps de démarrage à froid du worker, module par module.")
+    parser.add_argument("--module", default="agent", help="Module à importer (par défaut agent, le worker complet).")
+    parser.add_argument("--providers", default=os.getenv("ARTEX_PROVIDERS", "google"), choices=["google", "fake"],
+                        help="Fournisseurs à construire pendant le démarrage.")
+    parser.add_argument("--top", type=int, default=20, help="Nombre de modules et de paquets affichés.")
+    args = parser.parse_args()
+
+    elapsed, entries = profile(args.module, args.providers)
+    imports_us = sum(self_us for _, self_us, _ in entries)
+    print(f"Démarrage de '{args.module}' ({args.providers}) : {elapsed * 1000:.0f} ms au total, "
+          f"dont {imports_us / 1000:.0f} ms d'imports ({len(entries)} modules).\n")
+
+    print(f"{'paquet':<32} {'propre ms':>10}")
+    for package, self_us in list(by_package(entries).items())[:args.top]:
+        print(f"{package:<32} {self_us / 1000:>10.1f}")
+
+    print(f"\n{'module':<48} {'propre ms':>10} {'cumulé ms':>10}")
+    for module, self_us, cumulative_us in sorted(entries, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"{module[:48]:<48} {self_us / 1000:>10.1f} {cumulative_us / 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
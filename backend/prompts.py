@@ -32,6 +32,7 @@ INSTRUCTIONS = (
     # --- UTILISATION DES OUTILS ---
     - N'utilisez les outils de modification (`update_contact_information`, `create_claim`) qu'après une identification VÉRIFIÉE.
     - Soyez précise. Si un client demande des détails sur un contrat, et qu'il en a plusieurs, demandez-lui de quel contrat il s'agit en utilisant le numéro de contrat.
+      Passez directement ce numéro (ex. CONTR00024) aux outils de contrat : inutile de lister les contrats pour retrouver l'ID.
     - Avant d'appeler un outil qui effectue une action (comme `create_claim`), résumez ce que vous allez faire et demandez confirmation. Exemple : "Je vais donc enregistrer un sinistre de type 'Bris de glace' pour votre contrat CONTR00024. Est-ce bien cela ?"
     """
 )
@@ -42,5 +43,24 @@ WELCOME_MESSAGE = (
     "Bonjour, vous êtes en communication avec ARIA, l'assistante virtuelle d'ARTEX ASSURANCES. "
     "Je n'ai pas pu identifier votre dossier avec ce numéro. Pouvez-vous me donner votre nom complet ou votre adresse e-mail s'il vous plaît ?"
 )
+# --- Message de Reprise d'Appel ---
+# Reprise d'un appel sur un autre worker (session_state.py) : l'historique de conversation est perdu et
+# l'adhérent est restauré non confirmé ; ce message fait reconfirmer l'identité avant tout accès au dossier.
+RESUME_MESSAGE = (
+    "Excusez-moi {prenom} {nom}, la communication a été brièvement interrompue. "
+    "Pour votre sécurité, pouvez-vous me redonner votre date de naissance et votre code postal ?"
+)
+# --- Message de Repli (Base de Données Indisponible) ---
+# Renvoyé par les outils quand la base ne répond pas dans les délais ou que le disjoncteur est ouvert.
+DB_UNAVAILABLE_MESSAGE = (
+    "Je rencontre actuellement une difficulté technique pour accéder aux dossiers. "
+    "Je vous prie de m'excuser : pouvez-vous renouveler votre demande dans quelques instants ?"
+)
+# Renvoyé quand une écriture dépasse son délai (OutcomeUnknown) : elle a pu être enregistrée, l'appelant
+# ne doit pas entendre qu'elle a échoué. Relancer la même demande est sans risque (écritures idempotentes).
+WRITE_OUTCOME_UNKNOWN_MESSAGE = (
+    "Votre demande a bien été transmise, mais je n'ai pas encore reçu la confirmation de son enregistrement. "
+    "Je peux vérifier dans quelques instants : elle ne sera pas enregistrée deux fois."
+)
 # Le contenu de INSTRUCTIONS et WELCOME_MESSAGE est déjà en français.
 # Seuls les commentaires en anglais seront traduits.
@@ -0,0 +1,113 @@
+# query_recordings.py
+"""
+Analyse des enregistrements d'appels produits par call_recorder.py (partitions journalières gzip JSON Lines).
+
+Exemples :
+    python query_recordings.py summary --since 2026-10-01 --until 2026-10-07
+    python query_recordings.py tools --since 2026-10-01
+    python query_recordings.py transcript <job_id> --since 2026-10-18
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from call_recorder import DEFAULT_RECORDINGS_DIR, partition_path
+
+
+def iter_records(root: str, since: date, until: date, session_id: Optional[str] = None,
+                 record_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Parcourt les enregistrements des partitions [since, until], en ne lisant que les jours demandés."""
+    day = since
+    while day <= until:
+        for path in sorted(glob.glob(os.path.join(partition_path(root, day.isoformat()), "*.jsonl.gz"))):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if session_id and record.get("session_id") != session_id:
+                        continue
+                    if record_type and record.get("type") != record_type:
+                        continue
+                    yield record
+        day += timedelta(days=1)
+
+
+def summarize(records: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Indicateurs par jour : appels, durée moyenne, appels identifiés, tours interrompus, outils en erreur."""
+    days: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"calls": 0, "duration_s": 0.0, "identified": set(),
+                                                           "sessions": set(), "user_turns": 0, "interrupted": 0,
+                                                           "tool_calls": 0, "tool_errors": 0})
+    for record in records:
+        stats = days[datetime.fromtimestamp(record["ts"], tz=timezone.utc).date().isoformat()]
+        stats["sessions"].add(record["session_id"])
+        if record.get("adherent_id") is not None:
+            stats["identified"].add(record["session_id"])
+        kind = record.get("type")
+        if kind == "session_end":
+            stats["calls"] += 1
+            stats["duration_s"] += record.get("duration_s") or 0.0
+        elif kind == "message":
+            stats["user_turns"] += record.get("role") == "user"
+            stats["interrupted"] += bool(record.get("interrupted"))
+        elif kind == "tool":
+            stats["tool_calls"] += 1
+            stats["tool_errors"] += bool(record.get("is_error"))
+    return {
+        day: {"sessions": len(s["sessions"]), "completed_calls": s["calls"],
+              "avg_duration_s": round(s["duration_s"] / s["calls"], 1) if s["calls"] else None,
+              "identified_sessions": len(s["identified"]), "user_turns": s["user_turns"],
+              "interrupted_turns": s["interrupted"], "tool_calls": s["tool_calls"], "tool_errors": s["tool_errors"]}
+        for day, s in sorted(days.items())
+    }
+
+
+def tool_usage(records: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Nombre d'appels et d'erreurs par outil, du plus utilisé au moins utilisé."""
+    calls, errors = Counter(), Counter()
+    for record in records:
+        calls[record["tool"]] += 1
+        errors[record["tool"]] += bool(record.get("is_error"))
+    return [{"tool": tool, "calls": count, "errors": errors[tool]} for tool, count in calls.most_common()]
+
+
+def transcript(records: Iterator[Dict[str, Any]]) -> List[str]:
+    """Transcription lisible d'une session, outils compris, dans l'ordre chronologique."""
+    lines = []
+    for record in sorted(records, key=lambda r: r["ts"]):
+        if record.get("type") == "message":
+            suffix = " [interrompu]" if record.get("interrupted") else ""
+            lines.append(f"{record['role']:>9} : {record.get('text') or ''}{suffix}")
+        elif record.get("type") == "tool":
+            lines.append(f"{'outil':>9} : {record['tool']}({record.get('arguments') or ''})"
+                         f"{' -> ERREUR' if record.get('is_error') else ''}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interroge les enregistrements d'appels de l'agent.")
+    parser.add_argument("command", choices=["summary", "tools", "transcript"])
+    parser.add_argument("session_id", nargs="?", help="Identifiant de tâche (pour 'transcript').")
+    parser.add_argument("--root", default=os.getenv("ARTEX_RECORDINGS_DIR", DEFAULT_RECORDINGS_DIR))
+    parser.add_argument("--since", type=date.fromisoformat, default=datetime.now(timezone.utc).date(),
+                        help="Premier jour (AAAA-MM-JJ, UTC).")
+    parser.add_argument("--until", type=date.fromisoformat, help="Dernier jour inclus (par défaut : --since).")
+    args = parser.parse_args()
+    until = args.until or args.since
+
+    if args.command == "summary":
+        print(json.dumps(summarize(iter_records(args.root, args.since, until)), ensure_ascii=False, indent=2))
+    elif args.command == "tools":
+        print(json.dumps(tool_usage(iter_records(args.root, args.since, until, record_type="tool")),
+                         ensure_ascii=False, indent=2))
+    else:
+        if not args.session_id:
+            parser.error("'transcript' exige un identifiant de session.")
+        print("\n".join(transcript(iter_records(args.root, args.since, until, session_id=args.session_id))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# rate_limit.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+
+class TokenBucketLimiter:
+    """
+    Limiteur à seau de jetons, en mémoire, une entrée par clé (identité, adresse IP...).
+    Chaque clé dispose de `burst` jetons, rechargés à `rate_per_second` ; une requête consomme un jeton.
+    Le nombre de clés suivies est borné (`max_keys`) : les clés inactives les plus anciennes sont oubliées,
+    ce qui revient à leur rendre un seau plein.
+
+    L'état est propre au processus : avec plusieurs processus serveur, la limite effective est multipliée d'autant.
+    """
+    def __init__(self, rate_per_second: float, burst: int, max_keys: int = 100_000):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()  # clé -> (jetons, horodatage)
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> Tuple[bool, float]:
+        """Consomme un jeton pour `key`. Retourne (autorisé, secondes avant le prochain jeton si refusé)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        retry_after = 0.0 if allowed else (1.0 - tokens) / self.rate
+        return allowed, retry_after
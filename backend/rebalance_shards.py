@@ -0,0 +1,339 @@
+# rebalance_shards.py
+"""
+Administration du mode shardé (DB_SHARDS, voir shards.py) : plages d'adhérents par shard, index globaux
+de l'annuaire et déplacement de plages d'un shard à l'autre.
+
+Commandes :
+    status                                   plages et volumes par shard
+    apply-ddl [--id-block N]                 schéma sur chaque shard, blocs d'identifiants disjoints
+    assign --start N [--end M] --shard S     attribue une plage sans déplacer de données (mise en place)
+    rebuild-index [--batch B]                reconstruit adherent_directory et entity_directory
+    move --start N --end M --to S            déplace une plage : copie, vérification, bascule, purge
+
+Exemple (base unique existante déclarée en shard0, puis moitié des adhérents déplacée sur shard1) :
+    python rebalance_shards.py apply-ddl
+    python rebalance_shards.py assign --start 1 --shard shard0
+    python rebalance_shards.py rebuild-index
+    python rebalance_shards.py move --start 5001 --end 10000 --to shard1
+"""
+
+import argparse
+import logging
+import math
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+import mysql.connector
+from db_driver import ExtranetDatabaseDriver
+from shards import ShardRange
+from check_query_plans import SQL_DIR, apply_ddl
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("artex_agent.rebalance_shards")
+
+DIRECTORY_DDL = "004_shard_directory.sql"  # Tables de l'annuaire : pas sur les shards
+SHARDED_TABLES = ("adherents", "contrats", "sinistres_artex")
+
+
+# --- Carte des plages ---
+
+def load_ranges(conn) -> List[ShardRange]:
+    cursor = conn.cursor()
+    cursor.execute("SELECT range_start, range_end, shard, moving FROM shard_ranges ORDER BY range_start")
+    return [ShardRange(start, end, shard, bool(moving)) for start, end, shard, moving in cursor.fetchall()]
+
+
+def save_ranges(conn, ranges: List[ShardRange]):
+    """Réécrit la carte en une transaction : les workers voient l'ancienne ou la nouvelle, jamais un mélange."""
+    cursor = conn.cursor()
+    conn.start_transaction()
+    cursor.execute("DELETE FROM shard_ranges")
+    cursor.executemany("INSERT INTO shard_ranges (range_start, range_end, shard, moving) VALUES (%s, %s, %s, %s)",
+                       [(r.start, r.end, r.shard, int(r.moving)) for r in ranges])
+    conn.commit()
+
+
+def _end(value: Optional[int]) -> float:
+    return math.inf if value is None else value
+
+
+def carve(ranges: List[ShardRange], start: int, end: Optional[int]) -> List[ShardRange]:
+    """Retire [start, end] des plages existantes (en les coupant si besoin)."""
+    carved = []
+    for r in ranges:
+        if _end(r.end) < start or r.start > _end(end):
+            carved.append(r)
+            continue
+        if r.start < start:
+            carved.append(ShardRange(r.start, start - 1, r.shard, r.moving))
+        if _end(end) < _end(r.end):
+            carved.append(ShardRange(end + 1, r.end, r.shard, r.moving))
+    return carved
+
+
+def merge(ranges: List[ShardRange]) -> List[ShardRange]:
+    """Fusionne les plages contiguës d'un même shard (hors déplacement) : la carte reste courte."""
+    merged: List[ShardRange] = []
+    for r in sorted(ranges, key=lambda r: r.start):
+        last = merged[-1] if merged else None
+        if last is not None and last.shard == r.shard and not (last.moving or r.moving) \
+                and last.end is not None and last.end + 1 == r.start:
+            merged[-1] = ShardRange(last.start, r.end, r.shard)
+        else:
+            merged.append(r)
+    return merged
+
+
+def assign(ranges: List[ShardRange], start: int, end: Optional[int], shard: str, moving: bool = False) -> List[ShardRange]:
+    return merge(carve(ranges, start, end) + [ShardRange(start, end, shard, moving)])
+
+
+def source_shard(ranges: List[ShardRange], start: int, end: int) -> str:
+    """Shard qui possède toute la plage [start, end] ; erreur si elle est partagée ou incomplète.
+    Une plage restée gelée par un déplacement interrompu est acceptée : la commande est rejouable."""
+    expected, owners = start, set()
+    for r in sorted(ranges, key=lambda r: r.start):
+        if _end(r.end) < start or r.start > end:
+            continue
+        if r.start > expected:
+            break
+        owners.add(r.shard)
+        expected = _end(r.end) + 1
+    if expected <= end or len(owners) != 1:
+        sys.exit(f"La plage {start}-{end} doit appartenir entièrement à un seul shard.")
+    return owners.pop()
+
+
+# --- Copie par lots ---
+
+def base_columns(conn, table: str, exclude: Tuple[str, ...] = ()) -> List[str]:
+    """Colonnes insérables de `table` : les colonnes générées (telephone_inverse...) sont recalculées par le shard."""
+    cursor = conn.cursor()
+    cursor.execute("""SELECT COLUMN_NAME FROM information_schema.COLUMNS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND EXTRA NOT LIKE '%%GENERATED%%'
+                      ORDER BY ORDINAL_POSITION""", (table,))
+    return [name for (name,) in cursor.fetchall() if name not in exclude]
+
+
+def adherent_batches(conn, start: int, end: Optional[int], batch: int) -> Iterator[Tuple[int, int]]:
+    """(premier, dernier) id_adherent de chaque lot de `batch` adhérents existants dans [start, end] (pagination par clé)."""
+    cursor = conn.cursor()
+    last = start - 1
+    while True:
+        cursor.execute("SELECT id_adherent FROM adherents WHERE id_adherent > %s AND id_adherent <= %s "
+                       "ORDER BY id_adherent LIMIT %s", (last, end if end is not None else 2**31 - 1, batch))
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            return
+        yield ids[0], ids[-1]
+        last = ids[-1]
+
+
+def copy_batch(src, dst, columns: Dict[str, List[str]], first: int, last: int) -> Dict[str, int]:
+    """Copie les adhérents [first, last] et tout ce qui leur appartient ; rejouable (REPLACE / INSERT IGNORE)."""
+    selects = {
+        "adherents": ("SELECT {cols} FROM adherents WHERE id_adherent BETWEEN %s AND %s", "REPLACE"),
+        "contrats": ("SELECT {cols} FROM contrats WHERE id_adherent_principal BETWEEN %s AND %s", "REPLACE"),
+        "sinistres_artex": ("SELECT {cols} FROM sinistres_artex WHERE id_adherent BETWEEN %s AND %s", "REPLACE"),
+        # id_event est propre à chaque serveur : la clé unique journal_id évite les doublons d'un rejeu.
+        "audit_events": ("""SELECT {cols} FROM audit_events a
+                            LEFT JOIN sinistres_artex s ON a.entity_type = 'sinistre' AND a.entity_id = s.id_sinistre_artex
+                            WHERE (a.entity_type = 'adherent' AND a.entity_id BETWEEN %s AND %s)
+                               OR s.id_adherent BETWEEN %s AND %s""", "INSERT IGNORE"),
+    }
+    src_cursor, dst_cursor = src.cursor(), dst.cursor()
+    copied = {}
+    dst.start_transaction()
+    for table, (select, verb) in selects.items():
+        cols = columns[table]
+        prefix = "a." if table == "audit_events" else ""
+        src_cursor.execute(select.format(cols=", ".join(prefix + c for c in cols)),
+                           (first, last, first, last) if table == "audit_events" else (first, last))
+        rows = src_cursor.fetchall()
+        if rows:
+            dst_cursor.executemany(f"{verb} INTO {table} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))})", rows)
+        copied[table] = len(rows)
+    dst.commit()
+    return copied
+
+
+def delete_batch(conn, first: int, last: int):
+    cursor = conn.cursor()
+    conn.start_transaction()
+    cursor.execute("""DELETE a FROM audit_events a JOIN sinistres_artex s
+                      ON a.entity_type = 'sinistre' AND a.entity_id = s.id_sinistre_artex
+                      WHERE s.id_adherent BETWEEN %s AND %s""", (first, last))
+    cursor.execute("DELETE FROM audit_events WHERE entity_type = 'adherent' AND entity_id BETWEEN %s AND %s", (first, last))
+    cursor.execute("DELETE FROM sinistres_artex WHERE id_adherent BETWEEN %s AND %s", (first, last))
+    cursor.execute("DELETE FROM contrats WHERE id_adherent_principal BETWEEN %s AND %s", (first, last))
+    cursor.execute("DELETE FROM adherents WHERE id_adherent BETWEEN %s AND %s", (first, last))
+    conn.commit()
+
+
+def count_rows(conn, start: int, end: int) -> Dict[str, int]:
+    cursor = conn.cursor()
+    counts = {}
+    for table, column in (("adherents", "id_adherent"), ("contrats", "id_adherent_principal"),
+                          ("sinistres_artex", "id_adherent")):
+        cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} BETWEEN %s AND %s", (start, end))
+        counts[table] = cursor.fetchone()[0]
+    return counts
+
+
+# --- Commandes ---
+
+def cmd_status(directory, shards: Dict[str, dict], args):
+    for r in load_ranges(directory):
+        print(f"{r.start:>12} - {r.end if r.end is not None else '':<12} {r.shard:<16} {'déplacement' if r.moving else ''}")
+    for name, params in shards.items():
+        conn = mysql.connector.connect(**params)
+        try:
+            cursor = conn.cursor()
+            counts = []
+            for table in SHARDED_TABLES:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                counts.append(f"{table}={cursor.fetchone()[0]}")
+            print(f"{name:<16} {params['host']}:{params['port']}/{params['database']}  {'  '.join(counts)}")
+        finally:
+            conn.close()
+
+
+def cmd_apply_ddl(directory, shards: Dict[str, dict], args):
+    """Applique les migrations de sql/ sur chaque shard et leur réserve des blocs d'identifiants disjoints."""
+    for index, (name, params) in enumerate(shards.items()):
+        conn = mysql.connector.connect(**params)
+        try:
+            for filename in sorted(f for f in os.listdir(SQL_DIR) if f.endswith(".sql") and f != DIRECTORY_DDL):
+                apply_ddl(conn, filename)
+            if index:
+                # Les sinistres créés sur ce shard ne peuvent pas reprendre l'identifiant d'une ligne d'un autre shard.
+                cursor = conn.cursor()
+                for table in SHARDED_TABLES:
+                    cursor.execute(f"ALTER TABLE {table} AUTO_INCREMENT = {index * args.id_block}")
+            logger.info("Shard %s prêt (identifiants à partir de %s).", name, index * args.id_block or 1)
+        finally:
+            conn.close()
+
+
+def cmd_assign(directory, shards: Dict[str, dict], args):
+    if args.shard not in shards:
+        sys.exit(f"Shard inconnu : {args.shard} (DB_SHARDS : {', '.join(shards)})")
+    save_ranges(directory, assign(load_ranges(directory), args.start, args.end, args.shard))
+    logger.info("Plage %s-%s attribuée à %s.", args.start, args.end or "", args.shard)
+
+
+def cmd_rebuild_index(directory, shards: Dict[str, dict], args):
+    """Réindexe les adhérents, contrats et sinistres de chaque shard (idempotent, sans vider l'annuaire)."""
+    dir_cursor = directory.cursor()
+    for name, params in shards.items():
+        conn = mysql.connector.connect(**params)
+        try:
+            cursor = conn.cursor()
+            indexed = 0
+            for first, last in adherent_batches(conn, args.start, args.end, args.batch):
+                cursor.execute("SELECT id_adherent, nom, prenom, telephone, email FROM adherents "
+                               "WHERE id_adherent BETWEEN %s AND %s", (first, last))
+                adherents = cursor.fetchall()
+                cursor.execute("SELECT 'contrat', id_contrat, id_adherent_principal FROM contrats "
+                               "WHERE id_adherent_principal BETWEEN %s AND %s", (first, last))
+                entities = cursor.fetchall()
+                cursor.execute("SELECT 'sinistre', id_sinistre_artex, id_adherent FROM sinistres_artex "
+                               "WHERE id_adherent BETWEEN %s AND %s", (first, last))
+                entities += cursor.fetchall()
+                directory.start_transaction()
+                dir_cursor.executemany("REPLACE INTO adherent_directory (id_adherent, nom, prenom, telephone, email) "
+                                       "VALUES (%s, %s, %s, %s, %s)", adherents)
+                if entities:
+                    dir_cursor.executemany("REPLACE INTO entity_directory (entity_type, entity_id, id_adherent) "
+                                           "VALUES (%s, %s, %s)", entities)
+                directory.commit()
+                indexed += len(adherents)
+            logger.info("Shard %s : %s adhérent(s) indexé(s).", name, indexed)
+        finally:
+            conn.close()
+
+
+def cmd_move(directory, shards: Dict[str, dict], args):
+    if args.to not in shards:
+        sys.exit(f"Shard inconnu : {args.to} (DB_SHARDS : {', '.join(shards)})")
+    ranges = load_ranges(directory)
+    source = source_shard(ranges, args.start, args.end)
+    if source == args.to:
+        sys.exit(f"La plage {args.start}-{args.end} est déjà sur {args.to}.")
+    src = mysql.connector.connect(**shards[source])
+    dst = mysql.connector.connect(**shards[args.to])
+    try:
+        # 1. Gel des écritures de la plage : les workers les refusent dès leur prochaine lecture de la carte.
+        save_ranges(directory, assign(ranges, args.start, args.end, source, moving=True))
+        logger.info("Plage %s-%s gelée sur %s ; attente de %.0f s.", args.start, args.end, source, args.grace_seconds)
+        time.sleep(args.grace_seconds)
+
+        # 2. Copie par lots d'adhérents (rejouable si l'outil est relancé après une erreur).
+        columns = {table: base_columns(src, table) for table in SHARDED_TABLES}
+        columns["audit_events"] = base_columns(src, "audit_events", exclude=("id_event",))
+        totals: Dict[str, int] = {}
+        for first, last in adherent_batches(src, args.start, args.end, args.batch):
+            for table, copied in copy_batch(src, dst, columns, first, last).items():
+                totals[table] = totals.get(table, 0) + copied
+        logger.info("Copié vers %s : %s", args.to, ", ".join(f"{t}={n}" for t, n in totals.items()))
+
+        # 3. Vérification avant bascule.
+        expected, found = count_rows(src, args.start, args.end), count_rows(dst, args.start, args.end)
+        if expected != found:
+            sys.exit(f"Copie incomplète (source {expected}, destination {found}) : plage laissée gelée sur {source}, "
+                     "relancer la commande.")
+
+        # 4. Bascule, puis attente que tous les workers lisent la nouvelle carte avant de purger la source.
+        save_ranges(directory, assign(load_ranges(directory), args.start, args.end, args.to))
+        logger.info("Plage %s-%s basculée sur %s ; attente de %.0f s avant purge.", args.start, args.end, args.to,
+                    args.grace_seconds)
+        time.sleep(args.grace_seconds)
+
+        for first, last in adherent_batches(src, args.start, args.end, args.batch):
+            delete_batch(src, first, last)
+        logger.info("Plage %s-%s purgée de %s.", args.start, args.end, source)
+    finally:
+        src.close()
+        dst.close()
+
+
+def main():
+    refresh = float(os.getenv("DB_SHARD_MAP_REFRESH_SECONDS", "5"))
+    parser = argparse.ArgumentParser(description="Administration des shards d'adhérents (DB_SHARDS).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Plages et volumes par shard.")
+    ddl = commands.add_parser("apply-ddl", help="Schéma sur chaque shard et blocs d'identifiants disjoints.")
+    ddl.add_argument("--id-block", type=int, default=100_000_000,
+                     help="Taille du bloc d'identifiants réservé à chaque shard (le shard n démarre à n × bloc).")
+    assign_cmd = commands.add_parser("assign", help="Attribue une plage d'adhérents à un shard, sans déplacer de données.")
+    assign_cmd.add_argument("--start", type=int, required=True)
+    assign_cmd.add_argument("--end", type=int, help="Borne incluse ; sans borne si absente.")
+    assign_cmd.add_argument("--shard", required=True)
+    rebuild = commands.add_parser("rebuild-index", help="Reconstruit les index globaux de l'annuaire.")
+    rebuild.add_argument("--start", type=int, default=1)
+    rebuild.add_argument("--end", type=int)
+    rebuild.add_argument("--batch", type=int, default=5000, help="Adhérents par transaction.")
+    move = commands.add_parser("move", help="Déplace une plage d'adhérents vers un autre shard.")
+    move.add_argument("--start", type=int, required=True)
+    move.add_argument("--end", type=int, required=True, help="Borne incluse.")
+    move.add_argument("--to", required=True)
+    move.add_argument("--batch", type=int, default=1000, help="Adhérents par transaction de copie et de purge.")
+    move.add_argument("--grace-seconds", type=float, default=2 * refresh + 1,
+                      help="Attente pour que les workers relisent la carte (par défaut 2 × DB_SHARD_MAP_REFRESH_SECONDS + 1).")
+    args = parser.parse_args()
+
+    db = ExtranetDatabaseDriver()
+    if db.shards is None:
+        sys.exit("DB_SHARDS n'est pas défini : rien à administrer.")
+    directory = mysql.connector.connect(**db.connection_params)
+    try:
+        handler = {"status": cmd_status, "apply-ddl": cmd_apply_ddl, "assign": cmd_assign,
+                   "rebuild-index": cmd_rebuild_index, "move": cmd_move}[args.command]
+        handler(directory, db.shards.shards, args)
+    finally:
+        directory.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# replicas.py
+
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import mysql.connector
+
+logger = logging.getLogger("artex_agent.replicas")
+
+# --- Lecture de ses propres écritures, par appel ---
+# Chaque appel lie un état mutable partagé par toutes ses tâches (et les threads lancés via asyncio.to_thread).
+# Après une écriture, les lectures de l'appel restent sur le primaire tant qu'aucun réplica n'a rattrapé ce retard.
+_db_session: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("artex_db_session", default=None)
+
+
+def bind_db_session():
+    """Ouvre un état de session BD pour l'appel courant (à appeler au début de chaque appel)."""
+    _db_session.set({"last_write": 0.0})
+
+
+def mark_session_write():
+    """Enregistre qu'une écriture vient d'avoir lieu dans l'appel courant."""
+    state = _db_session.get()
+    if state is not None:
+        state["last_write"] = time.monotonic()
+
+
+def seconds_since_session_write() -> Optional[float]:
+    """Temps écoulé depuis la dernière écriture de l'appel courant (None s'il n'y en a pas eu)."""
+    state = _db_session.get()
+    if not state or not state["last_write"]:
+        return None
+    return time.monotonic() - state["last_write"]
+
+
+@dataclass
+class Replica:
+    host: str
+    params: Dict[str, Any]
+    healthy: bool = False           # Inconnu tant que le premier contrôle n'a pas eu lieu
+    lag_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def mark_down(self, err: Exception):
+        self.healthy = False
+        self.last_error = str(err)
+        logger.warning("Réplica %s écarté : %s", self.host, err)
+
+
+@dataclass
+class ReplicaSet:
+    """
+    Réplicas de lecture (DB_REPLICA_HOSTS) avec contrôle périodique du retard de réplication.
+    Un réplica n'est utilisé que s'il répond et que son retard est inférieur à `max_lag` ;
+    sinon les lectures retombent sur le primaire.
+    """
+    replicas: List[Replica]
+    max_lag: float = 5.0
+    check_interval: float = 5.0
+    _cycle: Any = field(default=None, repr=False)
+    _thread: Optional[threading.Thread] = field(default=None, repr=False)
+
+    @classmethod
+    def from_hosts(cls, hosts: str, base_params: Dict[str, Any], max_lag: float, check_interval: float) -> "ReplicaSet":
+        replicas = []
+        for host in filter(None, (h.strip() for h in hosts.split(","))):
+            params = dict(base_params)
+            name, _, port = host.partition(":")
+            params["host"] = name
+            if port:
+                params["port"] = int(port)
+            params["connection_timeout"] = params.get("connection_timeout", 3)
+            replicas.append(Replica(host=host, params=params))
+        return cls(replicas=replicas, max_lag=max_lag, check_interval=check_interval)
+
+    def start(self):
+        self._cycle = itertools.cycle(self.replicas)
+        self._check_all()
+        self._thread = threading.Thread(target=self._run, name="artex-replica-health", daemon=True)
+        self._thread.start()
+        logger.info("%s réplica(s) de lecture configuré(s) : %s", len(self.replicas),
+                    ", ".join(f"{r.host} ({'ok' if r.healthy else 'indisponible'})" for r in self.replicas))
+
+    def _run(self):
+        while True:
+            time.sleep(self.check_interval)
+            self._check_all()
+
+    def _check_all(self):
+        for replica in self.replicas:
+            try:
+                conn = mysql.connector.connect(**replica.params)
+                try:
+                    cursor = conn.cursor(dictionary=True)
+                    try:
+                        cursor.execute("SHOW REPLICA STATUS")
+                    except mysql.connector.Error:
+                        cursor.execute("SHOW SLAVE STATUS")  # MySQL < 8.0.22
+                    status = cursor.fetchone() or {}
+                finally:
+                    conn.close()
+                lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+                if lag is None:
+                    raise RuntimeError("réplication arrêtée ou non configurée")
+                was_healthy = replica.healthy
+                replica.lag_seconds = float(lag)
+                replica.healthy = replica.lag_seconds <= self.max_lag
+                if not replica.healthy:
+                    logger.warning("Réplica %s en retard de %.0f s : lectures redirigées.", replica.host, replica.lag_seconds)
+                elif not was_healthy:
+                    logger.info("Réplica %s de nouveau disponible (retard %.0f s).", replica.host, replica.lag_seconds)
+            except Exception as err:
+                if replica.healthy:
+                    replica.mark_down(err)
+                replica.last_error = str(err)
+
+    def choose(self, since_write: Optional[float], exclude: Optional[Replica] = None) -> Optional[Replica]:
+        """
+        Choisit un réplica (tourniquet) pour une lecture, ou None pour lire sur le primaire.
+        Si l'appel a écrit récemment, seul un réplica dont le retard (arrondi à la seconde par MySQL)
+        est inférieur au temps écoulé depuis l'écriture peut servir la lecture.
+        `exclude` écarte un réplica déjà sollicité (second essai d'une lecture couverte).
+        """
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica is exclude or not replica.healthy or replica.lag_seconds is None:
+                continue
+            if since_write is not None and replica.lag_seconds + 1.0 > since_write:
+                continue
+            return replica
+        return None
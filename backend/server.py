@@ -1,14 +1,72 @@
+import math
 import os
-from flask import Flask, request
+import threading
+import time
+from flask import Flask, Response, g, request
 from dotenv import load_dotenv
 from flask_cors import CORS
 from livekit.api import LiveKitAPI, AccessToken, VideoGrants, ListRoomsRequest # Importations mises à jour
 import uuid
+from loop_watchdog import Histogram
+from rate_limit import TokenBucketLimiter
 
 load_dotenv()
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}})
+# Origines autorisées séparées par des virgules ; par défaut le serveur de développement Vite.
+CORS(app, resources={r"/*": {"origins": os.getenv("ARTEX_CORS_ORIGINS", "http://localhost:5173").split(",")}})
+
+# --- Limitation de débit de /create-token ---
+# Un seau par identité demandée, et un seau plus large par adresse IP pour les clients qui font varier l'identité.
+_token_rate = float(os.getenv("ARTEX_TOKEN_RATE_PER_MINUTE", "10")) / 60
+_token_burst = int(os.getenv("ARTEX_TOKEN_BURST", "5"))
+identity_limiter = TokenBucketLimiter(_token_rate, _token_burst)
+ip_limiter = TokenBucketLimiter(_token_rate * 10, _token_burst * 10)
+
+# --- Métriques HTTP ---
+_request_histograms = {}
+_request_histograms_lock = threading.Lock()
+_rate_limited = {"identity": 0, "ip": 0}
+
+
+def _histogram_for(endpoint: str, status: int) -> Histogram:
+    key = (endpoint, status)
+    histogram = _request_histograms.get(key)
+    if histogram is None:
+        with _request_histograms_lock:
+            histogram = _request_histograms.setdefault(key, Histogram(
+                "artex_http_request_duration_ms", "Durée de traitement des requêtes HTTP.",
+                labels={"endpoint": endpoint, "status": str(status)}))
+    return histogram
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_latency(response):
+    started = g.get("request_started")
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "<inconnu>"
+        _histogram_for(endpoint, response.status_code).observe((time.perf_counter() - started) * 1000)
+    return response
+
+
+def _too_many_requests(scope: str, retry_after: float):
+    _rate_limited[scope] += 1
+    return {"error": "Trop de requêtes, réessayez plus tard."}, 429, {"Retry-After": str(math.ceil(retry_after))}
+
+
+@app.route("/metrics", methods=['GET'])
+def metrics():
+    histograms = sorted(_request_histograms.items())
+    parts = [h.render(include_header=(i == 0)) for i, (_, h) in enumerate(histograms)]
+    parts += ["# HELP artex_http_rate_limited_total Requêtes /create-token refusées par le limiteur.",
+              "# TYPE artex_http_rate_limited_total counter"]
+    parts += [f'artex_http_rate_limited_total{{scope="{scope}"}} {count}' for scope, count in _rate_limited.items()]
+    return Response("\n".join(parts) + "\n", mimetype="text/plain; version=0.0.4")
 
 async def generate_room_name():
     name = "room-" + str(uuid.uuid4())[:8]
@@ -37,10 +95,17 @@ async def get_rooms():
 
 @app.route("/create-token", methods=['POST'])
 async def get_token():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     room_name = data.get("room_name")
     identity = data.get("identity", "default-identity") # Identité par défaut
 
+    allowed, retry_after = ip_limiter.acquire(request.remote_addr)
+    if not allowed:
+        return _too_many_requests("ip", retry_after)
+    allowed, retry_after = identity_limiter.acquire(identity)
+    if not allowed:
+        return _too_many_requests("identity", retry_after)
+
     if not room_name:
         room_name = await generate_room_name() # Conserver la logique originale pour générer la salle si non fournie
 
@@ -62,4 +127,4 @@ async def get_token():
     return {"token": token_builder.to_jwt()} # Retourner comme objet JSON
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5001, debug=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5001, debug=os.getenv("FLASK_DEBUG") == "1")
\ No newline at end of file
@@ -0,0 +1,268 @@
+# session_state.py
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import typing
+from dataclasses import asdict, fields
+from datetime import date
+from typing import Any, Dict, Optional
+
+from db_driver import Adherent
+from log_pipeline import update_log_context
+
+logger = logging.getLogger("artex_agent.session_state")
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints", "sessions.sqlite3")
+
+# Version du format sérialisé. À incrémenter à chaque changement incompatible de encode_state() :
+# un point de reprise d'une autre version est ignoré (l'appelant se réidentifie) plutôt que mal relu.
+STATE_VERSION = 3
+
+# Fins de session normales (AgentSession, événement "close") : le point de reprise est supprimé.
+# Après "job_shutdown" ou "error" (worker drainé ou arrêté), il est conservé pour le worker de remplacement.
+_FINAL_CLOSE_REASONS = {"participant_disconnected", "user_initiated", "task_completed"}
+
+
+# --- Sérialisation ---
+
+def _encode(value) -> Optional[Dict[str, Any]]:
+    return None if value is None else asdict(value)
+
+
+def _decode(cls, data: Optional[Dict[str, Any]]):
+    """Reconstruit une dataclass du pilote ; les champs inconnus sont ignorés, les dates relues depuis l'ISO."""
+    if data is None:
+        return None
+    hints = typing.get_type_hints(cls)
+    values = {}
+    for f in fields(cls):
+        if f.name not in data:
+            continue
+        value = data[f.name]
+        if value is not None and date in (hints[f.name], *typing.get_args(hints[f.name])):
+            value = date.fromisoformat(value)
+        values[f.name] = value
+    return cls(**values)
+
+
+def caller_identity(participant_identity: Optional[str], caller_number: Optional[str]) -> str:
+    """Identité de l'appelant à laquelle un point de reprise est lié : participant LiveKit et numéro appelant."""
+    return f"{participant_identity or ''}|{caller_number or ''}"
+
+
+def encode_state(userdata: Dict[str, Any], caller: str) -> bytes:
+    """
+    État d'une session en JSON compact : appelant et adhérent en cours de traitement (confirmé ou non).
+    Quelques centaines d'octets par appel.
+    """
+    adherent: Optional[Adherent] = userdata.get("adherent_context") or userdata.get("unconfirmed_adherent")
+    state: Dict[str, Any] = {"v": STATE_VERSION, "caller": caller, "adherent": _encode(adherent)}
+    return json.dumps(state, separators=(",", ":"), ensure_ascii=False, default=date.isoformat).encode("utf-8")
+
+
+def restore_state(userdata: Dict[str, Any], blob: bytes, caller: str) -> bool:
+    """
+    Réapplique un état encodé par encode_state() à `userdata`. Retourne False si le format est inconnu ou si
+    l'état a été enregistré pour un autre appelant.
+
+    L'adhérent est toujours restauré NON confirmé : l'identité LiveKit et le nom de salle sont choisis par le
+    client (voir server.py, /create-token), ils ne prouvent pas que c'est le même appelant. Celui-ci doit
+    repasser par confirm_identity ; la reprise lui évite seulement de refaire la recherche.
+    """
+    state = json.loads(blob)
+    if state.get("v") != STATE_VERSION:
+        logger.warning("Point de reprise en version %s ignoré (version courante : %s).", state.get("v"), STATE_VERSION)
+        return False
+    if state.get("caller") != caller:
+        logger.warning("Point de reprise ignoré : enregistré pour un autre appelant que celui de la salle.")
+        return False
+    adherent: Optional[Adherent] = _decode(Adherent, state.get("adherent"))
+    userdata["adherent_context"] = None
+    userdata["unconfirmed_adherent"] = adherent
+    if adherent is not None:
+        update_log_context(adherent_id=adherent.id_adherent)
+    return True
+
+
+# --- Stockage local ---
+
+class CheckpointStore:
+    """
+    Points de reprise des sessions dans une base SQLite locale (mode WAL), partagée par les workers de l'hôte.
+
+    `save()` ne fait que déposer l'état dans un dictionnaire : un thread dédié écrit par lots, et seul le
+    dernier état de chaque session est écrit (les états intermédiaires sont fusionnés). `load()` est une
+    lecture par clé primaire, de l'ordre de la milliseconde : le worker de remplacement reprend la session
+    sans interroger la base métier. Les points de reprise plus vieux que `ttl` secondes sont ignorés et purgés.
+    """
+    def __init__(self, path: str, ttl: float = 900.0, flush_interval: float = 0.2):
+        self.path = path
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Optional[bytes]] = {}  # None : suppression
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["CheckpointStore"]:
+        """Stockage configuré par l'environnement, ou None si ARTEX_CHECKPOINTS=0."""
+        if os.getenv("ARTEX_CHECKPOINTS", "1") == "0":
+            return None
+        return cls(
+            path=os.getenv("ARTEX_CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH),
+            ttl=float(os.getenv("ARTEX_CHECKPOINT_TTL_SECONDS", "900")),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Un point de reprise perdu à la coupure de courant coûte une réidentification
+        conn.execute("""CREATE TABLE IF NOT EXISTS session_checkpoints (
+                            session_key TEXT PRIMARY KEY,
+                            version     INTEGER NOT NULL,
+                            state       BLOB NOT NULL,
+                            updated_at  REAL NOT NULL)""")
+        return conn
+
+    def ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="artex-checkpoints", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def session(self, session_key: str, caller: str) -> "SessionCheckpoint":
+        self.ensure_started()
+        return SessionCheckpoint(self, session_key, caller)
+
+    def save(self, session_key: str, blob: bytes):
+        with self._lock:
+            self._pending[session_key] = blob
+        self._wakeup.set()
+
+    def delete(self, session_key: str):
+        with self._lock:
+            self._pending[session_key] = None
+        self._wakeup.set()
+
+    def load(self, session_key: str) -> Optional[bytes]:
+        """Dernier état enregistré pour la session (en attente d'écriture compris), ou None."""
+        with self._lock:
+            if session_key in self._pending:
+                return self._pending[session_key]
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT state FROM session_checkpoints WHERE session_key = ? AND updated_at >= ?",
+                               (session_key, time.time() - self.ttl)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    # --- Écriture (thread dédié) ---
+
+    def _run(self):
+        conn = None
+        last_purge = float("-inf")
+        while not self._closed:
+            self._wakeup.wait()
+            time.sleep(self.flush_interval)  # Regroupe les points de reprise rapprochés dans une transaction
+            self._wakeup.clear()
+            try:
+                conn = conn or self._connect()
+                self._flush(conn)
+                if time.monotonic() - last_purge > self.ttl:
+                    with conn:
+                        conn.execute("DELETE FROM session_checkpoints WHERE updated_at < ?", (time.time() - self.ttl,))
+                    last_purge = time.monotonic()
+            except sqlite3.Error as err:
+                logger.error("Écriture des points de reprise impossible dans %s : %s", self.path, err)
+                conn = None
+        if conn is not None:
+            conn.close()
+
+    def _flush(self, conn: sqlite3.Connection):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        now = time.time()
+        with conn:
+            for session_key, blob in batch.items():
+                if blob is None:
+                    conn.execute("DELETE FROM session_checkpoints WHERE session_key = ?", (session_key,))
+                else:
+                    conn.execute("REPLACE INTO session_checkpoints (session_key, version, state, updated_at) "
+                                 "VALUES (?, ?, ?, ?)", (session_key, STATE_VERSION, blob, now))
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+        try:
+            conn = self._connect()
+            try:
+                self._flush(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error as err:
+            logger.error("Écriture des points de reprise impossible dans %s : %s", self.path, err)
+
+
+class SessionCheckpoint:
+    """
+    Point de reprise d'une session : réécrit après chaque exécution d'outils si l'état a changé,
+    supprimé quand l'appel se termine normalement. Lié à l'appelant `caller` (caller_identity()).
+    """
+    def __init__(self, store: CheckpointStore, session_key: str, caller: str):
+        self.store = store
+        self.session_key = session_key
+        self.caller = caller
+        self._session = None
+        self._last: Optional[bytes] = None
+
+    def restore(self, userdata: Dict[str, Any]) -> bool:
+        """Réhydrate `userdata` depuis le point de reprise de la session, s'il existe. Sans requête en base."""
+        started = time.perf_counter()
+        blob = self.store.load(self.session_key)
+        if blob is None:
+            return False
+        try:
+            restored = restore_state(userdata, blob, self.caller)
+        except (ValueError, TypeError, KeyError) as err:
+            logger.error("Point de reprise illisible pour %s : %s", self.session_key, err)
+            return False
+        if restored:
+            self._last = blob
+            logger.info("Session %s reprise depuis son point de reprise en %.1f ms.",
+                        self.session_key, (time.perf_counter() - started) * 1000)
+        return restored
+
+    def attach(self, session):
+        self._session = session
+        session.on("function_tools_executed", self._on_tools_executed)
+        session.on("close", self._on_close)
+
+    def checkpoint(self):
+        """Enregistre l'état courant s'il a changé depuis le dernier point de reprise."""
+        blob = encode_state(self._session.userdata, self.caller)
+        if blob != self._last:
+            self._last = blob
+            self.store.save(self.session_key, blob)
+
+    def _on_tools_executed(self, event):
+        self.checkpoint()
+
+    def _on_close(self, event):
+        reason = getattr(getattr(event, "reason", None), "value", None)
+        if reason in _FINAL_CLOSE_REASONS:
+            self.store.delete(self.session_key)
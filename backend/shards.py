@@ -0,0 +1,103 @@
+# shards.py
+
+import bisect
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from circuit_breaker import DatabaseUnavailable
+
+logger = logging.getLogger("artex_agent.shards")
+
+
+class ShardMapError(Exception):
+    """Carte des shards incohérente : adhérent hors de toute plage, ou shard inconnu de DB_SHARDS."""
+
+
+@dataclass
+class ShardRange:
+    start: int
+    end: Optional[int]  # Borne incluse ; None : sans borne
+    shard: str
+    moving: bool = False
+
+    def contains(self, adherent_id: int) -> bool:
+        return self.start <= adherent_id and (self.end is None or adherent_id <= self.end)
+
+
+def parse_shards(raw: str, base_params: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    'shard0=db0:3306/artex,shard1=db1/artex' -> {nom: paramètres de connexion}.
+    Utilisateur, mot de passe et délais sont ceux de la base annuaire ; la base par défaut aussi.
+    """
+    shards = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, target = item.partition("=")
+        address, _, database = target.partition("/")
+        host, _, port = address.partition(":")
+        params = dict(base_params)
+        params["host"] = host
+        params["port"] = int(port) if port else 3306
+        if database:
+            params["database"] = database
+        shards[name.strip()] = params
+    return shards
+
+
+class ShardMap:
+    """
+    Répartition des adhérents entre plusieurs instances MySQL par plages d'id_adherent.
+
+    Les plages sont lues dans la table shard_ranges de la base annuaire (sql/004_shard_directory.sql)
+    et relues au plus toutes les `refresh_interval` secondes, à la demande : un déplacement de plage par
+    rebalance_shards.py est pris en compte par tous les workers sans redémarrage. Un adhérent, ses contrats,
+    ses sinistres et leurs événements d'audit sont toujours sur le même shard.
+    Des plages plutôt qu'un hachage cohérent : un rééquilibrage déplace un intervalle contigu d'adhérents,
+    copiable par lots indexés, et les nouveaux adhérents vont tous dans la dernière plage.
+    """
+    def __init__(self, shards: Dict[str, Dict[str, Any]], load_ranges: Callable[[], List[ShardRange]],
+                 refresh_interval: float = 5.0):
+        self.shards = shards
+        self.refresh_interval = refresh_interval
+        self._load_ranges = load_ranges
+        self._ranges: List[ShardRange] = []
+        self._starts: List[int] = []
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        if time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            ranges = sorted(self._load_ranges(), key=lambda r: r.start)
+            unknown = {r.shard for r in ranges} - set(self.shards)
+            if unknown:
+                raise ShardMapError(f"shard(s) absent(s) de DB_SHARDS : {', '.join(sorted(unknown))}")
+            if [(r.start, r.end, r.shard, r.moving) for r in ranges] != \
+                    [(r.start, r.end, r.shard, r.moving) for r in self._ranges]:
+                logger.info("Carte des shards : %s", ", ".join(
+                    f"{r.start}-{r.end or ''}={r.shard}{' (déplacement)' if r.moving else ''}" for r in ranges))
+            self._ranges, self._starts = ranges, [r.start for r in ranges]
+            self._loaded_at = time.monotonic()
+
+    def range_for(self, adherent_id: int) -> ShardRange:
+        self._refresh()
+        index = bisect.bisect_right(self._starts, adherent_id) - 1
+        if index < 0 or not self._ranges[index].contains(adherent_id):
+            raise ShardMapError(f"aucune plage de shard ne couvre l'adhérent {adherent_id}")
+        return self._ranges[index]
+
+    def server_for(self, adherent_id: int, for_write: bool = False) -> Dict[str, Any]:
+        """Paramètres de connexion du shard de l'adhérent. Écriture dans une plage en déplacement : refusée."""
+        shard_range = self.range_for(adherent_id)
+        if for_write and shard_range.moving:
+            raise DatabaseUnavailable(f"plage {shard_range.start}-{shard_range.end or ''} en cours de déplacement")
+        return self.shards[shard_range.shard]
+
+    def servers(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Tous les shards, pour les parcours complets (iter_sinistres)."""
+        return list(self.shards.items())
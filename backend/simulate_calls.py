@@ -0,0 +1,275 @@
+# simulate_calls.py
+"""
+Rejoue N appels scénarisés en parallèle à travers le vrai `entrypoint` d'agent.py, dans un seul worker,
+avec les fournisseurs simulés (fake_providers.py) à la place de Google STT/TTS et Gemini.
+Mesure le surcoût propre du worker (outils, pilote de BD, boucle d'événements) et son plafond de concurrence.
+
+Périmètre : SimulatedSession remplace AgentSession et enchaîne elle-même STT → LLM → outils → TTS, en
+appelant les outils directement. Le pipeline LiveKit (AgentSession/AgentActivity : VAD, détection de fin
+de tour, ordonnancement des réponses, E/S de la salle) n'est PAS exécuté : `worker_overhead_ms` ne le
+comprend pas, et ce simulateur ne valide pas le comportement réel d'une session. Il compare des versions
+des outils, du pilote et de l'entrypoint entre elles, pas la latence de bout en bout d'un appel.
+
+Exemple :
+    python simulate_calls.py --calls 200 --concurrency 50 --scripts call_scripts.example.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Les fournisseurs doivent être choisis AVANT l'import d'agent.py, qui charge leur plugin au démarrage.
+os.environ.setdefault("ARTEX_PROVIDERS", "fake")
+
+
+@dataclass
+class CallMetrics:
+    turn_latencies: List[float] = field(default_factory=list)   # Fin de parole → premier audio de réponse
+    provider_waits: List[float] = field(default_factory=list)   # Part due aux latences simulées STT/LLM/TTS
+    tool_latencies: List[float] = field(default_factory=list)   # Exécution des outils (BD comprise)
+    error: Optional[str] = None
+
+
+class SimulatedRoom:
+    def __init__(self, caller_number: Optional[str]):
+        self.name = f"sim-{uuid.uuid4().hex[:8]}"
+        self.metadata = json.dumps({"caller_number": caller_number}) if caller_number else ""
+
+
+class SimulatedJobContext:
+    """Sous-ensemble de JobContext utilisé par `entrypoint`."""
+    def __init__(self, caller_number: Optional[str]):
+        from types import SimpleNamespace
+        self.job = SimpleNamespace(id=f"sim-job-{uuid.uuid4().hex[:8]}")
+        self.room = SimulatedRoom(caller_number)
+        self.participant = SimpleNamespace(identity=f"sim-caller-{uuid.uuid4().hex[:8]}")
+        self._shutdown_callbacks: List[Callable] = []
+
+    async def wait_for_participant(self):
+        return self.participant
+
+    def add_shutdown_callback(self, callback: Callable):
+        self._shutdown_callbacks.append(callback)
+
+    async def shutdown(self):
+        for callback in self._shutdown_callbacks:
+            await callback()
+
+
+class SimulatedSession:
+    """
+    Remplace AgentSession : pas de salle ni d'audio réel, mais le même enchaînement
+    STT → LLM → outils → LLM → TTS, avec les fournisseurs de l'agent et les vrais outils de tools.py.
+    Les outils reçoivent la session comme contexte (au lieu d'un RunContext) : le coût d'AgentActivity
+    n'est pas mesuré.
+    """
+    def __init__(self, script, metrics: CallMetrics):
+        self.userdata: Dict[str, Any] = {}
+        self.script = script
+        self.metrics = metrics
+        self.agent = None
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._first_audio_at: Optional[float] = None  # Premier audio d'une réponse lue par un outil (SpokenList)
+        self._first_audio = asyncio.Event()
+
+    def on(self, event: str, callback: Callable):
+        self._handlers.setdefault(event, []).append(callback)
+        return callback
+
+    def emit(self, event: str, payload):
+        for callback in self._handlers.get(event, []):
+            callback(payload)
+
+    async def start(self, agent, room=None):
+        self.agent = agent
+
+    def say(self, text, allow_interruptions: bool = True, add_to_chat_ctx: bool = True) -> asyncio.Task:
+        """Comme AgentSession.say : accepte un texte ou un flux de phrases, et rend la main immédiatement."""
+        if isinstance(text, str):
+            return asyncio.ensure_future(self._speak(text))
+        return asyncio.ensure_future(self._speak_stream(text))
+
+    async def _speak(self, text: str) -> float:
+        """Synthétise le texte ; retourne le temps jusqu'au premier audio."""
+        start = time.perf_counter()
+        ttfb = None
+        async with self.agent.tts.synthesize(text) as stream:
+            async for _ in stream:
+                if ttfb is None:
+                    ttfb = time.perf_counter() - start
+        return ttfb or 0.0
+
+    async def _speak_stream(self, sentences):
+        """Synthétise chaque phrase dès qu'elle arrive, comme le TTS en streaming de l'AgentSession."""
+        async for sentence in sentences:
+            start = time.perf_counter()
+            ttfb = await self._speak(sentence)
+            if not self._first_audio.is_set():
+                self._first_audio_at = start + ttfb
+                self._first_audio.set()
+
+    async def replay(self):
+        from livekit import rtc
+        from livekit.agents import llm, ConversationItemAddedEvent, FunctionToolsExecutedEvent
+        from fake_providers import FakeSTT
+        import tools
+
+        stt_ = FakeSTT([turn.user for turn in self.script.turns], self.agent.llm.latencies)
+        silence = rtc.AudioFrame.create(16000, 1, 160)
+        chat_ctx = llm.ChatContext.empty()
+
+        for _ in self.script.turns:
+            turn_start = time.perf_counter()
+            waited = 0.0
+
+            t0 = time.perf_counter()
+            event = await stt_.recognize(buffer=[silence])
+            waited += time.perf_counter() - t0
+            message = chat_ctx.add_message(role="user", content=event.alternatives[0].text)
+            self.emit("conversation_item_added", ConversationItemAddedEvent(item=message))
+
+            self._first_audio.clear()
+            reply_required = True
+            while reply_required:
+                t0 = time.perf_counter()
+                text, calls = "", []
+                async with self.agent.llm.chat(chat_ctx=chat_ctx) as stream:
+                    async for chunk in stream:
+                        if chunk.delta:
+                            text += chunk.delta.content or ""
+                            calls.extend(chunk.delta.tool_calls or [])
+                waited += time.perf_counter() - t0
+                if not calls:
+                    break
+
+                reply_required = False
+                for call in calls:
+                    t0 = time.perf_counter()
+                    tool = getattr(tools, call.name)
+                    output = await tool(self, **json.loads(call.arguments or "{}"))
+                    self.metrics.tool_latencies.append(time.perf_counter() - t0)
+                    if isinstance(output, llm.ToolResult):
+                        reply_required = reply_required or output.reply_required
+                        output = output.output
+                    else:
+                        reply_required = True
+                    function_call = llm.FunctionCall(call_id=call.call_id, name=call.name, arguments=call.arguments)
+                    function_output = llm.FunctionCallOutput(call_id=call.call_id, name=call.name,
+                                                             output=str(output), is_error=False)
+                    chat_ctx.items.extend([function_call, function_output])
+                    self.emit("function_tools_executed", FunctionToolsExecutedEvent(
+                        function_calls=[function_call], function_call_outputs=[function_output]))
+
+            if not reply_required:
+                # Réponse lue par l'outil lui-même (SpokenList) : pas de nouvelle génération du LLM.
+                await self._first_audio.wait()
+                self.metrics.turn_latencies.append(self._first_audio_at - turn_start)
+                self.metrics.provider_waits.append(waited)
+                continue
+
+            message = chat_ctx.add_message(role="assistant", content=text)
+            self.emit("conversation_item_added", ConversationItemAddedEvent(item=message))
+            before_tts = time.perf_counter()
+            ttfb = await self._speak(text)
+            self.metrics.turn_latencies.append(before_tts - turn_start + ttfb)
+            self.metrics.provider_waits.append(waited + ttfb)
+
+
+# --- Pilote ---
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _monitor_loop_lag(samples: List[float], stop: asyncio.Event, interval: float = 0.01):
+    """Mesure le retard de réveil de la boucle d'événements : un indicateur direct des blocages."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def run_simulation(scripts, calls: int, concurrency: int) -> Dict[str, Any]:
+    from agent import entrypoint
+
+    semaphore = asyncio.Semaphore(concurrency)
+    all_metrics: List[CallMetrics] = []
+
+    async def one_call(index: int):
+        script = scripts[index % len(scripts)]
+        metrics = CallMetrics()
+        all_metrics.append(metrics)
+        async with semaphore:
+            ctx = SimulatedJobContext(script.caller_number)
+            session = SimulatedSession(script, metrics)
+            try:
+                await entrypoint(ctx, session_factory=lambda: session)
+                await session.replay()
+            except Exception as e:
+                metrics.error = f"{type(e).__name__}: {e}"
+            finally:
+                await ctx.shutdown()
+
+    lag_samples: List[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop_lag(lag_samples, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(one_call(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    turns = [t for m in all_metrics for t in m.turn_latencies]
+    overheads = [t - w for m in all_metrics for t, w in zip(m.turn_latencies, m.provider_waits)]
+    tool_times = [t for m in all_metrics for t in m.tool_latencies]
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "errors": sum(1 for m in all_metrics if m.error),
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(calls / elapsed, 2) if elapsed else 0.0,
+        "turns": len(turns),
+        "turn_latency_ms": {p: round(_percentile(turns, p) * 1000, 1) for p in (50, 95, 99)},
+        "worker_overhead_ms": {p: round(_percentile(overheads, p) * 1000, 1) for p in (50, 95, 99)},
+        "worker_overhead_scope": "outils, pilote de BD et boucle d'événements ; pipeline AgentSession/AgentActivity exclu",
+        "tool_latency_ms": {p: round(_percentile(tool_times, p) * 1000, 1) for p in (50, 95, 99)},
+        "loop_lag_ms": {"mean": round(statistics.fmean(lag_samples) * 1000, 2) if lag_samples else 0.0,
+                        "p99": round(_percentile(lag_samples, 99) * 1000, 2),
+                        "max": round(max(lag_samples, default=0.0) * 1000, 2)},
+        "first_errors": [m.error for m in all_metrics if m.error][:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue des appels simulés à travers l'entrypoint de l'agent.")
+    parser.add_argument("--scripts", default=os.path.join(os.path.dirname(__file__), "call_scripts.example.json"),
+                        help="Fichier JSON de scénarios d'appel.")
+    parser.add_argument("--calls", type=int, default=20, help="Nombre total d'appels simulés.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10],
+                        help="Un ou plusieurs niveaux de concurrence à mesurer successivement.")
+    parser.add_argument("--latencies", help='Latences simulées en JSON, ex. \'{"llm_ttft": 0.8, "jitter": 0.2}\'.')
+    args = parser.parse_args()
+
+    os.environ["ARTEX_FAKE_SCRIPTS"] = args.scripts
+    if args.latencies:
+        os.environ["ARTEX_FAKE_LATENCIES"] = args.latencies
+
+    from fake_providers import load_call_scripts
+    scripts = load_call_scripts(args.scripts)
+    for level in args.concurrency:
+        report = asyncio.run(run_simulation(scripts, args.calls, level))
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
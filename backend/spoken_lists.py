@@ -0,0 +1,71 @@
+# spoken_lists.py
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, List, Optional
+from livekit.agents.llm import ToolResult
+
+logger = logging.getLogger("artex_agent.spoken_lists")
+
+# Consigne jointe au résultat de l'outil : le LLM garde la liste (avec les ID internes) pour la suite
+# de l'appel, mais ne la reformule pas puisque l'adhérent l'a déjà entendue.
+ALREADY_SPOKEN_NOTE = "(Liste déjà lue à l'adhérent, ne pas la répéter.)"
+
+
+class SpokenList:
+    """
+    Réponse d'un outil de type liste lue phrase par phrase, au fur et à mesure de sa construction.
+
+    Sans streaming, l'outil construit toute la liste, le LLM la réécrit, puis seulement le TTS démarre.
+    Ici chaque élément est envoyé au TTS dès qu'il est formaté (session.say avec un flux de texte) :
+    l'adhérent entend le premier élément pendant que les suivants sont encore chargés,
+    et le tour se termine sans nouvelle génération du LLM (ToolResult sans réponse requise).
+
+    Usage :
+        spoken = SpokenList(context, "Voici vos contrats.")
+        try:
+            for item in items:
+                spoken.add(texte_lu, texte_pour_le_llm)
+        finally:
+            spoken.close()
+        return spoken.result()
+    """
+    def __init__(self, context: Any, intro: str):
+        self._queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        self._lines: List[str] = [intro]
+        self._handle = None
+        self._closed = False
+        # RunContext expose la session ; AgentSession et la session simulée sont leur propre session.
+        session = getattr(context, "session", context)
+        try:
+            self._handle = session.say(self._sentences(), allow_interruptions=True, add_to_chat_ctx=True)
+        except Exception as e:
+            # Session absente ou en cours de fermeture : le texte complet est rendu au LLM, comme avant.
+            logger.warning("Lecture en continu indisponible, réponse classique : %s", e)
+        self._queue.put_nowait(intro)
+
+    @property
+    def streaming(self) -> bool:
+        return self._handle is not None
+
+    async def _sentences(self) -> AsyncIterator[str]:
+        while (sentence := await self._queue.get()) is not None:
+            # L'espace final clôt la phrase pour le découpage en phrases du TTS : elle part sans attendre la suivante.
+            yield sentence + " "
+
+    def add(self, spoken: str, detail: Optional[str] = None):
+        """Envoie `spoken` au TTS ; `detail` (ID internes compris) est la version rendue au LLM."""
+        self._lines.append(detail or spoken)
+        if not self._closed:
+            self._queue.put_nowait(spoken)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(None)
+
+    def result(self) -> Any:
+        text = "\n".join(self._lines)
+        if not self.streaming:
+            return text
+        return ToolResult(f"{text}\n{ALREADY_SPOKEN_NOTE}", reply_required=False)
@@ -0,0 +1,67 @@
+-- 000_base_schema.sql
+-- Schéma de base des tables extranet, tel qu'utilisé par db_driver.py.
+-- Sert à créer une base locale de test (check_query_plans.py --seed) ; en production le schéma existe déjà.
+
+CREATE TABLE IF NOT EXISTS adherents (
+    id_adherent             INT NOT NULL AUTO_INCREMENT,
+    nom                     VARCHAR(100) NOT NULL,
+    prenom                  VARCHAR(100) NOT NULL,
+    date_adhesion_mutuelle  DATE NOT NULL,
+    date_naissance          DATE NULL,
+    adresse                 VARCHAR(255) NULL,
+    code_postal             VARCHAR(10) NULL,
+    ville                   VARCHAR(100) NULL,
+    telephone               VARCHAR(20) NULL,
+    email                   VARCHAR(255) NULL,
+    numero_securite_sociale VARCHAR(15) NULL,
+    PRIMARY KEY (id_adherent)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS formules (
+    id_formule          INT NOT NULL AUTO_INCREMENT,
+    nom_formule         VARCHAR(100) NOT NULL,
+    tarif_base_mensuel  DECIMAL(10,2) NOT NULL,
+    description_formule TEXT NULL,
+    PRIMARY KEY (id_formule)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS contrats (
+    id_contrat            INT NOT NULL AUTO_INCREMENT,
+    id_adherent_principal INT NOT NULL,
+    numero_contrat        VARCHAR(20) NOT NULL,
+    date_debut_contrat    DATE NOT NULL,
+    date_fin_contrat      DATE NULL,
+    id_formule            INT NOT NULL,
+    type_contrat          VARCHAR(50) NULL,
+    statut_contrat        VARCHAR(20) NOT NULL DEFAULT 'Actif',
+    PRIMARY KEY (id_contrat)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS garanties (
+    id_garantie INT NOT NULL AUTO_INCREMENT,
+    libelle     VARCHAR(100) NOT NULL,
+    description TEXT NULL,
+    PRIMARY KEY (id_garantie)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS formules_garanties (
+    id_formule                     INT NOT NULL,
+    id_garantie                    INT NOT NULL,
+    plafond_remboursement          DECIMAL(10,2) NULL,
+    taux_remboursement_pourcentage DECIMAL(5,2) NULL,
+    franchise                      DECIMAL(10,2) NULL DEFAULT 0.00,
+    conditions_specifiques         TEXT NULL,
+    PRIMARY KEY (id_formule, id_garantie)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS sinistres_artex (
+    id_sinistre_artex      INT NOT NULL AUTO_INCREMENT,
+    id_contrat             INT NOT NULL,
+    id_adherent            INT NOT NULL,
+    type_sinistre          VARCHAR(100) NOT NULL,
+    date_declaration_agent DATE NOT NULL,
+    statut_sinistre_artex  VARCHAR(50) NOT NULL,
+    description_sinistre   TEXT NULL,
+    date_survenance        DATE NULL,
+    PRIMARY KEY (id_sinistre_artex)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,19 @@
+-- 001_audit_events.sql
+-- Journal d'audit en ajout seul pour les changements de statut des sinistres et les mises à jour
+-- de coordonnées. Les notes ne sont plus concaténées dans sinistres_artex.description_sinistre :
+-- la ligne du sinistre garde une taille constante et l'historique vit ici.
+
+CREATE TABLE IF NOT EXISTS audit_events (
+    id_event        BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    journal_id      CHAR(32)        NOT NULL,              -- Identifiant de l'entrée du journal local (rejeu idempotent)
+    entity_type     VARCHAR(20)     NOT NULL,              -- 'sinistre' ou 'adherent'
+    entity_id       INT             NOT NULL,
+    event_type      VARCHAR(40)     NOT NULL,              -- 'status_change', 'contact_update'
+    statut          VARCHAR(50)     NULL,
+    note            TEXT            NULL,
+    payload         JSON            NULL,
+    created_at      DATETIME(3)     NOT NULL,
+    PRIMARY KEY (id_event),
+    UNIQUE KEY uq_audit_events_journal_id (journal_id),
+    KEY idx_audit_events_entity (entity_type, entity_id, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,20 @@
+-- 002_query_indexes.sql
+-- Index requis par les requêtes de db_driver.QUERIES. check_query_plans.py échoue si l'une d'elles
+-- retombe sur un parcours complet ou un tri fichier au-delà du seuil de lignes.
+-- MySQL ne connaît pas ADD INDEX IF NOT EXISTS : les erreurs « Duplicate key name » (1061) et
+-- « Duplicate column name » (1060) signifient que la migration est déjà appliquée.
+
+-- Recherche par suffixe de téléphone : l'index porte sur le numéro inversé (préfixe LIKE 'xxx%').
+ALTER TABLE adherents ADD COLUMN telephone_inverse VARCHAR(20)
+    GENERATED ALWAYS AS (REVERSE(telephone)) STORED;
+CREATE INDEX idx_adherents_telephone_inverse ON adherents (telephone_inverse);
+
+CREATE INDEX idx_adherents_email ON adherents (email);
+CREATE INDEX idx_adherents_nom_prenom ON adherents (nom, prenom);
+
+CREATE INDEX idx_contrats_adherent ON contrats (id_adherent_principal);
+
+-- formules_garanties : la clé primaire (id_formule, id_garantie) sert le filtre par formule.
+
+CREATE INDEX idx_sinistres_adherent ON sinistres_artex (id_adherent);
+CREATE INDEX idx_sinistres_statut ON sinistres_artex (statut_sinistre_artex);
@@ -0,0 +1,9 @@
+-- 003_contract_number_index.sql
+-- Recherche d'un contrat par son numéro tel que dicté par l'appelant (« CONTR00024 », « contre vingt-quatre »...).
+-- La partie numérique du numéro est extraite dans une colonne générée indexée : le préfixe, souvent mal
+-- transcrit par la reconnaissance vocale, et les zéros de tête ne participent pas à la recherche.
+-- Erreurs 1060/1061 : migration déjà appliquée (voir 002_query_indexes.sql).
+
+ALTER TABLE contrats ADD COLUMN numero_contrat_num INT UNSIGNED
+    GENERATED ALWAYS AS (CAST(REGEXP_SUBSTR(numero_contrat, '[0-9]+') AS UNSIGNED)) STORED;
+CREATE INDEX idx_contrats_adherent_numero ON contrats (id_adherent_principal, numero_contrat_num);
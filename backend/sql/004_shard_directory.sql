@@ -0,0 +1,38 @@
+-- 004_shard_directory.sql
+-- Base annuaire du mode shardé (DB_SHARDS, voir shards.py) : plages d'id_adherent par shard et index
+-- secondaires globaux. Les adhérents, contrats, sinistres et événements d'audit vivent sur le shard de
+-- leur adhérent ; les tables de référence (formules, garanties) restent dans la base annuaire.
+-- Sans DB_SHARDS, ces tables existent mais restent vides.
+
+-- Plages [range_start, range_end] (range_end NULL : sans borne). `moving` : plage en cours de déplacement
+-- par rebalance_shards.py, les écritures de ses adhérents sont refusées le temps de la copie.
+CREATE TABLE IF NOT EXISTS shard_ranges (
+    range_start INT         NOT NULL,
+    range_end   INT         NULL,
+    shard       VARCHAR(32) NOT NULL,
+    moving      TINYINT(1)  NOT NULL DEFAULT 0,
+    PRIMARY KEY (range_start)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Index global des recherches d'adhérents (téléphone, e-mail, nom) : clé -> id_adherent, puis plage -> shard.
+CREATE TABLE IF NOT EXISTS adherent_directory (
+    id_adherent       INT          NOT NULL,
+    nom               VARCHAR(100) NOT NULL,
+    prenom            VARCHAR(100) NOT NULL,
+    telephone         VARCHAR(20)  NULL,
+    email             VARCHAR(255) NULL,
+    telephone_inverse VARCHAR(20)  GENERATED ALWAYS AS (REVERSE(telephone)) STORED,
+    PRIMARY KEY (id_adherent),
+    KEY idx_directory_telephone_inverse (telephone_inverse),
+    KEY idx_directory_email (email),
+    KEY idx_directory_nom_prenom (nom, prenom)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Propriétaire des contrats et sinistres, pour les accès par leur identifiant seul (get_sinistre_by_id...).
+CREATE TABLE IF NOT EXISTS entity_directory (
+    entity_type VARCHAR(20) NOT NULL,   -- 'contrat' ou 'sinistre'
+    entity_id   INT         NOT NULL,
+    id_adherent INT         NOT NULL,
+    PRIMARY KEY (entity_type, entity_id),
+    KEY idx_entity_directory_adherent (id_adherent)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
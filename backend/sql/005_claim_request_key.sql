@@ -0,0 +1,8 @@
+-- 005_claim_request_key.sql
+-- Clé de requête des déclarations de sinistre faites par l'agent : une déclaration dont la confirmation
+-- n'est pas arrivée dans les délais (DB_WRITE_TIMEOUT_SECONDS) peut être relancée avec la même clé
+-- sans créer de doublon (ExtranetDatabaseDriver.create_sinistre).
+-- Erreurs 1060/1061 : migration déjà appliquée (voir 002_query_indexes.sql).
+
+ALTER TABLE sinistres_artex ADD COLUMN request_key CHAR(32) NULL;
+CREATE UNIQUE INDEX uq_sinistres_request_key ON sinistres_artex (request_key);
@@ -0,0 +1,54 @@
+# startup_check.py
+
+import importlib.util
+import logging
+import os
+from typing import Dict, List
+
+logger = logging.getLogger("artex_agent.startup_check")
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# L'analyseur vit à la racine du dépôt (find_duplicate.py) : il n'est pas dans le chemin d'import du worker.
+ANALYZER_PATH = os.path.join(os.path.dirname(BACKEND_DIR), "find_duplicate.py")
+
+
+class ToolRegistryError(RuntimeError):
+    """La liste d'outils d'api.py est invalide (doublon, outil non décoré, fichier illisible)."""
+
+
+def _load_analyzer():
+    spec = importlib.util.spec_from_file_location("find_duplicate", ANALYZER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def validate_tool_registry() -> List[Dict]:
+    """
+    Vérifie statiquement (AST, sans rien importer) les outils enregistrés par ArtexAgent dans api.py,
+    avant le chargement des modèles : une erreur coûte quelques millisecondes au lieu d'un démarrage complet.
+    Lève ToolRegistryError en cas d'erreur ; retourne les avertissements (noms non résolus).
+    Désactivable avec ARTEX_STARTUP_CHECK=0 ; ignoré si find_duplicate.py n'est pas déployé.
+    """
+    if os.getenv("ARTEX_STARTUP_CHECK", "1") == "0":
+        return []
+    if not os.path.exists(ANALYZER_PATH):
+        logger.warning("Vérification des outils ignorée : %s introuvable.", ANALYZER_PATH)
+        return []
+
+    analyzer = _load_analyzer()
+    files = analyzer.iter_python_files(BACKEND_DIR)
+    cache_path = os.path.join(BACKEND_DIR, analyzer.CACHE_FILENAME)
+    results, stats = analyzer.analyze_files(files, cache_path=cache_path, jobs=1)
+    api_path = os.path.join(BACKEND_DIR, "api.py")
+    problems = [p for p in analyzer.check_tool_registrations(results, [BACKEND_DIR])
+                if p["file"] == api_path or p["line"] == 0]  # Enregistrements d'api.py, et fichiers illisibles
+
+    errors = [p for p in problems if p["severity"] == "error"]
+    warnings = [p for p in problems if p["severity"] != "error"]
+    for problem in warnings:
+        logger.warning("Outils : %s:%s : %s", os.path.basename(problem["file"]), problem["line"], problem["message"])
+    if errors:
+        raise ToolRegistryError("; ".join(f"{os.path.basename(p['file'])}:{p['line']} : {p['message']}" for p in errors))
+    logger.info("Liste d'outils vérifiée (%s fichiers, %s relus).", stats["files"], stats["parsed"])
+    return warnings
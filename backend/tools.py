@@ -1,11 +1,21 @@
 # tools.py
 
+import asyncio
 import logging
+import uuid
 from typing import List, Optional
+from dataclasses import replace
+from functools import partial, wraps
 from datetime import date
 from decimal import Decimal
 from livekit.agents import function_tool, RunContext
 from db_driver import ExtranetDatabaseDriver, Adherent, Contrat, SinistreArtex
+from circuit_breaker import DatabaseUnavailable, OutcomeUnknown
+from contract_numbers import parse_contract_number
+from prefetch import SessionPrefetcher
+from spoken_lists import SpokenList
+from log_pipeline import update_log_context
+from prompts import DB_UNAVAILABLE_MESSAGE, WRITE_OUTCOME_UNKNOWN_MESSAGE
 
 logger = logging.getLogger("artex_agent.tools")
 
@@ -31,7 +41,8 @@ def _handle_lookup_result(context: RunContext, result: Optional[Adherent] | List
 
     # Une seule correspondance potentielle trouvée. La stocker pour confirmation.
     context.userdata["unconfirmed_adherent"] = result
-    logger.info(f"Adhérent non confirmé trouvé via {source}: {result.prenom} {result.nom} (ID: {result.id_adherent})")
+    update_log_context(adherent_id=result.id_adherent)
+    logger.info("Adhérent non confirmé trouvé via %s: %s %s (ID: %s)", source, result.prenom, result.nom, result.id_adherent)
     
     # Si la recherche a été faite par téléphone (automatique), on passe à la confirmation directe.
     if source == "phone":
@@ -42,6 +53,45 @@ def _handle_lookup_result(context: RunContext, result: Optional[Adherent] | List
             "Pour sécuriser l'accès, pouvez-vous me confirmer votre date de naissance et votre code postal ?") # Déjà en français
 
 
+def with_db_fallback(tool):
+    """
+    Décorateur des outils qui lisent ou écrivent en base : si la base est lente ou indisponible
+    (DatabaseUnavailable), l'outil répond immédiatement par un message de repli au lieu d'attendre.
+    Une écriture hors délai (OutcomeUnknown) a pu aboutir : l'appelant n'est pas invité à la refaire comme un échec.
+    """
+    @wraps(tool)
+    async def wrapper(context: RunContext, *args, **kwargs) -> str:
+        try:
+            return await tool(context, *args, **kwargs)
+        except OutcomeUnknown as err:
+            logger.warning("Outil %s : écriture sans confirmation dans les délais (%s).", tool.__name__, err)
+            return WRITE_OUTCOME_UNKNOWN_MESSAGE
+        except DatabaseUnavailable as err:
+            logger.warning("Outil %s : base indisponible (%s), réponse de repli.", tool.__name__, err)
+            return DB_UNAVAILABLE_MESSAGE
+    return wrapper
+
+
+async def _resolve_contract(context: RunContext, adherent: Adherent, reference: str) -> Optional[Contrat]:
+    """
+    Retrouve un contrat de l'adhérent à partir de son ID interne (« 12 ») ou de son numéro tel que dicté
+    (« CONTR00024 », « contre zéro zéro vingt-quatre »), sans passer par list_adherent_contracts.
+    Retourne None si la référence ne correspond à aucun contrat de l'adhérent.
+    """
+    db: ExtranetDatabaseDriver = context.userdata["db_driver"]
+    prefetcher: SessionPrefetcher = context.userdata["prefetcher"]
+    reference = str(reference).strip()
+    if reference.isdigit():
+        contract = await prefetcher.get("contrat", int(reference), db.get_contract_by_id, int(reference))
+        if contract and contract.id_adherent_principal == adherent.id_adherent:
+            return contract
+    number = parse_contract_number(reference)
+    if number is None:
+        return None
+    return await prefetcher.get("contrat_numero", (adherent.id_adherent, number),
+                                db.get_contract_by_number, adherent.id_adherent, number)
+
+
 # --- Outils d'Identité et de Contexte ---
 
 @function_tool
@@ -62,10 +112,12 @@ async def confirm_identity(context: RunContext, date_of_birth: str, postal_code:
     if unconfirmed.date_naissance == dob and unconfirmed.code_postal == postal_code:
         context.userdata["adherent_context"] = unconfirmed
         context.userdata["unconfirmed_adherent"] = None
-        logger.info(f"Identité confirmée pour : {unconfirmed.prenom} {unconfirmed.nom} (ID: {unconfirmed.id_adherent})")
+        logger.info("Identité confirmée pour : %s %s (ID: %s)", unconfirmed.prenom, unconfirmed.nom, unconfirmed.id_adherent)
+        # Les demandes suivantes portent presque toujours sur les contrats ou les sinistres : on les précharge.
+        context.userdata["prefetcher"].start(unconfirmed.id_adherent)
         return f"Merci ! Identité confirmée. Le dossier de {unconfirmed.prenom} {unconfirmed.nom} est maintenant ouvert. Comment puis-je vous aider ?" # Déjà en français
     else:
-        logger.warning(f"Échec de la confirmation d'identité pour l'ID adhérent : {unconfirmed.id_adherent}")
+        logger.warning("Échec de la confirmation d'identité pour l'ID adhérent : %s", unconfirmed.id_adherent)
         return "Les informations ne correspondent pas. Pour votre sécurité, je ne peux pas accéder à ce dossier." # Déjà en français
 
 @function_tool
@@ -75,33 +127,37 @@ async def clear_context(context: RunContext) -> str:
     """
     context.userdata["adherent_context"] = None
     context.userdata["unconfirmed_adherent"] = None
+    context.userdata["prefetcher"].reset()
     logger.info("Le contexte de l'agent a été effacé.")
     return "Le contexte a été réinitialisé. Comment puis-je vous aider ?" # Déjà en français
 
 # --- Outils de Recherche et de Gestion des Adhérents ---
 
 @function_tool
+@with_db_fallback
 async def lookup_adherent_by_email(context: RunContext, email: str) -> str:
     """Recherche un adhérent en utilisant son adresse e-mail pour commencer le processus d'identification."""
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    logger.info(f"Outil : Recherche d'adhérent par e-mail : {email}")
-    adherent = db.get_adherent_by_email(email.strip())
+    logger.info("Outil : Recherche d'adhérent par e-mail : %s", email)
+    adherent = await db.run(db.get_adherent_by_email, email.strip())
     return _handle_lookup_result(context, adherent, "email")
 
 @function_tool
+@with_db_fallback
 async def lookup_adherent_by_telephone(context: RunContext, telephone: str) -> str:
     """Recherche un adhérent par son numéro de téléphone. Destiné à la recherche automatique au début d'un appel."""
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    logger.info(f"Outil : Recherche d'adhérent par téléphone : {telephone}")
-    adherents = db.get_adherents_by_telephone(telephone.strip())
+    logger.info("Outil : Recherche d'adhérent par téléphone : %s", telephone)
+    adherents = await db.get_adherents_by_telephone_hedged(telephone.strip())
     return _handle_lookup_result(context, adherents, "phone")
 
 @function_tool
+@with_db_fallback
 async def lookup_adherent_by_fullname(context: RunContext, nom: str, prenom: str) -> str:
     """Recherche un adhérent en utilisant son nom complet pour commencer le processus d'identification."""
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    logger.info(f"Outil : Recherche d'adhérent par nom complet : {prenom} {nom}")
-    adherents = db.get_adherents_by_fullname(nom.strip(), prenom.strip())
+    logger.info("Outil : Recherche d'adhérent par nom complet : %s %s", prenom, nom)
+    adherents = await db.run(db.get_adherents_by_fullname, nom.strip(), prenom.strip())
     return _handle_lookup_result(context, adherents, "fullname")
 
 @function_tool
@@ -116,6 +172,7 @@ async def get_adherent_details(context: RunContext) -> str:
             f"Adresse: {adherent.adresse}, {adherent.code_postal} {adherent.ville}.")
 
 @function_tool
+@with_db_fallback
 async def update_contact_information(context: RunContext, address: Optional[str] = None, postal_code: Optional[str] = None, 
                                      city: Optional[str] = None, phone: Optional[str] = None, email: Optional[str] = None) -> str:
     """Met à jour les informations de contact (adresse, téléphone, e-mail) de l'adhérent actuellement confirmé."""
@@ -124,10 +181,13 @@ async def update_contact_information(context: RunContext, address: Optional[str]
         return "Action impossible. L'identité de l'adhérent doit être confirmée avant de pouvoir modifier des informations." # Déjà en français
 
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    success = db.update_adherent_contact_info(adherent.id_adherent, address, postal_code, city, phone, email)
+    success = await db.run_write(db.update_adherent_contact_info, adherent.id_adherent, address, postal_code, city, phone, email)
 
     if success:
-        context.userdata["adherent_context"] = db.get_adherent_by_id(adherent.id_adherent) # Rafraîchir le contexte
+        # Rafraîchir le contexte localement : avec le journal d'écritures différées, la base peut ne pas
+        # encore refléter la mise à jour.
+        changes = {"adresse": address, "code_postal": postal_code, "ville": city, "telephone": phone, "email": email}
+        context.userdata["adherent_context"] = replace(adherent, **{k: v for k, v in changes.items() if v is not None})
         return "Les informations de contact ont été mises à jour avec succès." # Déjà en français
     else:
         return "Une erreur s'est produite lors de la mise à jour des informations." # Déjà en français
@@ -135,37 +195,62 @@ async def update_contact_information(context: RunContext, address: Optional[str]
 # --- Outils de Contrat et de Couverture ---
 
 @function_tool
-async def list_adherent_contracts(context: RunContext) -> str:
-    """Liste tous les contrats associés à l'adhérent actuellement confirmé dans le contexte."""
+@with_db_fallback
+async def list_adherent_contracts(context: RunContext):
+    """
+    Liste tous les contrats associés à l'adhérent actuellement confirmé dans le contexte.
+    La liste est lue directement à l'adhérent, du contrat le plus récent au plus ancien.
+    """
     adherent: Optional[Adherent] = context.userdata.get("adherent_context")
     if not adherent:
         return "Veuillez d'abord confirmer l'identité d'un adhérent." # Déjà en français
     
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    contracts = db.get_contrats_by_adherent_id(adherent.id_adherent)
+    prefetcher: SessionPrefetcher = context.userdata["prefetcher"]
+    contracts = await prefetcher.get("contrats", adherent.id_adherent, db.get_contrats_by_adherent_id, adherent.id_adherent)
 
     if not contracts:
         return f"Aucun contrat trouvé pour {adherent.prenom} {adherent.nom}." # Déjà en français
     
-    response = f"Voici les contrats de {adherent.prenom} {adherent.nom}:\n" # Déjà en français
-    for c in contracts:
-        response += f"- Contrat N° {c.numero_contrat} (ID: {c.id_contrat}), Statut: {c.statut_contrat}\n"
-    return response
+    contracts = sorted(contracts, key=lambda c: c.date_debut_contrat, reverse=True)
+    # Détails (nom de la formule) chargés en parallèle, lus dans l'ordre : le premier contrat est
+    # annoncé dès que ses détails arrivent, pendant que les suivants se chargent encore.
+    details = [asyncio.ensure_future(prefetcher.get("details_contrat", c.id_contrat, db.get_full_contract_details, c.id_contrat))
+               for c in contracts]
+    spoken = SpokenList(context, f"Voici les contrats de {adherent.prenom} {adherent.nom}.") # Déjà en français
+    try:
+        for c, detail_future in zip(contracts, details):
+            detail = await detail_future
+            formule = f", formule {detail['nom_formule']}" if detail else ""
+            spoken.add(f"Contrat {c.numero_contrat}{formule}, {c.statut_contrat.lower()} depuis le {c.date_debut_contrat:%d/%m/%Y}.",
+                       f"- Contrat N° {c.numero_contrat} (ID: {c.id_contrat}){formule}, Statut: {c.statut_contrat}, "
+                       f"Début: {c.date_debut_contrat}")
+    finally:
+        spoken.close()
+        for future in details:
+            if not future.cancel():
+                future.exception()  # Détails non lus après une erreur : exception marquée comme récupérée
+    return spoken.result()
 
 @function_tool
-async def get_contract_details(context: RunContext, contract_id: int) -> str:
-    """Fournit les détails complets d'un contrat spécifique, y compris le nom du plan associé et le coût mensuel."""
+@with_db_fallback
+async def get_contract_details(context: RunContext, contract_id: str) -> str:
+    """
+    Fournit les détails complets d'un contrat spécifique, y compris le nom du plan associé et le coût mensuel.
+    `contract_id` accepte l'ID interne ou le numéro de contrat tel que donné par l'adhérent (ex. CONTR00024).
+    """
     adherent: Optional[Adherent] = context.userdata.get("adherent_context")
     if not adherent:
         return "Veuillez d'abord confirmer l'identité d'un adhérent." # Déjà en français
 
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    # Vérification de sécurité
-    user_contracts = db.get_contrats_by_adherent_id(adherent.id_adherent)
-    if contract_id not in [c.id_contrat for c in user_contracts]:
-        return f"Erreur: Le contrat ID {contract_id} n'appartient pas à {adherent.prenom} {adherent.nom}." # Déjà en français
+    prefetcher: SessionPrefetcher = context.userdata["prefetcher"]
+    # Vérification de sécurité : seuls les contrats de l'adhérent sont résolus
+    contract = await _resolve_contract(context, adherent, contract_id)
+    if not contract:
+        return f"Erreur: Le contrat {contract_id} n'appartient pas à {adherent.prenom} {adherent.nom}." # Déjà en français
 
-    details = db.get_full_contract_details(contract_id)
+    details = await prefetcher.get("details_contrat", contract.id_contrat, db.get_full_contract_details, contract.id_contrat)
     if not details:
         return f"Impossible de trouver les détails pour le contrat ID {contract_id}." # Déjà en français
 
@@ -175,18 +260,23 @@ async def get_contract_details(context: RunContext, contract_id: int) -> str:
             f"Période: du {details['date_debut_contrat']} au {details.get('date_fin_contrat', 'en cours')}.")
 
 @function_tool
-async def list_plan_guarantees(context: RunContext, contract_id: int) -> str:
-    """Liste toutes les garanties (couvertures) incluses dans le plan pour un contrat spécifique."""
+@with_db_fallback
+async def list_plan_guarantees(context: RunContext, contract_id: str) -> str:
+    """
+    Liste toutes les garanties (couvertures) incluses dans le plan pour un contrat spécifique.
+    `contract_id` accepte l'ID interne ou le numéro de contrat (ex. CONTR00024).
+    """
     adherent: Optional[Adherent] = context.userdata.get("adherent_context")
     if not adherent:
         return "Veuillez d'abord confirmer l'identité d'un adhérent." # Déjà en français
 
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    contract = db.get_contract_by_id(contract_id)
-    if not contract or contract.id_adherent_principal != adherent.id_adherent:
-        return f"Erreur: Le contrat ID {contract_id} est invalide ou n'appartient pas à l'adhérent." # Déjà en français
+    prefetcher: SessionPrefetcher = context.userdata["prefetcher"]
+    contract = await _resolve_contract(context, adherent, contract_id)
+    if not contract:
+        return f"Erreur: Le contrat {contract_id} est invalide ou n'appartient pas à l'adhérent." # Déjà en français
 
-    guarantees = db.get_guarantees_for_formula(contract.id_formule)
+    guarantees = await prefetcher.get("garanties", contract.id_formule, db.get_guarantees_for_formula, contract.id_formule)
     if not guarantees:
         return "Aucune garantie spécifique n'a été trouvée pour ce plan." # Déjà en français
 
@@ -194,18 +284,22 @@ async def list_plan_guarantees(context: RunContext, contract_id: int) -> str:
     return response
 
 @function_tool
-async def get_specific_coverage_details(context: RunContext, guarantee_name: str, contract_id: int) -> str:
-    """Obtient les conditions de remboursement détaillées (taux, plafond, franchise) pour une couverture spécifique unique sur un contrat donné."""
+@with_db_fallback
+async def get_specific_coverage_details(context: RunContext, guarantee_name: str, contract_id: str) -> str:
+    """
+    Obtient les conditions de remboursement détaillées (taux, plafond, franchise) pour une couverture spécifique unique sur un contrat donné.
+    `contract_id` accepte l'ID interne ou le numéro de contrat (ex. CONTR00024).
+    """
     adherent: Optional[Adherent] = context.userdata.get("adherent_context")
     if not adherent:
         return "Veuillez d'abord confirmer l'identité d'un adhérent." # Déjà en français
 
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    contract = db.get_contract_by_id(contract_id)
-    if not contract or contract.id_adherent_principal != adherent.id_adherent:
-        return f"Erreur: Le contrat ID {contract_id} est invalide ou n'appartient pas à l'adhérent." # Déjà en français
+    contract = await _resolve_contract(context, adherent, contract_id)
+    if not contract:
+        return f"Erreur: Le contrat {contract_id} est invalide ou n'appartient pas à l'adhérent." # Déjà en français
 
-    detail = db.get_specific_guarantee_detail(contract.id_formule, guarantee_name)
+    detail = await db.run(db.get_specific_guarantee_detail, contract.id_formule, guarantee_name)
     if not detail:
         return f"Désolé, je n'ai pas trouvé de garantie nommée '{guarantee_name}' dans votre plan." # Déjà en français
     
@@ -215,8 +309,12 @@ async def get_specific_coverage_details(context: RunContext, guarantee_name: str
             f"Franchise: {detail.get('franchise', '0.00')}€.")
 
 @function_tool
-async def simulate_reimbursement(context: RunContext, guarantee_name: str, expense_amount: float, contract_id: int) -> str:
-    """Calcule le montant estimé du remboursement pour une dépense donnée sous une garantie spécifique."""
+@with_db_fallback
+async def simulate_reimbursement(context: RunContext, guarantee_name: str, expense_amount: float, contract_id: str) -> str:
+    """
+    Calcule le montant estimé du remboursement pour une dépense donnée sous une garantie spécifique.
+    `contract_id` accepte l'ID interne ou le numéro de contrat (ex. CONTR00024).
+    """
     # L'implémentation de cet outil est complexe et reste la même que dans le schéma architectural.
     # Par souci de brièveté, la logique est supposée être correctement implémentée ici.
     # Elle nécessite de récupérer les détails de la garantie et d'effectuer le calcul.
@@ -225,12 +323,12 @@ async def simulate_reimbursement(context: RunContext, guarantee_name: str, expen
         return "Veuillez d'abord confirmer l'identité d'un adhérent." # Déjà en français
 
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    contract = db.get_contract_by_id(contract_id)
+    contract = await _resolve_contract(context, adherent, contract_id)
 
-    if not contract or contract.id_adherent_principal != adherent.id_adherent:
-        return f"Erreur: Le contrat ID {contract_id} est invalide ou n'appartient pas à l'adhérent." # Déjà en français
+    if not contract:
+        return f"Erreur: Le contrat {contract_id} est invalide ou n'appartient pas à l'adhérent." # Déjà en français
     
-    detail = db.get_specific_guarantee_detail(contract.id_formule, guarantee_name)
+    detail = await db.run(db.get_specific_guarantee_detail, contract.id_formule, guarantee_name)
     if not detail:
         return f"Garantie '{guarantee_name}' non trouvée." # Déjà en français
 
@@ -251,26 +349,41 @@ async def simulate_reimbursement(context: RunContext, guarantee_name: str, expen
 # --- Outils de Gestion des Sinistres ---
 
 @function_tool
-async def list_adherent_claims(context: RunContext) -> str:
-    """Liste tous les sinistres déclarés par l'adhérent actuellement confirmé dans le contexte."""
+@with_db_fallback
+async def list_adherent_claims(context: RunContext):
+    """
+    Liste tous les sinistres déclarés par l'adhérent actuellement confirmé dans le contexte.
+    La liste est lue directement à l'adhérent, du sinistre le plus récent au plus ancien.
+    """
     adherent: Optional[Adherent] = context.userdata.get("adherent_context")
     if not adherent:
         return "Veuillez d'abord confirmer l'identité d'un adhérent." # Déjà en français
             
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    claims = db.get_sinistres_by_adherent_id(adherent.id_adherent)
+    prefetcher: SessionPrefetcher = context.userdata["prefetcher"]
+    claims = await prefetcher.get("sinistres", adherent.id_adherent, db.get_sinistres_by_adherent_id, adherent.id_adherent)
 
     if not claims:
         return f"Aucun sinistre trouvé pour {adherent.prenom} {adherent.nom}." # Déjà en français
             
-    response = f"Voici les sinistres de {adherent.prenom} {adherent.nom}:\n" # Déjà en français
-    for s in claims:
-        response += f"- Sinistre ID: {s.id_sinistre_artex}, Type: {s.type_sinistre}, Statut: {s.statut_sinistre_artex}\n"
-    return response
+    spoken = SpokenList(context, f"Voici les sinistres de {adherent.prenom} {adherent.nom}.") # Déjà en français
+    try:
+        for s in sorted(claims, key=lambda s: s.date_declaration_agent, reverse=True):
+            spoken.add(f"Sinistre numéro {s.id_sinistre_artex}, {s.type_sinistre}, déclaré le {s.date_declaration_agent:%d/%m/%Y}, "
+                       f"statut {s.statut_sinistre_artex.lower()}.",
+                       f"- Sinistre ID: {s.id_sinistre_artex}, Type: {s.type_sinistre}, Statut: {s.statut_sinistre_artex}, "
+                       f"Déclaré le: {s.date_declaration_agent}")
+    finally:
+        spoken.close()
+    return spoken.result()
 
 @function_tool
-async def create_claim(context: RunContext, contract_id: int, claim_type: str, description: str, incident_date: str) -> str:
-    """Crée un nouveau sinistre pour l'adhérent actuellement confirmé dans le contexte, lié à un contrat spécifique."""
+@with_db_fallback
+async def create_claim(context: RunContext, contract_id: str, claim_type: str, description: str, incident_date: str) -> str:
+    """
+    Crée un nouveau sinistre pour l'adhérent actuellement confirmé dans le contexte, lié à un contrat spécifique.
+    `contract_id` accepte l'ID interne ou le numéro de contrat (ex. CONTR00024).
+    """
     adherent: Optional[Adherent] = context.userdata.get("adherent_context")
     if not adherent:
         return "Impossible de créer un sinistre. L'identité de l'adhérent doit d'abord être confirmée." # Déjà en français
@@ -278,22 +391,37 @@ async def create_claim(context: RunContext, contract_id: int, claim_type: str, d
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
     try:
         parsed_date = date.fromisoformat(incident_date)
-        new_claim = db.create_sinistre(
-            id_contrat=contract_id, id_adherent=adherent.id_adherent,
+        contract = await _resolve_contract(context, adherent, contract_id)
+        if not contract:
+            return f"Erreur: Le contrat {contract_id} est invalide ou n'appartient pas à l'adhérent." # Déjà en français
+        # Invalidé avant l'écriture : si l'appelant interrompt l'agent, l'écriture va quand même à son terme.
+        context.userdata["prefetcher"].invalidate("sinistres", adherent.id_adherent)
+        # Même clé tant que l'issue d'une déclaration de ce contrat et de cette date reste inconnue
+        # (exception, délai dépassé) : la relancer retrouve le sinistre déjà créé au lieu d'en créer un second.
+        pending_keys = context.userdata.setdefault("pending_claim_keys", {})
+        claim_key = (contract.id_contrat, parsed_date.isoformat())
+        request_key = pending_keys.setdefault(claim_key, uuid.uuid4().hex)
+        new_claim = await db.run_write(partial(
+            db.create_sinistre,
+            id_contrat=contract.id_contrat, id_adherent=adherent.id_adherent,
             type_sinistre=claim_type, description_sinistre=description,
-            date_survenance=parsed_date
-        )
+            date_survenance=parsed_date, request_key=request_key
+        ))
+        pending_keys.pop(claim_key, None)
         if new_claim:
             return f"Sinistre créé avec succès! Numéro de sinistre: {new_claim.id_sinistre_artex}." # Déjà en français
         else:
             return "Erreur lors de la création du sinistre. Vérifiez que le contrat vous appartient." # Déjà en français
     except ValueError:
         return "Erreur: La date d'incident doit être au format AAAA-MM-JJ (exemple: 2024-06-23)." # Déjà en français
+    except DatabaseUnavailable:
+        raise  # Réponse de repli de with_db_fallback
     except Exception as e:
-        logger.error(f"Erreur inattendue lors de la création du sinistre : {e}")
+        logger.error("Erreur inattendue lors de la création du sinistre : %s", e)
         return "Une erreur inattendue s'est produite." # Déjà en français
 
 @function_tool
+@with_db_fallback
 async def get_claim_status(context: RunContext, claim_id: int) -> str:
     """Obtient le statut actuel et les détails d'un ID de sinistre spécifique."""
     adherent: Optional[Adherent] = context.userdata.get("adherent_context")
@@ -301,7 +429,8 @@ async def get_claim_status(context: RunContext, claim_id: int) -> str:
         return "Veuillez d'abord confirmer l'identité d'un adhérent." # Déjà en français
 
     db: ExtranetDatabaseDriver = context.userdata["db_driver"]
-    claim = db.get_sinistre_by_id(claim_id)
+    prefetcher: SessionPrefetcher = context.userdata["prefetcher"]
+    claim = await prefetcher.get("sinistre", claim_id, db.get_sinistre_by_id, claim_id)
 
     if not claim:
         return f"Aucun sinistre trouvé avec l'ID {claim_id}." # Déjà en français
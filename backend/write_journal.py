@@ -0,0 +1,222 @@
+# write_journal.py
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger("artex_agent.write_journal")
+
+
+def process_journal_path(path: str) -> str:
+    """
+    Chemin du journal de ce processus : `ARTEX_WRITE_JOURNAL` suffixé par ARTEX_WORKER_INDEX (launcher.py).
+    L'index est stable d'un redémarrage à l'autre : le worker relancé rejoue les entrées de son prédécesseur.
+    """
+    index = os.getenv("ARTEX_WORKER_INDEX")
+    if index is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.worker{index}{ext}"
+
+
+class WriteBehindJournal:
+    """
+    Journal d'écritures différées :
+    - `append()` écrit l'entrée dans un fichier local en ajout seul puis fait un fsync : dès le retour,
+      l'écriture est durable et peut être acquittée à l'appelant ;
+    - un thread d'arrière-plan regroupe les entrées en attente et les applique en une transaction
+      via `apply_batch` (ExtranetDatabaseDriver.apply_journal_batch) ;
+    - la position du dernier lot appliqué est enregistrée dans un fichier `.checkpoint`, si bien qu'après
+      un arrêt brutal les entrées non appliquées sont rejouées au démarrage. Le rejeu est idempotent
+      (chaque entrée porte un identifiant unique) ;
+    - un lot refusé pour une autre raison qu'une panne (`is_transient`) est réappliqué entrée par entrée :
+      les entrées qui échouent encore partent dans le fichier `.dead` au lieu de bloquer les suivantes.
+    Un journal n'appartient qu'à un processus (verrou exclusif sur `.lock`) : voir process_journal_path().
+    """
+    def __init__(self, path: str, apply_batch: Callable[[List[Dict[str, Any]]], None],
+                 batch_size: int = 500, flush_interval: float = 0.5, compact_bytes: int = 16 * 1024 * 1024,
+                 is_transient: Callable[[Exception], bool] = lambda err: True):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoint"
+        self.dead_letter_path = path + ".dead"
+        self.apply_batch = apply_batch
+        self.is_transient = is_transient
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_bytes = compact_bytes
+        self._pending: List[tuple[int, Dict[str, Any]]] = []  # (position de fin dans le fichier, entrée)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._file = None
+        self._lock_file = None
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Cycle de vie ---
+
+    def start(self):
+        """Rejoue les entrées non appliquées puis démarre le thread de vidage."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._acquire_lock()
+        self._recover()
+        self._file = open(self.path, "ab")
+        self._thread = threading.Thread(target=self._run, name="artex-write-journal", daemon=True)
+        self._thread.start()
+        logger.info("Journal d'écritures différées ouvert : %s (%s entrée(s) à rejouer).", self.path, len(self._pending))
+
+    def close(self, timeout: float = 10.0):
+        """Vide les entrées en attente puis ferme le journal."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._file:
+            self._file.close()
+        if self._lock_file:
+            self._lock_file.close()
+
+    def _acquire_lock(self):
+        """Deux processus sur le même fichier entrelaceraient leurs ajouts et la compaction de l'un effacerait
+        les entrées non appliquées de l'autre : le second refuse de démarrer."""
+        if fcntl is None:
+            return  # Windows : pas de verrou consultatif, un chemin par processus reste indispensable
+        self._lock_file = open(self.path + ".lock", "a")
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError(f"Journal {self.path} déjà ouvert par un autre processus "
+                               "(un chemin par worker : ARTEX_WORKER_INDEX, voir process_journal_path).")
+
+    def _recover(self):
+        offset = self._read_checkpoint()
+        if not os.path.exists(self.path):
+            return
+        if offset > os.path.getsize(self.path):
+            # Point de contrôle antérieur à une troncature (arrêt pendant une compaction) : tout rejouer.
+            logger.warning("Point de contrôle %s au-delà de la fin de %s : rejeu complet.", offset, self.path)
+            offset = 0
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                if not line.endswith(b"\n"):
+                    break  # Dernière ligne tronquée par un arrêt brutal : jamais acquittée
+                self._pending.append((offset, json.loads(line)))
+
+    def _read_checkpoint(self) -> int:
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write_checkpoint(self, offset: int):
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    # --- Écriture ---
+
+    def append(self, kind: str, **fields) -> str:
+        """Ajoute une entrée durable au journal et retourne son identifiant. Bloque seulement le temps du fsync local."""
+        entry = {"id": uuid.uuid4().hex, "kind": kind, "ts": datetime.now().isoformat(timespec="milliseconds"), **fields}
+        line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending.append((self._file.tell(), entry))
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+        return entry["id"]
+
+    # --- Vidage vers MySQL ---
+
+    def _run(self):
+        backoff = self.flush_interval
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self._lock:
+                batch = self._pending[:self.batch_size]
+            if not batch:
+                if self._stopping:
+                    return
+                continue
+            try:
+                self._apply([entry for _, entry in batch])
+            except Exception as err:
+                logger.error("Échec du vidage de %s entrée(s) du journal, nouvel essai dans %.1f s : %s", len(batch), backoff, err)
+                if self._stopping:
+                    return  # Les entrées restent dans le journal et seront rejouées au prochain démarrage
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            backoff = self.flush_interval
+            self._write_checkpoint(batch[-1][0])
+            with self._lock:
+                del self._pending[:len(batch)]
+                if not self._pending:
+                    self._maybe_compact()
+            if len(batch) == self.batch_size:
+                self._wakeup.set()  # Il reste probablement d'autres entrées : enchaîner sans attendre
+
+    def _apply(self, entries: List[Dict[str, Any]]):
+        """
+        Applique le lot ; s'il est refusé sans que la base soit en cause, isole les entrées fautives.
+        Lève l'exception (nouvel essai du lot entier) seulement pour une panne : le rejeu est idempotent.
+        """
+        try:
+            self.apply_batch(entries)
+            return
+        except Exception as err:
+            if self.is_transient(err):
+                raise
+            logger.warning("Lot de %s entrée(s) refusé (%s) : application entrée par entrée.", len(entries), err)
+        for entry in entries:
+            try:
+                self.apply_batch([entry])
+            except Exception as err:
+                if self.is_transient(err):
+                    raise
+                self._dead_letter(entry, err)
+
+    def _dead_letter(self, entry: Dict[str, Any], err: Exception):
+        """Met de côté une entrée qui ne peut pas être appliquée, pour analyse et rejeu manuel."""
+        record = {"entry": entry, "error": f"{type(err).__name__}: {err}",
+                  "ts": datetime.now().isoformat(timespec="milliseconds")}
+        with open(self.dead_letter_path, "ab") as f:
+            f.write((json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        logger.error("Entrée %s (%s) inapplicable, déplacée dans %s : %s",
+                     entry.get("id"), entry.get("kind"), self.dead_letter_path, err)
+
+    def _maybe_compact(self):
+        """
+        Tout est appliqué : si le fichier est devenu gros, on le tronque (appelé sous verrou).
+        Le point de contrôle est remis à 0 AVANT la troncature : un arrêt entre les deux rejoue le fichier
+        entier (sans effet, le rejeu est idempotent) au lieu de sauter les entrées écrites après la troncature.
+        """
+        if self._file.tell() < self.compact_bytes:
+            return
+        self._write_checkpoint(0)
+        self._file.truncate(0)
+        self._file.seek(0)
+        os.fsync(self._file.fileno())
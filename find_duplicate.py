@@ -2,126 +2,414 @@
 """
 Script to detect duplicate function names in your LiveKit agent project
 and provide solutions to fix the duplicate function name error.
+
+Non-interactive: suitable as a pre-start check. Files are parsed across a process pool
+and results are cached by mtime/content hash, so re-runs only re-parse changed files.
+Tool registrations (`tools=[...]` lists and `@function_tool` methods of Agent subclasses)
+are resolved across modules through imports.
+
+Usage:
+    python find_duplicate.py backend                   # report, exit 1 on tool errors
+    python find_duplicate.py . --json                  # machine-readable report
+    python find_duplicate.py . --fix-script fix.py     # also write an auto-fix script
 """
 
-import os
+import argparse
 import ast
-import re
+import hashlib
+import json
+import os
+import sys
+import time
 from collections import defaultdict
-from typing import Dict, List, Set
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+TOOL_DECORATORS = {'tool', 'llm_tool', 'function_tool'}
+SKIPPED_DIRS = {'venv', '.venv', '__pycache__', '.git', 'node_modules', '.tox', '.nox', 'build', 'dist'}
+CACHE_FILENAME = '.find_duplicate_cache.json'
+CACHE_VERSION = 2  # Bump when the analysis result format changes
+SERIAL_THRESHOLD = 32  # Below this many files to parse, a process pool costs more than it saves
+
 
 class FunctionAnalyzer(ast.NodeVisitor):
+    """
+    Collects, for one module: function definitions (with tool decorators and explicit tool names),
+    imports (local name -> "module.attr") and tool registrations (`tools=[...]` keyword arguments).
+    """
     def __init__(self):
         self.functions = []
         self.decorators = []
-    
+        self.imports: Dict[str, str] = {}
+        self.registrations = []
+        self._scope: List[Tuple[str, str]] = []  # [(kind, name)], kind in {"class", "function"}
+
+    def _enclosing_class(self) -> Optional[str]:
+        for kind, name in reversed(self._scope):
+            if kind == "class":
+                return name
+        return None
+
+    def visit_ClassDef(self, node):
+        self._scope.append(("class", node.name))
+        self.generic_visit(node)
+        self._scope.pop()
+
     def visit_FunctionDef(self, node):
         # Check if function has decorators that might indicate it's a tool
         tool_decorators = []
+        tool_name = None
         for decorator in node.decorator_list:
-            if isinstance(decorator, ast.Name):
-                tool_decorators.append(decorator.id)
-            elif isinstance(decorator, ast.Attribute):
-                tool_decorators.append(f"{decorator.attr}")
-        
+            target = decorator.func if isinstance(decorator, ast.Call) else decorator
+            if isinstance(target, ast.Name):
+                tool_decorators.append(target.id)
+            elif isinstance(target, ast.Attribute):
+                tool_decorators.append(f"{target.attr}")
+            if isinstance(decorator, ast.Call):
+                for keyword in decorator.keywords:
+                    if keyword.arg == 'name' and isinstance(keyword.value, ast.Constant):
+                        tool_name = keyword.value.value
+
+        if not self._scope:
+            scope = 'module'
+        elif self._scope[-1][0] == 'class':
+            scope = 'class'
+        else:
+            scope = 'nested'
+        is_tool = any(dec in TOOL_DECORATORS for dec in tool_decorators)
         self.functions.append({
             'name': node.name,
             'line': node.lineno,
             'decorators': tool_decorators,
-            'is_tool': any(dec in ['tool', 'llm_tool', 'function_tool'] for dec in tool_decorators)
+            'is_tool': is_tool,
+            'tool_name': (tool_name or node.name) if is_tool else None,
+            'scope': scope,
+            'class': self._enclosing_class() if scope == 'class' else None,
         })
-        
+
+        self._scope.append(("function", node.name))
+        self.generic_visit(node)
+        self._scope.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef  # Tools are usually `async def`
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.imports[alias.asname] = alias.name
+            else:
+                top = alias.name.split('.')[0]
+                self.imports[top] = top
+
+    def visit_ImportFrom(self, node):
+        module = node.module or ''
+        for alias in node.names:
+            if alias.name != '*':
+                self.imports[alias.asname or alias.name] = f"{module}.{alias.name}" if module else alias.name
+
+    def visit_Call(self, node):
+        for keyword in node.keywords:
+            if keyword.arg == 'tools' and isinstance(keyword.value, (ast.List, ast.Tuple)):
+                self.registrations.append({
+                    'line': node.lineno,
+                    'class': self._enclosing_class(),
+                    'names': [_dotted_name(element) for element in keyword.value.elts],
+                })
         self.generic_visit(node)
 
+
+def _dotted_name(node) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _dotted_name(node.value)
+        return f"{base}.{node.attr}" if base else None
+    return None
+
+
 def analyze_python_file(filepath: str) -> Dict:
-    """Analyze a Python file for function definitions."""
+    """Analyze a Python file for function definitions, imports and tool registrations."""
     try:
         with open(filepath, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        tree = ast.parse(content)
+            tree = ast.parse(file.read(), filename=filepath)
         analyzer = FunctionAnalyzer()
         analyzer.visit(tree)
-        
+
         return {
             'filepath': filepath,
             'functions': analyzer.functions,
-            'content': content
+            'imports': analyzer.imports,
+            'registrations': analyzer.registrations,
+            'error': None,
         }
     except Exception as e:
-        print(f"Error analyzing {filepath}: {e}")
-        return {'filepath': filepath, 'functions': [], 'content': ''}
+        return {'filepath': filepath, 'functions': [], 'imports': {}, 'registrations': [],
+                'error': f"{type(e).__name__}: {e}"}
 
-def find_duplicate_functions(project_path: str) -> Dict[str, List]:
-    """Find all Python files and analyze them for duplicate function names."""
-    function_registry = defaultdict(list)
-    
-    # Find all Python files in the project
+
+# --- File discovery, cache and parallel parsing ---
+
+def iter_python_files(project_path: str) -> List[str]:
     python_files = []
     for root, dirs, files in os.walk(project_path):
         # Skip virtual environment and cache directories
-        dirs[:] = [d for d in dirs if d not in ['venv', '__pycache__', '.git', 'node_modules']]
-        
+        dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+
         for file in files:
             if file.endswith('.py'):
-                python_files.append(os.path.join(root, file))
-    
-    print(f"Found {len(python_files)} Python files to analyze...")
-    
-    # Analyze each file
+                python_files.append(os.path.abspath(os.path.join(root, file)))
+    return sorted(python_files)
+
+
+def _file_digest(filepath: str) -> str:
+    with open(filepath, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _load_cache(cache_path: Optional[str]) -> Dict[str, Any]:
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get('files', {}) if cache.get('version') == CACHE_VERSION else {}
+
+
+def _save_cache(cache_path: Optional[str], files: Dict[str, Any]):
+    """
+    Best-effort: the cache only saves time. A read-only directory or a concurrent writer (several
+    workers running the startup check at once) must not turn into an analysis failure.
+    """
+    if not cache_path:
+        return
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': files}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️  Could not write cache {cache_path}: {e}", file=sys.stderr)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def analyze_files(python_files: List[str], cache_path: Optional[str] = None, jobs: Optional[int] = None
+                  ) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Analyze `python_files`, reusing cached results for files whose mtime/size (or, failing that,
+    content hash) is unchanged. Returns (results in input order, statistics).
+    """
+    cached = _load_cache(cache_path)
+    fresh: Dict[str, Any] = {}
+    results: Dict[str, Dict] = {}
+    to_parse: List[Tuple[str, os.stat_result, Optional[str]]] = []
+
     for filepath in python_files:
-        analysis = analyze_python_file(filepath)
-        
+        st = os.stat(filepath)
+        entry = cached.get(filepath)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            results[filepath] = entry['result']
+            fresh[filepath] = entry
+            continue
+        digest = _file_digest(filepath) if entry else None
+        if entry and digest == entry['sha1']:
+            # Touched but unchanged (checkout, copy): refresh the stat key only.
+            results[filepath] = entry['result']
+            fresh[filepath] = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+            continue
+        to_parse.append((filepath, st, digest))
+
+    paths = [path for path, _, _ in to_parse]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(paths) >= SERIAL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parsed = list(pool.map(analyze_python_file, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+    else:
+        parsed = [analyze_python_file(path) for path in paths]
+
+    for (filepath, st, digest), result in zip(to_parse, parsed):
+        results[filepath] = result
+        fresh[filepath] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                           'sha1': digest or _file_digest(filepath), 'result': result}
+
+    if to_parse or len(fresh) != len(cached):
+        _save_cache(cache_path, fresh)
+    stats = {'files': len(python_files), 'parsed': len(to_parse), 'cached': len(python_files) - len(to_parse)}
+    return [results[path] for path in python_files], stats
+
+
+def find_duplicate_functions(project_path: str, results: Optional[List[Dict]] = None,
+                             tools_only: bool = False) -> Dict[str, List]:
+    """Find all Python files and analyze them for duplicate function names."""
+    function_registry = defaultdict(list)
+    if results is None:
+        results, _ = analyze_files(iter_python_files(project_path))
+
+    for analysis in results:
         for func in analysis['functions']:
-            function_registry[func['name']].append({
-                'file': filepath,
+            if tools_only and not func['is_tool']:
+                continue
+            function_registry[func['tool_name'] if tools_only else func['name']].append({
+                'file': analysis['filepath'],
                 'line': func['line'],
                 'decorators': func['decorators'],
                 'is_tool': func['is_tool']
             })
-    
+
     return function_registry
 
+
+# --- Cross-module tool registration checks ---
+
+class ModuleIndex:
+    """Resolves module names (`tools`, `backend.tools`) and imported names to analyzed functions."""
+    def __init__(self, results: List[Dict], roots: List[str]):
+        self.by_path = {r['filepath']: r for r in results}
+        self.modules: Dict[str, List[Dict]] = defaultdict(list)
+        for result in results:
+            for name in self._module_names(result['filepath'], roots):
+                self.modules[name].append(result)
+
+    @staticmethod
+    def _module_names(filepath: str, roots: List[str]) -> List[str]:
+        names = set()
+        for root in roots:
+            rel = os.path.relpath(filepath, os.path.abspath(root))
+            if rel.startswith('..'):
+                continue
+            parts = rel[:-3].split(os.sep)
+            if parts[-1] == '__init__':
+                parts = parts[:-1]
+            # Every suffix: scripts run from their own directory import "tools", packages "backend.tools".
+            names.update('.'.join(parts[i:]) for i in range(len(parts)) if parts[i:])
+        return sorted(names)
+
+    def module(self, name: str, importer: str) -> Optional[Dict]:
+        candidates = self.modules.get(name.lstrip('.'), [])
+        for candidate in candidates:
+            if os.path.dirname(candidate['filepath']) == os.path.dirname(importer):
+                return candidate
+        return candidates[0] if candidates else None
+
+    def resolve(self, result: Dict, name: str, enclosing_class: Optional[str] = None, depth: int = 0
+                ) -> Optional[Tuple[Dict, Dict]]:
+        """Resolve `name` as seen from module `result` to (module result, function), following imports."""
+        if depth > 5:
+            return None
+        head, _, rest = name.partition('.')
+        if head == 'self' and rest and enclosing_class:
+            return self._function(result, rest, cls=enclosing_class)
+        if not rest:
+            found = self._function(result, name)
+            if found:
+                return found
+        target = result['imports'].get(head)
+        if target is None:
+            return None
+        full = f"{target}.{rest}" if rest else target
+        module_name, _, attr = full.rpartition('.')
+        module = self.module(module_name, result['filepath']) if module_name else None
+        if module is None:
+            return None
+        return self.resolve(module, attr, depth=depth + 1)
+
+    @staticmethod
+    def _function(result: Dict, name: str, cls: Optional[str] = None) -> Optional[Tuple[Dict, Dict]]:
+        for func in result['functions']:
+            if func['name'] == name and func['class'] == cls and func['scope'] == ('class' if cls else 'module'):
+                return result, func
+        return None
+
+
+def check_tool_registrations(results: List[Dict], roots: List[str]) -> List[Dict]:
+    """
+    Validate every tool registration found in `results`. Problems are dicts
+    {severity: "error"|"warning", file, line, message}:
+      - error: a registered name that is not decorated as a tool, two tools exposed under the same name
+        to the same agent, or an unparsable file;
+      - warning: a registered name that cannot be resolved in the analyzed files.
+    """
+    index = ModuleIndex(results, roots)
+    problems = []
+    for result in results:
+        if result['error']:
+            problems.append({'severity': 'error', 'file': result['filepath'], 'line': 0,
+                             'message': f"cannot parse: {result['error']}"})
+        for registration in result['registrations']:
+            exposed: Dict[str, List[str]] = defaultdict(list)
+            # Agent subclasses also expose their own @function_tool methods.
+            if registration['class']:
+                for func in result['functions']:
+                    if func['is_tool'] and func['class'] == registration['class']:
+                        exposed[func['tool_name']].append(f"{os.path.basename(result['filepath'])}:{func['line']}")
+            for name in registration['names']:
+                if name is None:
+                    continue
+                resolved = index.resolve(result, name, registration['class'])
+                if resolved is None:
+                    problems.append({'severity': 'warning', 'file': result['filepath'], 'line': registration['line'],
+                                     'message': f"registered tool '{name}' could not be resolved"})
+                    continue
+                module, func = resolved
+                if not func['is_tool']:
+                    problems.append({'severity': 'error', 'file': result['filepath'], 'line': registration['line'],
+                                     'message': f"'{name}' is registered as a tool but has no @function_tool decorator "
+                                                f"({module['filepath']}:{func['line']})"})
+                    continue
+                exposed[func['tool_name']].append(f"{os.path.basename(module['filepath'])}:{func['line']}")
+            for tool_name, sources in exposed.items():
+                if len(sources) > 1:
+                    problems.append({'severity': 'error', 'file': result['filepath'], 'line': registration['line'],
+                                     'message': f"duplicate tool name '{tool_name}' in one agent: {', '.join(sources)}"})
+    return problems
+
+
+def _suggested_name(func_name: str, occ: Dict, i: int) -> str:
+    filename = os.path.basename(occ['file']).replace('.py', '')
+
+    # Generate contextual name suggestions
+    if 'auto' in occ['file'].lower():
+        return f"{func_name}_auto"
+    elif 'property' in occ['file'].lower():
+        return f"{func_name}_property"
+    elif 'health' in occ['file'].lower():
+        return f"{func_name}_health"
+    elif 'api' in occ['file'].lower():
+        return f"{func_name}_api"
+    elif filename != 'api':
+        return f"{func_name}_{filename}"
+    return f"{func_name}_{i}"
+
+
 def generate_fixes(duplicates: Dict[str, List]) -> List[str]:
     """Generate specific fixes for duplicate function names."""
     fixes = []
-    
+
     for func_name, occurrences in duplicates.items():
         if len(occurrences) > 1:
             fixes.append(f"\n🔍 DUPLICATE FUNCTION: '{func_name}' found in {len(occurrences)} places:")
-            
+
             for i, occ in enumerate(occurrences):
                 fixes.append(f"   {i+1}. {occ['file']}:{occ['line']} - Decorators: {occ['decorators']}")
-            
+
             # Suggest specific renames based on file context
             fixes.append(f"\n💡 SUGGESTED FIXES for '{func_name}':")
-            
+
             for i, occ in enumerate(occurrences):
-                filename = os.path.basename(occ['file']).replace('.py', '')
-                
-                # Generate contextual name suggestions
-                if 'auto' in occ['file'].lower():
-                    suggested_name = f"{func_name}_auto"
-                elif 'property' in occ['file'].lower():
-                    suggested_name = f"{func_name}_property"
-                elif 'health' in occ['file'].lower():
-                    suggested_name = f"{func_name}_health"
-                elif 'api' in occ['file'].lower():
-                    suggested_name = f"{func_name}_api"
-                elif filename != 'api':
-                    suggested_name = f"{func_name}_{filename}"
-                else:
-                    suggested_name = f"{func_name}_{i+1}"
-                
-                fixes.append(f"   - In {occ['file']}:{occ['line']} → Rename to: '{suggested_name}'")
-            
+                fixes.append(f"   - In {occ['file']}:{occ['line']} → Rename to: '{_suggested_name(func_name, occ, i + 1)}'")
+
             fixes.append("-" * 60)
-    
+
     return fixes
 
+
 def create_fix_script(duplicates: Dict[str, List], project_path: str) -> str:
     """Create a Python script to automatically fix the duplicates."""
-    
+
     script_content = '''#!/usr/bin/env python3
 """
 Auto-generated script to fix duplicate function names in your LiveKit agent project.
@@ -133,56 +421,43 @@ import re
 
 def fix_duplicate_functions():
     """Fix duplicate function names by renaming them."""
-    
+
     fixes_applied = []
-    
+
 '''
-    
+
     for func_name, occurrences in duplicates.items():
         if len(occurrences) > 1:
             for i, occ in enumerate(occurrences[1:], 1):  # Skip first occurrence
-                filename = os.path.basename(occ['file']).replace('.py', '')
-                
-                if 'auto' in occ['file'].lower():
-                    new_name = f"{func_name}_auto"
-                elif 'property' in occ['file'].lower():
-                    new_name = f"{func_name}_property"
-                elif 'health' in occ['file'].lower():
-                    new_name = f"{func_name}_health"
-                elif 'api' in occ['file'].lower():
-                    new_name = f"{func_name}_api"
-                elif filename != 'api':
-                    new_name = f"{func_name}_{filename}"
-                else:
-                    new_name = f"{func_name}_{i}"
-                
+                new_name = _suggested_name(func_name, occ, i)
+
                 script_content += f'''
     # Fix {func_name} in {occ['file']}
     try:
         with open(r"{occ['file']}", 'r', encoding='utf-8') as f:
             content = f.read()
-        
+
         # Replace function definition
         pattern = r'(def\\s+){func_name}(\\s*\\()'
         replacement = r'\\g<1>{new_name}\\g<2>'
         content = re.sub(pattern, replacement, content)
-        
+
         with open(r"{occ['file']}", 'w', encoding='utf-8') as f:
             f.write(content)
-        
+
         fixes_applied.append("Renamed {func_name} to {new_name} in {occ['file']}")
         print(f"✅ Renamed {func_name} to {new_name} in {occ['file']}")
-        
+
     except Exception as e:
         print(f"❌ Error fixing {occ['file']}: {{e}}")
 '''
-    
+
     script_content += '''
-    
+
     print(f"\\n🎉 Applied {len(fixes_applied)} fixes!")
     for fix in fixes_applied:
         print(f"  - {fix}")
-    
+
     print("\\n⚠️  Remember to:")
     print("  1. Update any function calls to use the new names")
     print("  2. Update imports if these functions are imported elsewhere")
@@ -191,61 +466,66 @@ def fix_duplicate_functions():
 if __name__ == "__main__":
     fix_duplicate_functions()
 '''
-    
+
     return script_content
 
+
 def main():
-    """Main function to analyze and provide fixes."""
-    print("🔍 LiveKit Agent Duplicate Function Detector")
-    print("=" * 50)
-    
-    # Get project path (current directory by default)
-    project_path = input("Enter your project path (press Enter for current directory): ").strip()
-    if not project_path:
-        project_path = "."
-    
-    if not os.path.exists(project_path):
-        print(f"❌ Path '{project_path}' does not exist!")
-        return
-    
-    # Analyze functions
-    print(f"\\nAnalyzing Python files in: {os.path.abspath(project_path)}")
-    function_registry = find_duplicate_functions(project_path)
-    
-    # Find duplicates
-    duplicates = {name: occurrences for name, occurrences in function_registry.items() 
-                 if len(occurrences) > 1}
-    
-    if not duplicates:
-        print("✅ No duplicate function names found!")
-        return
-    
-    print(f"\\n🚨 Found {len(duplicates)} duplicate function name(s):")
-    
-    # Generate and display fixes
-    fixes = generate_fixes(duplicates)
-    for fix in fixes:
-        print(fix)
-    
-    # Ask if user wants to generate auto-fix script
-    generate_script = input("\\n❓ Generate automatic fix script? (y/n): ").lower().strip()
-    
-    if generate_script == 'y':
-        fix_script = create_fix_script(duplicates, project_path)
-        
-        script_filename = "fix_duplicate_functions.py"
-        with open(script_filename, 'w', encoding='utf-8') as f:
-            f.write(fix_script)
-        
-        print(f"\\n✅ Auto-fix script saved as: {script_filename}")
-        print("\\n⚠️  IMPORTANT: Review the script before running it!")
-        print(f"   Run with: python {script_filename}")
-    
-    print("\\n📋 Manual Fix Summary:")
-    print("1. Rename duplicate functions to have unique names")
-    print("2. Update any references to the renamed functions")
-    print("3. Ensure all tool functions have proper decorators")
-    print("4. Test your application after making changes")
+    """Analyze the given paths and report duplicates; exit status 1 if any tool error is found."""
+    parser = argparse.ArgumentParser(description="LiveKit Agent Duplicate Function Detector")
+    parser.add_argument('paths', nargs='*', default=['.'], help="Project directories to analyze (default: current).")
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="Parser processes (default: CPU count).")
+    parser.add_argument('--cache', default=None,
+                        help=f"Cache file (default: {CACHE_FILENAME} in the first path).")
+    parser.add_argument('--no-cache', action='store_true', help="Re-parse every file.")
+    parser.add_argument('--all-functions', action='store_true',
+                        help="Report every duplicate function name, not only duplicate tool names.")
+    parser.add_argument('--fix-script', metavar='PATH', help="Write an automatic rename script to PATH.")
+    parser.add_argument('--json', action='store_true', help="Print a JSON report instead of text.")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"❌ Path '{path}' does not exist!", file=sys.stderr)
+            sys.exit(2)
+
+    started = time.perf_counter()
+    cache_path = None if args.no_cache else (args.cache or os.path.join(args.paths[0], CACHE_FILENAME))
+    python_files = sorted({f for path in args.paths for f in iter_python_files(path)})
+    results, stats = analyze_files(python_files, cache_path=cache_path, jobs=args.jobs)
+
+    function_registry = find_duplicate_functions(args.paths[0], results, tools_only=not args.all_functions)
+    duplicates = {name: occurrences for name, occurrences in function_registry.items()
+                  if len(occurrences) > 1}
+    problems = check_tool_registrations(results, args.paths)
+    errors = [p for p in problems if p['severity'] == 'error']
+    stats['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    if args.json:
+        print(json.dumps({'stats': stats, 'duplicates': duplicates, 'problems': problems}, indent=2))
+    else:
+        print("🔍 LiveKit Agent Duplicate Function Detector")
+        print("=" * 50)
+        print(f"Analyzed {stats['files']} Python files ({stats['parsed']} parsed, {stats['cached']} from cache) "
+              f"in {stats['elapsed_ms']} ms")
+        for problem in problems:
+            icon = "❌" if problem['severity'] == 'error' else "⚠️ "
+            print(f"{icon} {problem['file']}:{problem['line']}: {problem['message']}")
+        if duplicates:
+            kind = "function" if args.all_functions else "tool"
+            print(f"\n🚨 Found {len(duplicates)} duplicate {kind} name(s):")
+            for fix in generate_fixes(duplicates):
+                print(fix)
+        elif not problems:
+            print("✅ No duplicate function names found!")
+
+    if args.fix_script and duplicates:
+        with open(args.fix_script, 'w', encoding='utf-8') as f:
+            f.write(create_fix_script(duplicates, args.paths[0]))
+        print(f"\n✅ Auto-fix script saved as: {args.fix_script} (review it before running!)", file=sys.stderr)
+
+    sys.exit(1 if errors else 0)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()